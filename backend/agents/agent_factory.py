@@ -4,6 +4,7 @@ from .story_generator import StoryGeneratorAgent
 from .game_designer import GameDesignerAgent
 from .progress_tracker import ProgressTrackerAgent
 from .translation_agent import TranslationAgent
+from .image_recognition import ImageRecognitionAgent
 
 class AgentFactory:
     """Factory class for creating and managing agents"""
@@ -12,7 +13,8 @@ class AgentFactory:
         "story": StoryGeneratorAgent,
         "game": GameDesignerAgent,
         "progress": ProgressTrackerAgent,
-        "translation": TranslationAgent
+        "translation": TranslationAgent,
+        "image": ImageRecognitionAgent
     }
     
     @classmethod
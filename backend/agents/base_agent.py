@@ -1,5 +1,6 @@
 from typing import Dict, Any, Optional
 from crewai import Agent
+from pydantic import BaseModel
 from ..config.agent_config import AgentConfig
 
 class BaseCrewAgent:
@@ -28,9 +29,10 @@ class BaseCrewAgent:
         """Return the CrewAI agent instance"""
         return self.agent
 
-    async def process(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    async def process(self, data: Dict[str, Any]) -> BaseModel:
         """
-        Process the input data and return results.
+        Process the input data and return results as the agent's model,
+        which routers serialize once on the way out.
         To be implemented by specific agents.
         """
         raise NotImplementedError("Subclasses must implement process method") 
\ No newline at end of file
@@ -1,7 +1,18 @@
-from typing import Dict, Any, List
+import random
+from urllib.parse import quote
+from typing import Dict, Any, List, Optional
 from pydantic import BaseModel
 from .base_agent import BaseCrewAgent
 from ..config.agent_config import AGENT_CONFIGS, PUZZLE_TYPES
+from ..config.animal_assets import images_by_species, species_for_theme
+from ..services.memory_game import generate_memory_layout, card_elements
+from ..services.counting_scene import get_counting_scene_service
+from ..services.shape_engine import generate_shape_set
+from ..services.audio_sprites import get_audio_sprite_service
+from ..services.safety_filter import get_safety_filter
+
+# Seeds shape-matching sets are drawn from when the request doesn't pin one
+SHAPE_SEED_POOL = 16
 
 class PuzzleElement(BaseModel):
     element_type: str
@@ -18,12 +29,13 @@ class GameContent(BaseModel):
     instructions: str
     reward_message: str
     learning_outcome: str
+    layout: Optional[Dict[str, Any]] = None  # board geometry for the client to render
 
 class GameDesignerAgent(BaseCrewAgent):
     def __init__(self):
         super().__init__(AGENT_CONFIGS["game_designer"])
         
-    async def process(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    async def process(self, data: Dict[str, Any]) -> GameContent:
         """
         Generate an educational game based on the input data
         
@@ -33,9 +45,10 @@ class GameDesignerAgent(BaseCrewAgent):
                 - difficulty: Difficulty level (easy, medium, hard)
                 - animal_theme: Animal theme for the puzzle
                 - lesson_theme: Educational theme/lesson
+                - seed: Optional seed to reproduce a generated layout
         
         Returns:
-            Dictionary containing the generated game content
+            The generated game content, with any blocklisted terms masked
         """
         if data['puzzle_type'] not in PUZZLE_TYPES:
             raise ValueError(f"Invalid puzzle type. Must be one of {list(PUZZLE_TYPES.keys())}")
@@ -46,7 +59,7 @@ class GameDesignerAgent(BaseCrewAgent):
         # Generate game content based on type
         game = await self._generate_game(data)
         
-        return game.dict()
+        return get_safety_filter().screen(game, ["en"], f"{data['puzzle_type']} game")
     
     async def _generate_game(self, data: Dict[str, Any]) -> GameContent:
         """Generate specific game content based on type"""
@@ -65,19 +78,19 @@ class GameDesignerAgent(BaseCrewAgent):
     
     async def _generate_shape_matching(self, data: Dict[str, Any]) -> GameContent:
         """Generate a shape matching game"""
-        difficulty_map = {
-            "easy": 3,
-            "medium": 5,
-            "hard": 7
-        }
-        num_shapes = difficulty_map[data['difficulty']]
+        # Sets are memoized per (difficulty, theme, seed); drawing from a small
+        # seed pool keeps repeat requests on the cache
+        seed = data.get('seed')
+        if seed is None:
+            seed = random.randrange(SHAPE_SEED_POOL)
+        shape_set = generate_shape_set(data['difficulty'], data['animal_theme'], seed)
         
         elements = []
-        for i in range(num_shapes):
+        for target in shape_set.targets:
             elements.append(PuzzleElement(
                 element_type="shape",
-                content=f"Shape {i + 1}",
-                correct_answer=f"Match {i + 1}",
+                content={"shape": target.shape, "path": target.path, "color": target.color},
+                correct_answer=target.match_id,
                 hints=[f"Look for similar colors", f"Count the sides"]
             ))
             
@@ -89,7 +102,12 @@ class GameDesignerAgent(BaseCrewAgent):
             elements=elements,
             instructions="Drag each shape to its matching pair",
             reward_message="Great job matching the shapes!",
-            learning_outcome="Shape recognition and spatial awareness"
+            learning_outcome="Shape recognition and spatial awareness",
+            layout={
+                "view_box": shape_set.view_box,
+                "seed": shape_set.seed,
+                "pieces": shape_set.pieces  # memoized models, serialized as they are
+            }
         )
     
     async def _generate_counting_game(self, data: Dict[str, Any]) -> GameContent:
@@ -101,12 +119,23 @@ class GameDesignerAgent(BaseCrewAgent):
         }
         range_start, range_end = difficulty_map[data['difficulty']]
         
+        # Scenes come from the pre-warmed layout cache, keyed by a small seed set
+        rng = random.Random(data.get('seed'))
+        scenes = get_counting_scene_service()
+        
         elements = []
-        for i in range(3):  # Generate 3 counting challenges
+        for count in sorted(rng.sample(range(range_start, range_end + 1), 3)):  # 3 counting challenges
+            scene = scenes.get(count, data['animal_theme'], scenes.pick_seed(rng))
             elements.append(PuzzleElement(
                 element_type="counting",
-                content=f"{i + range_start} objects",
-                correct_answer=i + range_start,
+                content={
+                    **scene.dict(),
+                    "scene_image": (
+                        f"/api/games/counting-scene?count={count}"
+                        f"&animal_theme={quote(data['animal_theme'])}&seed={scene.seed}"
+                    )
+                },
+                correct_answer=count,
                 hints=["Count one by one", "Point to each object"]
             ))
             
@@ -123,17 +152,36 @@ class GameDesignerAgent(BaseCrewAgent):
     
     async def _generate_animal_sounds(self, data: Dict[str, Any]) -> GameContent:
         """Generate an animal sounds matching game"""
-        elements = []
         num_sounds = {"easy": 3, "medium": 5, "hard": 7}[data['difficulty']]
+        rng = random.Random(data.get('seed'))
+        
+        # Every sound lives in one audio sprite; elements reference their clip
+        # by offset so the whole game is a single download
+        sprites = get_audio_sprite_service()
+        clips = sprites.clips()
+        images = images_by_species()
+        pool = sorted(set(clips) & set(images)) or sorted(images)
+        theme_species = species_for_theme(data['animal_theme'])
+        chosen = [theme_species] if theme_species in pool else []
+        chosen += rng.sample([animal for animal in pool if animal not in chosen], min(num_sounds, len(pool)) - len(chosen))
+        rng.shuffle(chosen)
         
-        for i in range(num_sounds):
+        elements = []
+        for animal in chosen:
+            clip = clips.get(animal)
             elements.append(PuzzleElement(
                 element_type="sound",
-                content=f"Animal sound {i + 1}",
-                correct_answer=f"Animal {i + 1}",
+                content={
+                    "audio": {
+                        key: clip[key]
+                        for key in ("start", "duration", "byte_offset", "byte_length")
+                    } if clip else None
+                },
+                correct_answer=animal,
                 hints=["Listen carefully", "Think about the animal's size"]
             ))
             
+        index = sprites.index
         return GameContent(
             puzzle_type="animal_sounds",
             difficulty=data['difficulty'],
@@ -142,24 +190,30 @@ class GameDesignerAgent(BaseCrewAgent):
             elements=elements,
             instructions="Listen to the sound and select the correct animal",
             reward_message="You're great at identifying animal sounds!",
-            learning_outcome="Audio recognition and animal knowledge"
+            learning_outcome="Audio recognition and animal knowledge",
+            layout={
+                "sprite": f"/api/audio/sprites/{index['sprite']}" if index else None,
+                "sample_rate": index.get("sample_rate"),
+                "choices": [{"animal": animal, "image": images[animal]} for animal in sorted(chosen)]
+            }
         )
     
     async def _generate_memory_game(self, data: Dict[str, Any]) -> GameContent:
         """Generate a memory matching game"""
-        difficulty_map = {
-            "easy": 4,  # 2x2 grid
-            "medium": 8,  # 2x4 grid
-            "hard": 12   # 3x4 grid
-        }
-        num_pairs = difficulty_map[data['difficulty']]
+        # 2x2 (easy), 2x4 (medium) or 3x4 (hard) grid, picked from thousands
+        # of seeded shuffles ranked by how hard they are to remember
+        layout = generate_memory_layout(
+            data['difficulty'],
+            data['animal_theme'],
+            seed=data.get('seed')
+        )
         
         elements = []
-        for i in range(num_pairs):
+        for card in card_elements(layout):
             elements.append(PuzzleElement(
                 element_type="memory_card",
-                content=f"Card {i + 1}",
-                correct_answer=f"Card {i + 1}",
+                content=card,
+                correct_answer=card["match_position"],
                 hints=["Remember the position", "Look for matching patterns"]
             ))
             
@@ -171,5 +225,13 @@ class GameDesignerAgent(BaseCrewAgent):
             elements=elements,
             instructions="Click on cards to reveal them and find matching pairs",
             reward_message="Your memory is amazing!",
-            learning_outcome="Memory skills and concentration"
-        ) 
\ No newline at end of file
+            learning_outcome="Memory skills and concentration",
+            layout={
+                "rows": layout.rows,
+                "cols": layout.cols,
+                "seed": layout.seed,
+                "difficulty_score": layout.difficulty_score,
+                "percentile": layout.percentile,
+                "candidates": layout.candidates
+            }
+        )
@@ -0,0 +1,62 @@
+import asyncio
+from typing import Dict, Any, List, Optional, Tuple
+from pydantic import BaseModel
+from .base_agent import BaseCrewAgent
+from ..config.agent_config import AGENT_CONFIGS
+from ..config.animal_assets import species_for_image
+from ..services.image_hash_index import get_image_hash_index, dhash
+
+# Hashes further apart than this (out of 64 bits) are not the same picture
+DEFAULT_MAX_DISTANCE = 12
+
+class AnimalMatch(BaseModel):
+    animal: str
+    image: str
+    distance: int
+    confidence: float
+
+class RecognitionResult(BaseModel):
+    recognized: bool
+    animal: Optional[str] = None
+    matches: List[AnimalMatch]
+
+def nearest_images(image: bytes, max_distance: int, limit: int) -> List[Tuple[int, str]]:
+    """Hash a picture and look it up; decoding and index refreshes block, so call it in a worker thread"""
+    return get_image_hash_index().nearest(dhash(image), max_distance, limit)
+
+class ImageRecognitionAgent(BaseCrewAgent):
+    def __init__(self):
+        super().__init__(AGENT_CONFIGS["image_recognition"])
+
+    async def process(self, data: Dict[str, Any]) -> RecognitionResult:
+        """
+        Identify which safari animal a picture shows
+
+        Args:
+            data: Dictionary containing:
+                - image: Raw image bytes (JPEG, PNG or WebP)
+                - max_distance: Optional Hamming distance cut-off (0-64)
+                - limit: Optional number of candidate matches to return
+
+        Returns:
+            The best match and ranked candidates
+        """
+        max_distance = data.get('max_distance', DEFAULT_MAX_DISTANCE)
+        nearest = await asyncio.to_thread(nearest_images, data['image'], max_distance, data.get('limit', 3))
+
+        matches = [
+            AnimalMatch(
+                animal=species_for_image(filename),
+                image=filename,
+                distance=distance,
+                confidence=round(1 - distance / 64, 3)
+            )
+            for distance, filename in nearest
+        ]
+
+        result = RecognitionResult(
+            recognized=bool(matches),
+            animal=matches[0].animal if matches else None,
+            matches=matches
+        )
+        return result
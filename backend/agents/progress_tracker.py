@@ -1,8 +1,19 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from pydantic import BaseModel
 from datetime import datetime
+import numpy as np
 from .base_agent import BaseCrewAgent
 from ..config.agent_config import AGENT_CONFIGS
+from ..services.activity_recommender import activity_key, get_activity_recommender
+from ..services.activity_store import ActivityStore, ActivityView
+from ..services.adaptive_difficulty import (
+    LEVEL_FOR_DIFFICULTY,
+    get_difficulty_model,
+    normalize_difficulty
+)
+
+# Scores are stored as float32; thresholds are compared to within its precision
+SCORE_TOLERANCE = 1e-6
 
 class ActivityProgress(BaseModel):
     activity_type: str  # story, puzzle, game
@@ -12,6 +23,7 @@ class ActivityProgress(BaseModel):
     time_spent: int  # in seconds
     difficulty: str
     timestamp: datetime
+    animal: Optional[str] = None
 
 class LearningMetrics(BaseModel):
     total_time_spent: int
@@ -24,117 +36,119 @@ class LearningMetrics(BaseModel):
 
 class ProgressRecommendation(BaseModel):
     next_difficulty: str
+    skill_difficulties: Dict[str, str] = {}  # recommended game difficulty per activity type
     recommended_activities: List[str]
     personalized_goals: List[str]
     celebration_message: str
 
+class ProgressReport(BaseModel):
+    metrics: LearningMetrics
+    recommendations: ProgressRecommendation
+
 class ProgressTrackerAgent(BaseCrewAgent):
     def __init__(self):
         super().__init__(AGENT_CONFIGS["progress_tracker"])
         
-    async def process(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    async def process(self, data: Dict[str, Any]) -> ProgressReport:
         """
         Process user progress data and generate recommendations
         
         Args:
             data: Dictionary containing:
                 - user_id: Unique identifier for the user
-                - recent_activities: List of recent activity progress
-                - current_level: Current difficulty level
-                - preferences: User activity preferences
+                - activities: ActivityView of the user's recent activities, or
+                - recent_activities: List of recent ActivityProgress models
+                  or dicts, oldest first
+                - current_level: Optional current level (beginner, intermediate,
+                  advanced); defaults to the level of the latest activity
+                - preferences: Optional user activity preferences
         
         Returns:
-            Dictionary containing progress analysis and recommendations
+            Progress analysis and recommendations
         """
-        # Convert recent activities to ActivityProgress objects
-        activities = [
-            ActivityProgress(**activity)
-            for activity in data['recent_activities']
-        ]
+        activities = data.get('activities')
+        if activities is None:
+            activities = ActivityStore.from_activities(data['recent_activities']).view("")
+        
+        current_level = data.get('current_level') or self._determine_level(activities)
         
         # Analyze progress
-        metrics = await self._analyze_progress(activities)
+        metrics = await self._analyze_progress(activities, current_level)
         
         # Generate recommendations
         recommendations = await self._generate_recommendations(
+            data['user_id'],
+            [activity_key(*key) for key in activities.keys(activities.chronological()[-10:])],
             metrics,
-            data['current_level'],
-            data['preferences']
+            current_level,
+            data.get('preferences', {})
         )
         
-        return {
-            "metrics": metrics.dict(),
-            "recommendations": recommendations.dict()
-        }
+        return ProgressReport(metrics=metrics, recommendations=recommendations)
     
-    async def _analyze_progress(self, activities: List[ActivityProgress]) -> LearningMetrics:
-        """Analyze user's learning progress"""
-        if not activities:
+    async def _analyze_progress(self, activities: ActivityView, current_level: str) -> LearningMetrics:
+        """Analyze user's learning progress, straight from the activity arrays"""
+        if not len(activities):
             return LearningMetrics(
                 total_time_spent=0,
                 activities_completed=0,
                 average_score=0.0,
                 favorite_activities=[],
-                current_level="beginner",
+                current_level=current_level,
                 strengths=[],
                 areas_for_improvement=[]
             )
         
         # Calculate metrics
-        total_time = sum(a.time_spent for a in activities)
-        completed = sum(1 for a in activities if a.completion_status)
-        avg_score = sum(a.score for a in activities) / len(activities)
-        
-        # Find favorite activities
-        activity_counts = {}
-        for activity in activities:
-            activity_counts[activity.activity_type] = activity_counts.get(activity.activity_type, 0) + 1
-        favorites = sorted(activity_counts.items(), key=lambda x: x[1], reverse=True)[:3]
+        total_time = int(activities.time_spent.sum())
+        completed = int(np.count_nonzero(activities.completed))
+        avg_score = round(float(activities.score.mean(dtype=np.float64)), 4)
+        
+        # Activity types in order of first appearance, with counts and mean scores
+        order = activities.chronological()
+        codes = activities.activity_type[order]
+        present, first_seen = np.unique(codes, return_index=True)
+        present = present[np.argsort(first_seen)]
+        counts = np.bincount(codes)[present]
+        means = np.bincount(codes, weights=activities.score[order])[present] / counts
+        names = activities.type_names()
+        
+        # Find favorite activities (ties keep first appearance order)
+        favorites = [names[code] for code in present[np.argsort(-counts, kind="stable")][:3]]
         
         # Analyze strengths and areas for improvement
-        scores_by_type = {}
-        for activity in activities:
-            if activity.activity_type not in scores_by_type:
-                scores_by_type[activity.activity_type] = []
-            scores_by_type[activity.activity_type].append(activity.score)
-        
-        strengths = [
-            activity_type
-            for activity_type, scores in scores_by_type.items()
-            if sum(scores) / len(scores) >= 0.8
-        ]
-        
-        improvements = [
-            activity_type
-            for activity_type, scores in scores_by_type.items()
-            if sum(scores) / len(scores) < 0.6
-        ]
+        strengths = [names[code] for code, mean in zip(present, means) if mean >= 0.8 - SCORE_TOLERANCE]
+        improvements = [names[code] for code, mean in zip(present, means) if mean < 0.6 - SCORE_TOLERANCE]
         
         return LearningMetrics(
             total_time_spent=total_time,
             activities_completed=completed,
             average_score=avg_score,
-            favorite_activities=[f[0] for f in favorites],
-            current_level=self._determine_level(avg_score),
+            favorite_activities=favorites,
+            current_level=current_level,
             strengths=strengths,
             areas_for_improvement=improvements
         )
     
     async def _generate_recommendations(
         self,
+        user_id: str,
+        recent_activities: List[str],
         metrics: LearningMetrics,
         current_level: str,
         preferences: Dict[str, Any]
     ) -> ProgressRecommendation:
         """Generate personalized recommendations"""
-        # Determine next difficulty level
-        next_difficulty = self._get_next_difficulty(
-            current_level,
-            metrics.average_score
-        )
+        # Next level and per-skill game difficulty from the ability model
+        model = get_difficulty_model()
+        next_difficulty = model.recommend_level(user_id)
+        skill_difficulties = {
+            skill: model.recommend_difficulty(user_id, skill)
+            for skill in model.skills(user_id)
+        }
         
-        # Generate recommended activities based on metrics and preferences
-        recommended = []
+        # Start with what other children went on to do after these activities
+        recommended = get_activity_recommender().recommend(recent_activities[-10:], limit=3)
         
         # Add activities for improvement
         for area in metrics.areas_for_improvement:
@@ -161,31 +175,19 @@ class ProgressTrackerAgent(BaseCrewAgent):
         
         return ProgressRecommendation(
             next_difficulty=next_difficulty,
+            skill_difficulties=skill_difficulties,
             recommended_activities=recommended,
             personalized_goals=goals,
             celebration_message=celebration
         )
     
-    def _determine_level(self, average_score: float) -> str:
-        """Determine user's current level based on average score"""
-        if average_score >= 0.8:
-            return "advanced"
-        elif average_score >= 0.6:
-            return "intermediate"
-        else:
-            return "beginner"
-    
-    def _get_next_difficulty(self, current_level: str, average_score: float) -> str:
-        """Determine next appropriate difficulty level"""
-        levels = ["beginner", "intermediate", "advanced"]
-        current_idx = levels.index(current_level)
-        
-        if average_score >= 0.8 and current_idx < len(levels) - 1:
-            return levels[current_idx + 1]
-        elif average_score < 0.6 and current_idx > 0:
-            return levels[current_idx - 1]
-        else:
-            return current_level
+    def _determine_level(self, activities: ActivityView) -> str:
+        """Level the user is currently playing at: that of their latest activity"""
+        for slot in activities.chronological()[::-1]:
+            difficulty = normalize_difficulty(activities.difficulty_name(slot))
+            if difficulty is not None:
+                return LEVEL_FOR_DIFFICULTY[difficulty]
+        return "beginner"
     
     def _generate_celebration_message(self, metrics: LearningMetrics) -> str:
         """Generate a personalized celebration message"""
@@ -2,6 +2,7 @@ from typing import Dict, Any, List
 from pydantic import BaseModel
 from .base_agent import BaseCrewAgent
 from ..config.agent_config import AGENT_CONFIGS
+from ..services.safety_filter import get_safety_filter
 
 class StoryScene(BaseModel):
     scene_number: int
@@ -23,7 +24,7 @@ class StoryGeneratorAgent(BaseCrewAgent):
     def __init__(self):
         super().__init__(AGENT_CONFIGS["story_generator"])
         
-    async def process(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    async def process(self, data: Dict[str, Any]) -> StoryContent:
         """
         Generate an educational story based on the input data
         
@@ -34,7 +35,7 @@ class StoryGeneratorAgent(BaseCrewAgent):
                 - age_group: Target age group (e.g., "2-4 years")
         
         Returns:
-            Dictionary containing the generated story content
+            The generated story content, with any blocklisted terms masked
         """
         # Create story outline
         story = await self._generate_story_outline(data)
@@ -45,7 +46,7 @@ class StoryGeneratorAgent(BaseCrewAgent):
         # Add parent tips
         story.parent_tips = await self._generate_parent_tips(story)
         
-        return story.dict()
+        return get_safety_filter().screen(story, ["en"], "story")
     
     async def _generate_story_outline(self, data: Dict[str, Any]) -> StoryContent:
         """Generate the basic story structure"""
@@ -2,6 +2,8 @@ from typing import Dict, Any, List, Optional
 from pydantic import BaseModel
 from .base_agent import BaseCrewAgent
 from ..config.agent_config import AGENT_CONFIGS, SUPPORTED_LANGUAGES
+from ..services.safety_filter import get_safety_filter
+from ..services.ui_catalog import SOURCE_LANGUAGE, get_ui_catalog
 
 class TranslationRequest(BaseModel):
     text: str
@@ -22,7 +24,7 @@ class TranslationAgent(BaseCrewAgent):
     def __init__(self):
         super().__init__(AGENT_CONFIGS["translation"])
         
-    async def process(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    async def process(self, data: Dict[str, Any]) -> TranslatedContent:
         """
         Translate content while maintaining educational value and cultural context
         
@@ -35,7 +37,8 @@ class TranslationAgent(BaseCrewAgent):
                 - content_type: Type of content being translated
         
         Returns:
-            Dictionary containing translated content and additional information
+            Translated content and additional information, with any
+            blocklisted terms (in either language) masked
         """
         # Validate languages
         if data['target_language'] not in SUPPORTED_LANGUAGES:
@@ -47,7 +50,11 @@ class TranslationAgent(BaseCrewAgent):
         # Process translation
         translation = await self._translate_content(request)
         
-        return translation.dict()
+        return get_safety_filter().screen(
+            translation,
+            [request.target_language, request.source_language],
+            f"{request.content_type} translation"
+        )
     
     async def _translate_content(self, request: TranslationRequest) -> TranslatedContent:
         """Translate content based on type and context"""
@@ -101,6 +108,19 @@ class TranslationAgent(BaseCrewAgent):
     
     async def _translate_ui(self, request: TranslationRequest) -> TranslatedContent:
         """Translate UI elements with consistency and clarity"""
+        # Known UI strings have fixed translations in the compiled catalog
+        translated = None
+        if request.source_language == SOURCE_LANGUAGE:
+            translated = get_ui_catalog().lookup(request.text, request.target_language)
+        if translated is not None:
+            return TranslatedContent(
+                original_text=request.text,
+                translated_text=translated,
+                language=request.target_language,
+                content_type="ui",
+                cultural_notes=[]
+            )
+
         translated = f"Translated UI: {request.text}"
         
         cultural_notes = [
@@ -1,8 +1,19 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+import asyncio
 import logging
 from typing import Dict, Any
+from ..services.image_variants import get_image_variant_service
+from ..services.counting_scene import get_counting_scene_service
+from ..services.game_sessions import get_game_sessions
+from ..services.analytics import get_analytics
+from ..services.audio_sprites import get_audio_sprite_service
+from ..services.progress_db import get_activity_recorder
+from ..services.safety_filter import get_safety_filter
+from ..services.ui_catalog import get_ui_catalog
+from ..services.content_generation import get_agents
+from ..db.engine import dispose_engine
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -28,6 +39,32 @@ app.add_middleware(
 async def health_check():
     return {"status": "healthy", "version": "1.0.0"}
 
+@app.on_event("startup")
+async def warm_caches():
+    # Counting scenes are generated in the background so games never wait on layout
+    asyncio.create_task(get_counting_scene_service().warm())
+    # Compile the blocklists before the first generated story needs them
+    get_safety_filter()
+    # Map the UI string catalog (compiling it if the translations changed)
+    get_ui_catalog()
+    # Say so up front when sound games would go out without audio
+    get_audio_sprite_service().check()
+    # Build the shared agents in a thread; building them blocks for tens of ms each
+    await asyncio.to_thread(get_agents)
+    get_analytics().start()
+    # Copy progress events into the database as they are logged
+    get_activity_recorder().start()
+
+@app.on_event("shutdown")
+async def shutdown_worker_pools():
+    get_image_variant_service().shutdown()
+    get_counting_scene_service().shutdown()
+    # Store and acknowledge whatever play events are still queued
+    await get_game_sessions().close()
+    await get_activity_recorder().stop()
+    await dispose_engine()
+    await get_analytics().stop()
+
 # Error handler
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
@@ -37,10 +74,14 @@ async def http_exception_handler(request, exc):
     )
 
 # Import routers
-from .routers import stories, games, progress, translations
+from .routers import stories, games, lessons, progress, translations, sync, images, audio
 
 # Include routers
 app.include_router(stories.router, prefix="/api/stories", tags=["stories"])
 app.include_router(games.router, prefix="/api/games", tags=["games"])
+app.include_router(lessons.router, prefix="/api/lessons", tags=["lessons"])
 app.include_router(progress.router, prefix="/api/progress", tags=["progress"])
-app.include_router(translations.router, prefix="/api/translations", tags=["translations"]) 
\ No newline at end of file
+app.include_router(translations.router, prefix="/api/translations", tags=["translations"]) 
+app.include_router(sync.router, prefix="/api/sync", tags=["sync"])
+app.include_router(images.router, prefix="/api/images", tags=["images"])
+app.include_router(audio.router, prefix="/api/audio", tags=["audio"])
\ No newline at end of file
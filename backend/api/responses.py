@@ -0,0 +1,118 @@
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Mapping, Set, Tuple, Type
+from fastapi import Request
+from pydantic import BaseModel
+from starlette.responses import FileResponse, Response
+from ..services.content_pack import PackEntry
+
+class PackedContentResponse(Response):
+    """
+    Sends a pre-serialized body straight from the memory-mapped content pack.
+
+    The body is a memoryview slice of the pack, handed to the server as-is:
+    no JSON decoding, no response-model validation and no copy into a bytes
+    object.
+    """
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        body: memoryview,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        content_encoding: Optional[str] = None
+    ):
+        self.status_code = status_code
+        self.background = None
+        self.body = body
+        self.init_headers(headers)
+        if content_encoding:
+            self.headers["content-encoding"] = content_encoding
+            self.headers["vary"] = "Accept-Encoding"
+
+def packed_response(entry: PackEntry, request: Request) -> Response:
+    """Build the response for a content pack hit, honouring caching and encoding"""
+    headers = {"etag": entry.etag, "cache-control": "public, max-age=3600"}
+
+    if request.headers.get("if-none-match") == entry.etag:
+        return Response(status_code=304, headers=headers)
+
+    accepts_gzip = "gzip" in request.headers.get("accept-encoding", "")
+    if entry.content_encoding == "gzip" and not accepts_gzip:
+        # Rare: clients that can't take gzip get a decoded copy
+        return Response(content=entry.decoded_bytes(), media_type="application/json", headers=headers)
+
+    return PackedContentResponse(entry.body, headers=headers, content_encoding=entry.content_encoding)
+
+@lru_cache(maxsize=None)
+def response_fields(response_model: Type[BaseModel]) -> Set[str]:
+    return set(response_model.model_fields)
+
+def model_json(model: BaseModel, response_model: Optional[Type[BaseModel]] = None) -> bytes:
+    """
+    Serialize an agent's model as response_model would send it, in one pass.
+
+    Only the response model's fields are written; the agent's model must have
+    them all, with compatible types, as it isn't validated again.
+    """
+    include = response_fields(response_model) if response_model is not None else None
+    # model_dump_json() without the decode to str (and our encode back to bytes)
+    return model.__pydantic_serializer__.to_json(model, include=include)
+
+def model_response(model: BaseModel, response_model: Optional[Type[BaseModel]] = None) -> Response:
+    """A JSON response straight from a model, skipping FastAPI's response-model pass"""
+    return Response(content=model_json(model, response_model), media_type="application/json")
+
+def parse_byte_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range Range header into an inclusive (start, end).
+
+    Returns None when the header should be ignored (other units, malformed
+    or multi-range requests), in which case the full body is sent.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    first, dash, last = spec.strip().partition("-")
+    if not dash:
+        return None
+    try:
+        if not first:
+            # Suffix range: the last N bytes
+            return max(size - int(last), 0), size - 1
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    except ValueError:
+        return None
+    return start, end
+
+def byte_range_response(path: Path, request: Request, media_type: str, headers: Mapping[str, str]) -> Response:
+    """Serve a file, honouring Range (206/416), If-Range and If-None-Match"""
+    size = path.stat().st_size
+    headers = {**headers, "accept-ranges": "bytes"}
+    etag = headers.get("etag")
+
+    if etag and request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    byte_range = parse_byte_range(range_header, size) if range_header and (not if_range or if_range == etag) else None
+    if byte_range is None:
+        return FileResponse(path, media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    if start >= size or start > end:
+        return Response(status_code=416, headers={**headers, "content-range": f"bytes */{size}"})
+
+    with open(path, "rb") as f:
+        data = os.pread(f.fileno(), end - start + 1, start)
+    return Response(
+        content=data,
+        status_code=206,
+        media_type=media_type,
+        headers={**headers, "content-range": f"bytes {start}-{end}/{size}"}
+    )
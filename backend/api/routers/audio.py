@@ -0,0 +1,38 @@
+from fastapi import APIRouter, HTTPException, Request
+from ...services.audio_sprites import get_audio_sprite_service
+from ..responses import byte_range_response
+
+router = APIRouter()
+
+SPRITES_URL = "/api/audio/sprites"
+
+# Sprite filenames embed a hash of their bytes, so they never change
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+@router.get("/sprites")
+async def get_sprite_index():
+    """Get the current animal sound sprite and the offsets of every clip in it"""
+    index = get_audio_sprite_service().index
+    if not index:
+        raise HTTPException(status_code=404, detail="No audio sprite has been built")
+    return {
+        "url": f"{SPRITES_URL}/{index['sprite']}",
+        "bytes": index["bytes"],
+        "sample_rate": index["sample_rate"],
+        "clips": index["clips"]
+    }
+
+@router.get("/sprites/{filename}")
+async def get_sprite(filename: str, request: Request):
+    """Serve a sprite, whole or by byte range, with long-lived immutable caching"""
+    path = get_audio_sprite_service().sprite_path(filename)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Audio sprite not found")
+
+    digest = filename.split(".")[1]
+    return byte_range_response(
+        path,
+        request,
+        media_type="audio/wav",
+        headers={"cache-control": IMMUTABLE_CACHE, "etag": f'"{digest}"'}
+    )
@@ -1,17 +1,28 @@
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any, List
-from pydantic import BaseModel
+import json
+from fastapi import APIRouter, HTTPException, Request, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response
+from typing import Dict, Any, List, Optional
+from pydantic import BaseModel, ValidationError
 from ...agents.agent_factory import AgentFactory
-from ...config.agent_config import PUZZLE_TYPES
+from ...config.agent_config import PUZZLE_TYPES, SUPPORTED_LANGUAGES
+from ...config.ui_strings import UI_CATALOGS
+from ...services.content_generation import generate_game as generate_game_content, game_key
+from ...services.content_pack import get_content_pack
+from ...services.counting_scene import COUNT_RANGE, SEEDS_PER_KEY, rendered_scene
+from ...services.adaptive_difficulty import get_difficulty_model
+from ...services.game_sessions import MAX_MESSAGE_BYTES, PlayEvent, SessionClosed, get_game_sessions
+from ...services.ui_catalog import get_ui_catalog
+from ..responses import model_response, packed_response
 
 router = APIRouter()
 
 class GameRequest(BaseModel):
     puzzle_type: str
-    difficulty: str
+    difficulty: Optional[str] = None  # chosen from the user's ability when omitted
     animal_theme: str
     lesson_theme: str
     language: str = "en"
+    user_id: Optional[str] = None
 
 class GameResponse(BaseModel):
     puzzle_type: str
@@ -22,9 +33,10 @@ class GameResponse(BaseModel):
     instructions: str
     reward_message: str
     learning_outcome: str
+    layout: Optional[Dict[str, Any]] = None
 
 @router.post("/generate", response_model=GameResponse)
-async def generate_game(request: GameRequest):
+async def generate_game(request: GameRequest, http_request: Request):
     """Generate a new educational game/puzzle"""
     try:
         # Validate puzzle type and difficulty
@@ -34,64 +46,68 @@ async def generate_game(request: GameRequest):
                 detail=f"Invalid puzzle type. Must be one of {list(PUZZLE_TYPES.keys())}"
             )
         
+        if request.difficulty is None:
+            # Anonymous requests get the difficulty for a new learner
+            request.difficulty = get_difficulty_model().recommend_difficulty(
+                request.user_id or "",
+                request.puzzle_type,
+                PUZZLE_TYPES[request.puzzle_type]
+            )
+        
         if request.difficulty not in PUZZLE_TYPES[request.puzzle_type]:
             raise HTTPException(
                 status_code=400,
                 detail=f"Invalid difficulty for {request.puzzle_type}"
             )
         
-        # Create game designer agent
-        game_agent = AgentFactory.create_agent("game")
-        
-        # Generate game
-        game_data = await game_agent.process({
-            "puzzle_type": request.puzzle_type,
-            "difficulty": request.difficulty,
-            "animal_theme": request.animal_theme,
-            "lesson_theme": request.lesson_theme
-        })
-        
-        # If translation is needed
-        if request.language != "en":
-            translation_agent = AgentFactory.create_agent("translation")
-            game_data = await translation_agent.process({
-                "text": game_data,
-                "target_language": request.language,
-                "content_type": "game",
-                "context": f"Educational game about {request.animal_theme}"
-            })
+        # Serve pre-generated content when available
+        entry = get_content_pack().get_entry(game_key(
+            request.puzzle_type,
+            request.difficulty,
+            request.animal_theme,
+            request.lesson_theme,
+            request.language
+        ))
+        if entry is not None:
+            return packed_response(entry, http_request)
+
+        # Generate game, translating it if needed
+        game = await generate_game_content(
+            puzzle_type=request.puzzle_type,
+            difficulty=request.difficulty,
+            animal_theme=request.animal_theme,
+            lesson_theme=request.lesson_theme,
+            language=request.language
+        )
         
-        return game_data
+        return model_response(game, GameResponse)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/types")
-async def get_game_types():
+async def get_game_types(language: str = "en"):
     """Get available game types and difficulties"""
-    return {
-        "puzzle_types": {
-            "shape_matching": {
-                "description": "Match shapes and patterns",
-                "difficulties": ["easy", "medium", "hard"],
-                "icon": "⬡"
-            },
-            "counting": {
-                "description": "Count objects and numbers",
-                "difficulties": ["easy", "medium", "hard"],
-                "icon": "🔢"
-            },
-            "animal_sounds": {
-                "description": "Match animals with their sounds",
-                "difficulties": ["easy", "medium", "hard"],
-                "icon": "🔊"
-            },
-            "memory": {
-                "description": "Find matching pairs of cards",
-                "difficulties": ["easy", "medium", "hard"],
-                "icon": "🎴"
-            }
-        }
-    }
+    if language not in SUPPORTED_LANGUAGES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported language. Must be one of {SUPPORTED_LANGUAGES}"
+        )
+    return get_ui_catalog().localize(UI_CATALOGS["game_types"], language)
+
+@router.get("/counting-scene")
+def get_counting_scene_image(
+    count: int = Query(..., ge=COUNT_RANGE.start, le=COUNT_RANGE.stop - 1),
+    animal_theme: str = Query(...),
+    seed: int = Query(..., ge=0, lt=SEEDS_PER_KEY)
+):
+    """Get the pre-rendered image of a counting scene"""
+    image = rendered_scene(count, animal_theme, seed)
+    # Scenes are deterministic for their key, so the image never changes
+    return Response(
+        content=image,
+        media_type="image/webp",
+        headers={"cache-control": "public, max-age=31536000, immutable"}
+    )
 
 @router.post("/submit-score")
 async def submit_game_score(
@@ -116,4 +132,81 @@ async def submit_game_score(
         
         return result
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e)) 
+
+@router.websocket("/session")
+async def game_session(
+    websocket: WebSocket,
+    user_id: Optional[str] = None,
+    game_id: Optional[str] = None,
+    puzzle_type: Optional[str] = None,
+    difficulty: Optional[str] = None,
+    animal: Optional[str] = None,
+    language: str = "en",
+    resume: Optional[str] = None
+):
+    """
+    Stream play events for one game.
+
+    Connect with user_id, game_id and puzzle_type (or resume=<token> after a
+    dropped connection). Send events as {"seq", "kind", ...} objects, or
+    {"events": [...]}; seqs start at 1 and increase by one. The server
+    answers {"type": "ack", "seq": n} once everything up to n is stored.
+    """
+    await websocket.accept()
+    sessions = get_game_sessions()
+
+    if resume:
+        session = sessions.resume(websocket, resume)
+        if session is None:
+            await websocket.send_json({"type": "error", "code": "session_expired"})
+            await websocket.close(code=4404)
+            return
+    else:
+        if not user_id or not game_id or puzzle_type not in PUZZLE_TYPES:
+            await websocket.send_json({
+                "type": "error",
+                "code": "invalid_session",
+                "detail": f"user_id, game_id and a puzzle_type from {list(PUZZLE_TYPES.keys())} are required"
+            })
+            await websocket.close(code=1008)
+            return
+        difficulty = difficulty or get_difficulty_model().recommend_difficulty(
+            user_id, puzzle_type, PUZZLE_TYPES[puzzle_type]
+        )
+        session = sessions.start(websocket, user_id, game_id, puzzle_type, difficulty, animal, language)
+        if session is None:
+            await websocket.close(code=1013, reason="too many sessions")
+            return
+
+    await websocket.send_json({
+        "type": "session",
+        "session_id": session.session_id,
+        "resume_token": sessions.resume_token(session),
+        "difficulty": session.difficulty,
+        "acked": session.acked,
+        **session.summary()
+    })
+
+    try:
+        while True:
+            text = await websocket.receive_text()
+            if len(text) > MAX_MESSAGE_BYTES:
+                await websocket.close(code=1009, reason="message too large")
+                break
+            try:
+                message = json.loads(text)
+                raw_events = message.get("events", [message]) if isinstance(message, dict) else message
+                events = [PlayEvent.model_validate(event) for event in raw_events]
+            except (ValueError, TypeError, AttributeError) as e:
+                detail = e.errors(include_url=False) if isinstance(e, ValidationError) else str(e)
+                await websocket.send_json({"type": "error", "code": "invalid_event", "detail": detail})
+                continue
+
+            _, expected = await sessions.receive(session, events)
+            if expected is not None:
+                await websocket.send_json({"type": "error", "code": "out_of_order", "expected": expected})
+    except (WebSocketDisconnect, SessionClosed):
+        pass
+    finally:
+        sessions.detach(session, websocket)
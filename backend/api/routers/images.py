@@ -0,0 +1,64 @@
+from fastapi import APIRouter, HTTPException, UploadFile, File
+from fastapi.responses import FileResponse
+from ...services.content_generation import get_agents
+from ...services.image_variants import get_image_variant_service, srcset_metadata
+from ..responses import model_response
+
+router = APIRouter()
+
+VARIANTS_URL = "/api/images/variants"
+
+# Uploads larger than this are rejected before decoding
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+
+# Variant filenames embed a hash of their bytes, so they never change
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+@router.get("/animals")
+async def list_animal_images():
+    """Get srcset metadata for every animal image"""
+    service = get_image_variant_service()
+    manifest = await service.listing()
+    return {
+        "images": [
+            srcset_metadata(name, entry, VARIANTS_URL)
+            for name, entry in manifest.items()
+        ]
+    }
+
+@router.get("/animals/{name}")
+async def get_animal_image(name: str):
+    """Get srcset metadata for one animal image, generating its variants if needed"""
+    service = get_image_variant_service()
+    try:
+        entry = await service.ensure(name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown image: {name}")
+    return srcset_metadata(name, entry, VARIANTS_URL)
+
+@router.get("/variants/{filename}")
+async def get_image_variant(filename: str):
+    """Serve a generated image variant with long-lived immutable caching"""
+    path = get_image_variant_service().variant_path(filename)
+    if path is None or not path.exists():
+        raise HTTPException(status_code=404, detail="Image variant not found")
+
+    return FileResponse(
+        path,
+        media_type=f"image/{path.suffix.lstrip('.')}",
+        headers={"cache-control": IMMUTABLE_CACHE}
+    )
+
+@router.post("/recognize")
+async def recognize_animal(image: UploadFile = File(...)):
+    """Identify which safari animal a photo shows"""
+    data = await image.read(MAX_UPLOAD_BYTES + 1)
+    if len(data) > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Image too large")
+
+    try:
+        return model_response(await get_agents()["image"].process({"image": data}))
+    except OSError:
+        raise HTTPException(status_code=400, detail="Unreadable image")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
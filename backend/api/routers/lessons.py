@@ -0,0 +1,139 @@
+import json
+import time
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
+from typing import Dict, Any, Optional, Union
+from pydantic import BaseModel
+from ...config.agent_config import PUZZLE_TYPES, SUPPORTED_LANGUAGES
+from ...services.adaptive_difficulty import get_difficulty_model
+from ...services.analytics import get_analytics
+from ...services.content_pack import PackEntry
+from ...services.lessons import generate_lesson, iter_lesson
+from ..responses import model_json
+from .games import GameResponse
+from .stories import StoryResponse
+
+router = APIRouter()
+
+class LessonRequest(BaseModel):
+    animal_name: str
+    lesson_theme: str
+    puzzle_type: str = next(iter(PUZZLE_TYPES))
+    difficulty: Optional[str] = None  # chosen from the user's ability when omitted
+    age_group: str = "2-4 years"
+    language: str = "en"
+    user_id: Optional[str] = None
+
+class LessonResponse(BaseModel):
+    story: StoryResponse
+    game: GameResponse
+    metadata: Dict[str, Any]
+
+COMPONENT_MODELS = {"story": StoryResponse, "game": GameResponse}
+
+def _component_json(name: str, data: Union[PackEntry, BaseModel]) -> bytes:
+    """A component's JSON as its own endpoint would send it"""
+    if isinstance(data, PackEntry):
+        return data.decoded_bytes()
+    return model_json(data, COMPONENT_MODELS[name])
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def _validate(request: LessonRequest) -> None:
+    if request.puzzle_type not in PUZZLE_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid puzzle type. Must be one of {list(PUZZLE_TYPES.keys())}"
+        )
+
+    if request.language not in SUPPORTED_LANGUAGES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported language. Must be one of {SUPPORTED_LANGUAGES}"
+        )
+
+    if request.difficulty is None:
+        request.difficulty = get_difficulty_model().recommend_difficulty(
+            request.user_id or "",
+            request.puzzle_type,
+            PUZZLE_TYPES[request.puzzle_type]
+        )
+
+    if request.difficulty not in PUZZLE_TYPES[request.puzzle_type]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid difficulty for {request.puzzle_type}"
+        )
+
+async def _stream_lesson(request: LessonRequest):
+    """NDJSON: one line per component as it finishes, then the metadata"""
+    start = time.perf_counter()
+    timings: Dict[str, Any] = {}
+    try:
+        async for name, data, timing in iter_lesson(
+            request.animal_name,
+            request.lesson_theme,
+            request.puzzle_type,
+            request.difficulty,
+            request.age_group,
+            request.language
+        ):
+            timings[name] = timing
+            yield (
+                b'{"component":' + _dumps(name)
+                + b',"data":' + _component_json(name, data)
+                + b',"timing":' + _dumps(timing) + b"}\n"
+            )
+    except Exception as e:
+        yield _dumps({"error": str(e)}) + b"\n"
+        return
+
+    timings["total_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    yield _dumps({"metadata": {
+        "difficulty": request.difficulty,
+        "puzzle_type": request.puzzle_type,
+        "language": request.language,
+        "timings": timings
+    }}) + b"\n"
+
+@router.post("/generate", response_model=LessonResponse)
+async def generate_full_lesson(request: LessonRequest, stream: bool = Query(False)):
+    """
+    Generate a lesson's story and game together, translated if needed.
+
+    With stream=true the response is NDJSON, one line per component as soon
+    as it is ready and a final metadata line.
+    """
+    _validate(request)
+    get_analytics().emit(
+        "lesson_started",
+        request.user_id,
+        animal=request.animal_name,
+        theme=request.lesson_theme,
+        puzzle_type=request.puzzle_type,
+        difficulty=request.difficulty,
+        language=request.language
+    )
+    if stream:
+        return StreamingResponse(_stream_lesson(request), media_type="application/x-ndjson")
+
+    try:
+        lesson = await generate_lesson(
+            animal_name=request.animal_name,
+            lesson_theme=request.lesson_theme,
+            puzzle_type=request.puzzle_type,
+            difficulty=request.difficulty,
+            age_group=request.age_group,
+            language=request.language,
+            metadata={"difficulty": request.difficulty, "puzzle_type": request.puzzle_type}
+        )
+        # Components are spliced in as serialized, not decoded and re-encoded
+        return Response(
+            content=b'{"story":' + _component_json("story", lesson["story"])
+            + b',"game":' + _component_json("game", lesson["game"])
+            + b',"metadata":' + _dumps(lesson["metadata"]) + b"}",
+            media_type="application/json"
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,19 +1,40 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict, Any, List
-from pydantic import BaseModel
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Dict, Any, List, Optional
+from pydantic import BaseModel, ConfigDict
+from datetime import date, datetime
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 from ...agents.agent_factory import AgentFactory
+from ...agents.progress_tracker import ProgressReport
+from ...config.agent_config import PUZZLE_TYPES
+from ...db.engine import get_session
+from ...db.queries import latest_activities
+from ...services.analytics import get_analytics
+from ...services.progress_events import ProgressEvent, get_progress_log
+from ...services.achievements import get_achievement_engine
+from ...services.progress_rollups import (
+    DAY,
+    MONTH,
+    WEEK,
+    get_progress_rollups,
+    recent_days,
+    recent_months,
+    recent_weeks
+)
+from ..responses import model_response
 
 router = APIRouter()
 
 class ProgressUpdate(BaseModel):
     user_id: str
-    activity_type: str
-    activity_id: str
+    activity_type: str  # story, or the puzzle type for games (shape_matching, counting, ...)
+    activity_id: str  # stable per activity (e.g. its content key), so histories can be compared
     score: float
     time_spent: int
     completion_status: bool
     difficulty: str
+    animal: Optional[str] = None  # animal character the activity featured
+    language: str = "en"
 
 class UserProgress(BaseModel):
     total_time_spent: int
@@ -26,32 +47,61 @@ class UserProgress(BaseModel):
 
 class ProgressRecommendation(BaseModel):
     next_difficulty: str
+    skill_difficulties: Dict[str, str] = {}
     recommended_activities: List[str]
     personalized_goals: List[str]
     celebration_message: str
 
-@router.post("/update", response_model=Dict[str, Any])
+class ProgressUpdateResponse(ProgressReport):
+    new_achievements: List[str]
+
+class ActivityRecord(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    activity_type: str
+    activity_id: str
+    score: float
+    time_spent: int
+    completion_status: bool
+    difficulty: str
+    animal: Optional[str] = None
+    language: str
+    occurred_at: datetime
+
+def user_history(user_id: str) -> Dict[str, Any]:
+    """Progress agent input built from the user's logged activity"""
+    return {
+        "user_id": user_id,
+        "activities": get_progress_log().recent(user_id),
+        "preferences": {}  # This would come from user preferences
+    }
+
+def track_progress(progress: ProgressUpdate) -> None:
+    analytics = get_analytics()
+    properties = {"activity_type": progress.activity_type, "activity_id": progress.activity_id}
+    analytics.emit("time_spent", progress.user_id, seconds=progress.time_spent, **properties)
+    if progress.completion_status:
+        event = "puzzle_completed" if progress.activity_type in PUZZLE_TYPES else "lesson_completed"
+        analytics.emit(event, progress.user_id, score=progress.score, difficulty=progress.difficulty, **properties)
+
+@router.post("/update", response_model=ProgressUpdateResponse)
 async def update_progress(progress: ProgressUpdate):
     """Update user progress with new activity data"""
     try:
-        progress_agent = AgentFactory.create_agent("progress")
+        # Log the event first: abilities and badges update as it is appended
+        achievements = get_achievement_engine()
+        earned_before = achievements.earned_ids(progress.user_id)
+        get_progress_log().append(ProgressEvent(**progress.dict(), timestamp=datetime.now()))
+        track_progress(progress)
         
-        result = await progress_agent.process({
-            "user_id": progress.user_id,
-            "recent_activities": [{
-                "activity_type": progress.activity_type,
-                "activity_id": progress.activity_id,
-                "score": progress.score,
-                "time_spent": progress.time_spent,
-                "completion_status": progress.completion_status,
-                "difficulty": progress.difficulty,
-                "timestamp": datetime.now()
-            }],
-            "current_level": "current",  # This would come from user profile
-            "preferences": {}  # This would come from user preferences
-        })
+        progress_agent = AgentFactory.create_agent("progress")
+        report = await progress_agent.process(user_history(progress.user_id))
         
-        return result
+        return model_response(ProgressUpdateResponse.model_construct(
+            metrics=report.metrics,
+            recommendations=report.recommendations,
+            new_achievements=sorted(achievements.earned_ids(progress.user_id) - earned_before)
+        ))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -61,12 +111,9 @@ async def get_user_progress(user_id: str):
     try:
         progress_agent = AgentFactory.create_agent("progress")
         
-        result = await progress_agent.process({
-            "user_id": user_id,
-            "request_type": "progress_report"
-        })
+        report = await progress_agent.process(user_history(user_id))
         
-        return result["metrics"]
+        return model_response(report.metrics, UserProgress)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -76,40 +123,40 @@ async def get_recommendations(user_id: str):
     try:
         progress_agent = AgentFactory.create_agent("progress")
         
-        result = await progress_agent.process({
-            "user_id": user_id,
-            "request_type": "recommendations"
-        })
+        report = await progress_agent.process(user_history(user_id))
         
-        return result["recommendations"]
+        return model_response(report.recommendations, ProgressRecommendation)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/history/{user_id}", response_model=List[ActivityRecord])
+async def get_history(
+    user_id: str,
+    limit: int = Query(50, ge=1, le=200),
+    session: AsyncSession = Depends(get_session)
+):
+    """Get user's most recent activities, newest first, from the database"""
+    try:
+        return [ActivityRecord.model_validate(row) for row in await latest_activities(session, user_id, limit)]
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=503, detail=f"Activity history unavailable: {e.__class__.__name__}")
+
+@router.get("/dashboard/{user_id}")
+async def get_dashboard(user_id: str):
+    """Get user's activity over recent days, weeks and months, per language"""
+    rollups = get_progress_rollups()
+    today = date.today()
+    return {
+        "languages": {
+            language: {category: rollup.to_dict() for category, rollup in categories.items()}
+            for language, categories in rollups.language_totals(user_id).items()
+        },
+        "daily": rollups.series(user_id, DAY, recent_days(today, 14)),
+        "weekly": rollups.series(user_id, WEEK, recent_weeks(today, 8)),
+        "monthly": rollups.series(user_id, MONTH, recent_months(today, 6))
+    }
+
 @router.get("/achievements/{user_id}")
 async def get_achievements(user_id: str):
     """Get user's achievements and badges"""
-    return {
-        "achievements": [
-            {
-                "id": "first_story",
-                "title": "Story Explorer",
-                "description": "Completed your first story",
-                "icon": "📚",
-                "earned": True
-            },
-            {
-                "id": "puzzle_master",
-                "title": "Puzzle Master",
-                "description": "Solved 5 puzzles perfectly",
-                "icon": "🧩",
-                "earned": False
-            },
-            {
-                "id": "animal_friend",
-                "title": "Animal Friend",
-                "description": "Met all safari animals",
-                "icon": "🦁",
-                "earned": False
-            }
-        ]
-    } 
\ No newline at end of file
+    return {"achievements": get_achievement_engine().achievements(user_id)}
@@ -1,7 +1,13 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Request, Depends
 from typing import Dict, Any, List
 from pydantic import BaseModel
-from ...agents.agent_factory import AgentFactory
+from ...config.agent_config import SUPPORTED_LANGUAGES
+from ...config.ui_strings import UI_CATALOGS
+from ...services.content_generation import generate_story as generate_story_content, story_key
+from ...services.content_pack import get_content_pack
+from ...services.analytics import get_analytics
+from ...services.ui_catalog import get_ui_catalog
+from ..responses import model_response, packed_response
 
 router = APIRouter()
 
@@ -19,61 +25,57 @@ class StoryResponse(BaseModel):
     parent_tips: List[str]
 
 @router.post("/generate", response_model=StoryResponse)
-async def generate_story(request: StoryRequest):
+async def generate_story(request: StoryRequest, http_request: Request):
     """Generate a new educational story"""
     try:
-        # Create story generator agent
-        story_agent = AgentFactory.create_agent("story")
-        
-        # Generate story
-        story_data = await story_agent.process({
-            "animal_name": request.animal_name,
-            "lesson_theme": request.lesson_theme,
-            "age_group": request.age_group
-        })
-        
-        # If translation is needed
-        if request.language != "en":
-            translation_agent = AgentFactory.create_agent("translation")
-            story_data = await translation_agent.process({
-                "text": story_data,
-                "target_language": request.language,
-                "content_type": "story",
-                "context": f"Children's story about {request.animal_name}"
-            })
+        analytics = get_analytics()
+        analytics.emit("animal_selected", animal=request.animal_name)
+        analytics.emit(
+            "story_viewed",
+            animal=request.animal_name,
+            theme=request.lesson_theme,
+            age_group=request.age_group,
+            language=request.language
+        )
+
+        # Serve pre-generated content when available
+        entry = get_content_pack().get_entry(story_key(
+            request.animal_name,
+            request.lesson_theme,
+            request.age_group,
+            request.language
+        ))
+        if entry is not None:
+            return packed_response(entry, http_request)
+
+        # Generate story, translating it if needed
+        story = await generate_story_content(
+            animal_name=request.animal_name,
+            lesson_theme=request.lesson_theme,
+            age_group=request.age_group,
+            language=request.language
+        )
         
-        return story_data
+        return model_response(story, StoryResponse)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/themes")
-async def get_story_themes():
+async def get_story_themes(language: str = "en"):
     """Get available story themes/lessons"""
-    return {
-        "themes": [
-            "Courage",
-            "Friendship",
-            "Sharing",
-            "Patience",
-            "Kindness",
-            "Perseverance",
-            "Honesty",
-            "Responsibility"
-        ]
-    }
+    if language not in SUPPORTED_LANGUAGES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported language. Must be one of {SUPPORTED_LANGUAGES}"
+        )
+    return get_ui_catalog().localize(UI_CATALOGS["themes"], language)
 
 @router.get("/animals")
-async def get_available_animals():
+async def get_available_animals(language: str = "en"):
     """Get available animal characters"""
-    return {
-        "animals": [
-            {"name": "Leo", "type": "Lion", "icon": "🦁"},
-            {"name": "Zuri", "type": "Zebra", "icon": "🦓"},
-            {"name": "Tembo", "type": "Elephant", "icon": "🐘"},
-            {"name": "Twiga", "type": "Giraffe", "icon": "🦒"},
-            {"name": "Kiboko", "type": "Hippo", "icon": "🦛"},
-            {"name": "Chui", "type": "Leopard", "icon": "🐆"},
-            {"name": "Nyati", "type": "Buffalo", "icon": "🐃"},
-            {"name": "Punda", "type": "Donkey", "icon": "🫏"}
-        ]
-    } 
\ No newline at end of file
+    if language not in SUPPORTED_LANGUAGES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported language. Must be one of {SUPPORTED_LANGUAGES}"
+        )
+    return get_ui_catalog().localize(UI_CATALOGS["animals"], language)
@@ -0,0 +1,88 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from typing import Dict, List, Optional, Iterator
+from pydantic import BaseModel
+import json
+import zlib
+from ...config.agent_config import SUPPORTED_LANGUAGES
+from ...services.content_pack import ContentPack
+from ...services.sync_index import SyncDiff, get_sync_index
+
+router = APIRouter()
+
+# Flush the compressor after roughly this many uncompressed bytes
+BUNDLE_CHUNK_BYTES = 64 * 1024
+
+class SyncRequest(BaseModel):
+    cursor: Optional[str] = None  # returned by the previous sync
+    manifest: Dict[str, str] = {}  # item id -> content hash held on the device
+    languages: List[str] = SUPPORTED_LANGUAGES
+
+def _bundle_lines(diff: SyncDiff, pack: ContentPack) -> Iterator[bytes]:
+    yield json.dumps({
+        "type": "header",
+        "cursor": diff.cursor,
+        "full": diff.full,
+        "upserts": len(diff.upserts),
+        "deletes": diff.deletes
+    }, ensure_ascii=False).encode("utf-8") + b"\n"
+
+    for item_id in diff.upserts:
+        entry = pack.get_entry(item_id)
+        if entry is None:
+            continue
+        # Bodies are already JSON; splice them in without re-encoding
+        yield (
+            b'{"type":"item","id":' + json.dumps(item_id).encode("utf-8")
+            + b',"hash":"' + entry.content_hash.hex().encode("ascii")
+            + b'","body":' + entry.decoded_bytes() + b"}\n"
+        )
+
+def _gzip_stream(lines: Iterator[bytes]) -> Iterator[bytes]:
+    """Compress NDJSON lines into a single gzip member, emitted in chunks"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    pending = 0
+    for line in lines:
+        chunk = compressor.compress(line)
+        pending += len(line)
+        if pending >= BUNDLE_CHUNK_BYTES:
+            chunk += compressor.flush(zlib.Z_SYNC_FLUSH)
+            pending = 0
+        if chunk:
+            yield chunk
+    yield compressor.flush()
+
+@router.post("/delta")
+async def sync_delta(request: SyncRequest):
+    """
+    Return the content a device is missing as one gzip-compressed NDJSON bundle
+
+    The first line is a header carrying the new cursor and the ids to delete;
+    each following line is a new or changed item with its hash and body.
+    """
+    unsupported = [language for language in request.languages if language not in SUPPORTED_LANGUAGES]
+    if unsupported:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported language. Must be one of {SUPPORTED_LANGUAGES}"
+        )
+
+    index, pack = get_sync_index()
+    diff = index.diff(request.cursor, request.manifest, request.languages)
+
+    return StreamingResponse(
+        _gzip_stream(_bundle_lines(diff, pack)),
+        media_type="application/x-ndjson",
+        headers={
+            "content-encoding": "gzip",
+            "x-sync-cursor": diff.cursor,
+            "x-sync-upserts": str(len(diff.upserts)),
+            "x-sync-deletes": str(len(diff.deletes))
+        }
+    )
+
+@router.get("/cursor")
+async def get_sync_cursor():
+    """Get the current content version, so devices can skip a sync when up to date"""
+    index, _ = get_sync_index()
+    return {"cursor": index.cursor, "items": len(index.items)}
@@ -3,6 +3,9 @@ from typing import Dict, Any, List
 from pydantic import BaseModel
 from ...agents.agent_factory import AgentFactory
 from ...config.agent_config import SUPPORTED_LANGUAGES
+from ...services.progress_rollups import get_progress_rollups, proficiency
+from ...services.ui_catalog import SOURCE_LANGUAGE, get_ui_catalog
+from ..responses import model_response
 
 router = APIRouter()
 
@@ -31,9 +34,21 @@ async def translate_content(request: TranslationRequest):
                 detail=f"Unsupported language. Must be one of {SUPPORTED_LANGUAGES}"
             )
         
+        # UI strings are answered from the compiled catalog without an agent
+        if request.content_type == "ui" and request.source_language == SOURCE_LANGUAGE:
+            translated = get_ui_catalog().lookup(request.text, request.target_language)
+            if translated is not None:
+                return model_response(TranslationResponse(
+                    original_text=request.text,
+                    translated_text=translated,
+                    language=request.target_language,
+                    content_type=request.content_type,
+                    cultural_notes=[]
+                ))
+
         translation_agent = AgentFactory.create_agent("translation")
         
-        result = await translation_agent.process({
+        translation = await translation_agent.process({
             "text": request.text,
             "source_language": request.source_language,
             "target_language": request.target_language,
@@ -41,7 +56,7 @@ async def translate_content(request: TranslationRequest):
             "content_type": request.content_type
         })
         
-        return result
+        return model_response(translation, TranslationResponse)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -74,25 +89,16 @@ async def get_supported_languages():
 @router.get("/language-progress/{user_id}")
 async def get_language_progress(user_id: str):
     """Get user's progress in different languages"""
+    totals = get_progress_rollups().language_totals(user_id)
     return {
         "languages": [
             {
-                "code": "en",
-                "proficiency": "native",
-                "stories_completed": 10,
-                "games_completed": 15
-            },
-            {
-                "code": "sw",
-                "proficiency": "learning",
-                "stories_completed": 5,
-                "games_completed": 8
-            },
-            {
-                "code": "fr",
-                "proficiency": "beginner",
-                "stories_completed": 2,
-                "games_completed": 3
+                "code": language,
+                "proficiency": proficiency(categories["stories"].completed + categories["games"].completed),
+                "stories_completed": categories["stories"].completed,
+                "games_completed": categories["games"].completed,
+                "time_spent": categories["stories"].time_spent + categories["games"].time_spent
             }
+            for language, categories in totals.items()
         ]
-    } 
\ No newline at end of file
+    }
@@ -0,0 +1,86 @@
+from typing import List, Optional
+from pydantic import BaseModel
+from .agent_config import PUZZLE_TYPES
+from .animal_assets import CHARACTER_SPECIES
+
+class AchievementRule(BaseModel):
+    id: str
+    title: str
+    description: str
+    icon: str
+    threshold: int  # events (or distinct values) needed to earn the badge
+    # Which events count; empty lists match anything
+    activity_types: List[str] = []
+    difficulties: List[str] = []
+    min_score: float = 0.0
+    completed: bool = True
+    # Count distinct values of this event field instead of events
+    distinct: Optional[str] = None
+    values: List[str] = []  # only these values count towards distinct
+
+GAME_ACTIVITY_TYPES = ["game", "puzzle", *PUZZLE_TYPES]
+
+# Badges, in display order
+ACHIEVEMENTS: List[AchievementRule] = [
+    AchievementRule(
+        id="first_story",
+        title="Story Explorer",
+        description="Completed your first story",
+        icon="📚",
+        threshold=1,
+        activity_types=["story"]
+    ),
+    AchievementRule(
+        id="bookworm",
+        title="Little Bookworm",
+        description="Completed 10 stories",
+        icon="📖",
+        threshold=10,
+        activity_types=["story"]
+    ),
+    AchievementRule(
+        id="puzzle_master",
+        title="Puzzle Master",
+        description="Solved 5 puzzles perfectly",
+        icon="🧩",
+        threshold=5,
+        activity_types=GAME_ACTIVITY_TYPES,
+        min_score=1.0
+    ),
+    AchievementRule(
+        id="counting_star",
+        title="Counting Star",
+        description="Finished 10 counting games",
+        icon="🔢",
+        threshold=10,
+        activity_types=["counting"]
+    ),
+    AchievementRule(
+        id="memory_champion",
+        title="Memory Champion",
+        description="Scored 80% or more on 3 hard memory games",
+        icon="🎴",
+        threshold=3,
+        activity_types=["memory"],
+        difficulties=["hard"],
+        min_score=0.8
+    ),
+    AchievementRule(
+        id="game_explorer",
+        title="Game Explorer",
+        description="Played every kind of game",
+        icon="🎮",
+        threshold=len(PUZZLE_TYPES),
+        activity_types=list(PUZZLE_TYPES),
+        distinct="activity_type"
+    ),
+    AchievementRule(
+        id="animal_friend",
+        title="Animal Friend",
+        description="Met all safari animals",
+        icon="🦁",
+        threshold=len(set(CHARACTER_SPECIES.values())),
+        distinct="animal",
+        values=sorted(set(CHARACTER_SPECIES.values()))
+    )
+]
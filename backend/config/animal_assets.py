@@ -0,0 +1,74 @@
+from typing import Dict, List, Set
+
+# Species shown in each image under frontend/public/svannah_animals
+ANIMAL_IMAGES: Dict[str, str] = {
+    "croco.jpg": "Crocodile",
+    "duma.jpg": "Cheetah",
+    "eagle.jpg": "Eagle",
+    "fisi.jpg": "Hyena",
+    "flamingo2.jpg": "Flamingo",
+    "frog2.jpg": "Frog",
+    "gazelle.jpg": "Gazelle",
+    "kiboko.jpg": "Hippo",
+    "lion3.jpg": "Lion",
+    "mbuzi.jpg": "Goat",
+    "monkey3.jpg": "Monkey",
+    "ndovu2.jpg": "Elephant",
+    "nyati.jpg": "Buffalo",
+    "owl.jpg": "Owl",
+    "pig.jpg": "Pig",
+    "rhino.jpg": "Rhino",
+    "simba.jpg": "Lion",
+    "squirel.jpg": "Squirrel",
+    "tortoise.jpg": "Tortoise",
+    "tortoise3.jpg": "Tortoise",
+    "twiga.jpg": "Giraffe",
+    "zebra.jpg": "Zebra"
+}
+
+def species_for_image(filename: str) -> str:
+    """Species for an image file; unknown files fall back to their name"""
+    return ANIMAL_IMAGES.get(filename, filename.rsplit(".", 1)[0].rstrip("0123456789").capitalize())
+
+def species_for_sound(filename: str) -> str:
+    """Species for a sound clip named like an image (ndovu2.wav), a character (tembo.wav) or a species (lion.wav)"""
+    stem = filename.rsplit(".", 1)[0]
+    for image, species in ANIMAL_IMAGES.items():
+        if image.rsplit(".", 1)[0] == stem:
+            return species
+    return species_for_theme(stem.rstrip("0123456789"))
+
+# Catalog characters (see /api/stories/animals) and the species they are
+CHARACTER_SPECIES: Dict[str, str] = {
+    "leo": "Lion",
+    "zuri": "Zebra",
+    "tembo": "Elephant",
+    "twiga": "Giraffe",
+    "kiboko": "Hippo",
+    "chui": "Leopard",
+    "nyati": "Buffalo",
+    "punda": "Donkey"
+}
+
+# Animals toddlers easily confuse with each other (colour, shape or markings)
+LOOKALIKE_GROUPS: List[Set[str]] = [
+    {"Lion", "Cheetah", "Hyena"},
+    {"Cheetah", "Giraffe", "Gazelle"},
+    {"Gazelle", "Goat", "Buffalo"},
+    {"Elephant", "Hippo", "Rhino"},
+    {"Eagle", "Owl"},
+    {"Crocodile", "Frog", "Tortoise"},
+    {"Monkey", "Squirrel"},
+    {"Pig", "Hippo"}
+]
+
+def species_for_theme(animal_theme: str) -> str:
+    """Species for a catalog character name, or the theme itself if it names a species"""
+    return CHARACTER_SPECIES.get(animal_theme.strip().lower(), animal_theme.strip().capitalize())
+
+def images_by_species() -> Dict[str, str]:
+    """One representative image per species"""
+    images: Dict[str, str] = {}
+    for filename, species in ANIMAL_IMAGES.items():
+        images.setdefault(species, filename)
+    return images
@@ -0,0 +1,59 @@
+import os
+from pathlib import Path
+
+# Project layout
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+PROJECT_ROOT = BACKEND_DIR.parent
+
+# Writable runtime data (content packs, checkpoints, caches)
+DATA_DIR = Path(os.getenv("SAFARI_DATA_DIR", BACKEND_DIR / "data"))
+
+# Per-language blocklists (<language>.txt) screened against all generated text
+BLOCKLISTS_DIR = Path(os.getenv("BLOCKLISTS_DIR", BACKEND_DIR / "config" / "blocklists"))
+
+# Hand-written UI string translations (<language>.json) and the compiled catalog
+UI_TRANSLATIONS_DIR = Path(os.getenv("UI_TRANSLATIONS_DIR", BACKEND_DIR / "config" / "ui_translations"))
+UI_CATALOG_PATH = Path(os.getenv("UI_CATALOG_PATH", DATA_DIR / "ui_catalog.bin"))
+
+# Pre-generated content pack served before falling back to live generation
+CONTENT_PACK_PATH = Path(os.getenv("CONTENT_PACK_PATH", DATA_DIR / "content_pack.bin"))
+# Delta-sync change log over the pack's versions, shared by every worker
+SYNC_CHANGELOG_PATH = Path(os.getenv("SYNC_CHANGELOG_PATH", CONTENT_PACK_PATH.with_suffix(".sync.json")))
+
+# Animal artwork shipped with the frontend, and where resized variants go
+ANIMAL_IMAGES_DIR = Path(os.getenv("ANIMAL_IMAGES_DIR", PROJECT_ROOT / "frontend" / "public" / "svannah_animals"))
+IMAGE_VARIANTS_DIR = Path(os.getenv("IMAGE_VARIANTS_DIR", DATA_DIR / "image_variants"))
+
+# Perceptual-hash index over the animal images
+IMAGE_HASH_INDEX_PATH = Path(os.getenv("IMAGE_HASH_INDEX_PATH", DATA_DIR / "image_hashes.json"))
+
+# Per-animal sound clips (one WAV per species) and the audio sprites built from them
+ANIMAL_SOUNDS_DIR = Path(os.getenv("ANIMAL_SOUNDS_DIR", PROJECT_ROOT / "frontend" / "public" / "animal_sounds"))
+AUDIO_SPRITES_DIR = Path(os.getenv("AUDIO_SPRITES_DIR", DATA_DIR / "audio_sprites"))
+
+# Learner activity event log and the models built from it
+PROGRESS_EVENTS_PATH = Path(os.getenv("PROGRESS_EVENTS_PATH", DATA_DIR / "progress_events.jsonl"))
+ABILITY_MODEL_PATH = Path(os.getenv("ABILITY_MODEL_PATH", DATA_DIR / "ability_model.json"))
+RECOMMENDATIONS_PATH = Path(os.getenv("RECOMMENDATIONS_PATH", DATA_DIR / "recommendations.json"))
+ACHIEVEMENTS_PATH = Path(os.getenv("ACHIEVEMENTS_PATH", DATA_DIR / "achievements.json"))
+PROGRESS_ROLLUPS_PATH = Path(os.getenv("PROGRESS_ROLLUPS_PATH", DATA_DIR / "progress_rollups.json"))
+
+# Fine-grained play events streamed over game-session WebSockets
+GAME_EVENTS_PATH = Path(os.getenv("GAME_EVENTS_PATH", DATA_DIR / "game_events.jsonl"))
+
+# Signs game-session resume tokens; random per process unless set
+SESSION_SECRET = os.getenv("SESSION_SECRET")
+
+# Database: SQLite (aiosqlite) locally, Postgres (asyncpg) in production
+DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite+aiosqlite:///{DATA_DIR / 'safari.db'}")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_ECHO = os.getenv("DB_ECHO", "").lower() in ("1", "true", "yes")
+
+# Analytics: Mixpanel when a token is set, otherwise a local JSONL file;
+# batches the sink can't take are spooled to disk and replayed
+MIXPANEL_TOKEN = os.getenv("MIXPANEL_TOKEN", "")
+ANALYTICS_FILE = Path(os.getenv("ANALYTICS_FILE", DATA_DIR / "analytics_events.jsonl"))
+ANALYTICS_SPOOL_DIR = Path(os.getenv("ANALYTICS_SPOOL_DIR", DATA_DIR / "analytics_spool"))
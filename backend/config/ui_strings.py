@@ -0,0 +1,60 @@
+from typing import Any, Dict, List
+
+# Keys whose string values are shown to children and get translated;
+# everything else in a catalog (names, icons, ids) is passed through as is
+UI_FIELDS = {"themes", "type", "description"}
+
+# Story themes/lessons (see /api/stories/themes)
+STORY_THEMES: List[str] = [
+    "Courage",
+    "Friendship",
+    "Sharing",
+    "Patience",
+    "Kindness",
+    "Perseverance",
+    "Honesty",
+    "Responsibility"
+]
+
+# Animal characters (see /api/stories/animals)
+AVAILABLE_ANIMALS: List[Dict[str, str]] = [
+    {"name": "Leo", "type": "Lion", "icon": "🦁"},
+    {"name": "Zuri", "type": "Zebra", "icon": "🦓"},
+    {"name": "Tembo", "type": "Elephant", "icon": "🐘"},
+    {"name": "Twiga", "type": "Giraffe", "icon": "🦒"},
+    {"name": "Kiboko", "type": "Hippo", "icon": "🦛"},
+    {"name": "Chui", "type": "Leopard", "icon": "🐆"},
+    {"name": "Nyati", "type": "Buffalo", "icon": "🐃"},
+    {"name": "Punda", "type": "Donkey", "icon": "🫏"}
+]
+
+# Game types and difficulties (see /api/games/types)
+GAME_TYPES: Dict[str, Dict[str, Any]] = {
+    "shape_matching": {
+        "description": "Match shapes and patterns",
+        "difficulties": ["easy", "medium", "hard"],
+        "icon": "⬡"
+    },
+    "counting": {
+        "description": "Count objects and numbers",
+        "difficulties": ["easy", "medium", "hard"],
+        "icon": "🔢"
+    },
+    "animal_sounds": {
+        "description": "Match animals with their sounds",
+        "difficulties": ["easy", "medium", "hard"],
+        "icon": "🔊"
+    },
+    "memory": {
+        "description": "Find matching pairs of cards",
+        "difficulties": ["easy", "medium", "hard"],
+        "icon": "🎴"
+    }
+}
+
+# Static catalog payloads as the API returns them, by catalog name
+UI_CATALOGS: Dict[str, Dict[str, Any]] = {
+    "themes": {"themes": STORY_THEMES},
+    "animals": {"animals": AVAILABLE_ANIMALS},
+    "game_types": {"puzzle_types": GAME_TYPES}
+}
@@ -0,0 +1,15 @@
+"""
+Relational storage: async engine, models and the queries the API runs.
+
+Progress events are copied in from the progress event log, in batches, by
+services.progress_db; GET /api/progress/history reads them back with
+queries.latest_activities. The event log and its projections remain the
+source of truth for everything else progress serves.
+"""
+from .engine import async_database_url, create_engine, dispose_engine, get_engine, get_session, get_sessionmaker
+from .models import ActivityEvent, Base, GeneratedContent, Translation, User
+
+__all__ = [
+    "async_database_url", "create_engine", "dispose_engine", "get_engine", "get_session", "get_sessionmaker",
+    "ActivityEvent", "Base", "GeneratedContent", "Translation", "User"
+]
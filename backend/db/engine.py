@@ -0,0 +1,88 @@
+"""
+Async engine and sessions.
+
+DATABASE_URL picks the backend: sqlite+aiosqlite for local development,
+postgresql+asyncpg in production (plain postgres:// and postgresql:// URLs
+are upgraded to the asyncpg driver). Postgres gets a bounded connection
+pool with pre-ping and recycling; SQLite runs in WAL mode with foreign keys
+enforced.
+"""
+from pathlib import Path
+from typing import AsyncIterator, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from ..config.settings import (
+    DATABASE_URL,
+    DB_ECHO,
+    DB_MAX_OVERFLOW,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT
+)
+
+def async_database_url(url: str = DATABASE_URL) -> str:
+    """The URL with an async driver: asyncpg for Postgres, aiosqlite for SQLite"""
+    parsed = make_url(url)
+    driver = {"postgres": "postgresql+asyncpg", "postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+    if parsed.drivername in driver:
+        parsed = parsed.set(drivername=driver[parsed.drivername])
+    return parsed.render_as_string(hide_password=False)
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+def create_engine(url: str = DATABASE_URL) -> AsyncEngine:
+    url = async_database_url(url)
+    parsed = make_url(url)
+
+    if parsed.get_backend_name() == "sqlite":
+        if parsed.database and parsed.database != ":memory:":
+            Path(parsed.database).parent.mkdir(parents=True, exist_ok=True)
+        engine = create_async_engine(url, echo=DB_ECHO)
+        event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
+        return engine
+
+    return create_async_engine(
+        url,
+        echo=DB_ECHO,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=True
+    )
+
+_engine: Optional[AsyncEngine] = None
+_sessionmaker: Optional[async_sessionmaker] = None
+
+def get_engine() -> AsyncEngine:
+    global _engine, _sessionmaker
+    if _engine is None:
+        _engine = create_engine()
+        _sessionmaker = async_sessionmaker(_engine, expire_on_commit=False)
+    return _engine
+
+def get_sessionmaker() -> async_sessionmaker:
+    get_engine()
+    return _sessionmaker
+
+async def get_session() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency: a session per request, rolled back if the request fails"""
+    async with get_sessionmaker()() as session:
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+
+async def dispose_engine() -> None:
+    """Close pooled connections, e.g. on shutdown"""
+    global _engine, _sessionmaker
+    if _engine is not None:
+        await _engine.dispose()
+        _engine, _sessionmaker = None, None
@@ -0,0 +1,121 @@
+"""
+Relational schema: users, their activity events, generated content and
+translations.
+
+Indexes follow the hot queries:
+- latest N activities of a user: (user_id, occurred_at, id)
+- per-type aggregates for a user: (user_id, activity_type, occurred_at),
+  covering score, time spent and completion on Postgres
+- content by request key (services.content_generation.content_key): unique key
+- cached translations by source text hash and target language: unique pair
+"""
+from datetime import datetime
+from typing import Any, List, Optional
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Boolean,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Text,
+    UniqueConstraint,
+    func
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+
+# Stable constraint names, so migrations can refer to them on every backend
+NAMING_CONVENTION = {
+    "ix": "ix_%(table_name)s_%(column_0_N_name)s",
+    "uq": "uq_%(table_name)s_%(column_0_N_name)s",
+    "ck": "ck_%(table_name)s_%(constraint_name)s",
+    "fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s",
+    "pk": "pk_%(table_name)s"
+}
+
+# 64-bit ids on Postgres; SQLite only autoincrements INTEGER primary keys
+BigId = BigInteger().with_variant(Integer, "sqlite")
+JsonDocument = JSON().with_variant(JSONB, "postgresql")
+
+class Base(DeclarativeBase):
+    metadata = MetaData(naming_convention=NAMING_CONVENTION)
+
+class User(Base):
+    __tablename__ = "users"
+
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    display_name: Mapped[Optional[str]] = mapped_column(String(120))
+    age_group: Mapped[Optional[str]] = mapped_column(String(32))
+    preferred_language: Mapped[str] = mapped_column(String(8), default="en", server_default="en")
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    last_active_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+
+    activities: Mapped[List["ActivityEvent"]] = relationship(back_populates="user", passive_deletes=True)
+
+class ActivityEvent(Base):
+    __tablename__ = "activity_events"
+
+    id: Mapped[int] = mapped_column(BigId, primary_key=True, autoincrement=True)
+    user_id: Mapped[str] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    activity_type: Mapped[str] = mapped_column(String(32))  # story, or the puzzle type
+    activity_id: Mapped[str] = mapped_column(String(255))
+    score: Mapped[float] = mapped_column(Float)
+    time_spent: Mapped[int] = mapped_column(Integer)
+    completion_status: Mapped[bool] = mapped_column(Boolean)
+    difficulty: Mapped[str] = mapped_column(String(16))
+    animal: Mapped[Optional[str]] = mapped_column(String(64))
+    language: Mapped[str] = mapped_column(String(8), default="en", server_default="en")
+    occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
+    user: Mapped[User] = relationship(back_populates="activities")
+
+    __table_args__ = (
+        Index("ix_activity_events_user_recent", "user_id", "occurred_at", "id"),
+        Index(
+            "ix_activity_events_user_type",
+            "user_id", "activity_type", "occurred_at",
+            postgresql_include=["score", "time_spent", "completion_status"]
+        ),
+    )
+
+class GeneratedContent(Base):
+    __tablename__ = "generated_content"
+
+    id: Mapped[int] = mapped_column(BigId, primary_key=True, autoincrement=True)
+    request_key: Mapped[str] = mapped_column(String(512), unique=True)
+    kind: Mapped[str] = mapped_column(String(16))  # story, game, catalog
+    language: Mapped[str] = mapped_column(String(8))
+    payload: Mapped[Any] = mapped_column(JsonDocument)
+    content_hash: Mapped[str] = mapped_column(String(64))
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_generated_content_kind_language", "kind", "language"),
+    )
+
+class Translation(Base):
+    __tablename__ = "translations"
+
+    id: Mapped[int] = mapped_column(BigId, primary_key=True, autoincrement=True)
+    source_hash: Mapped[str] = mapped_column(String(64))  # sha256 of source text, language and context
+    source_language: Mapped[str] = mapped_column(String(8))
+    target_language: Mapped[str] = mapped_column(String(8))
+    content_type: Mapped[str] = mapped_column(String(32))
+    source_text: Mapped[str] = mapped_column(Text)
+    translated_text: Mapped[str] = mapped_column(Text)
+    cultural_notes: Mapped[Any] = mapped_column(JsonDocument, default=list)
+    pronunciation_guide: Mapped[Optional[str]] = mapped_column(Text)
+    content_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("generated_content.id", ondelete="SET NULL"),
+        index=True
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("source_hash", "target_language"),
+    )
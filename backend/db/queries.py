@@ -0,0 +1,132 @@
+"""Queries the API runs on every request, each served by one index"""
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import case, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..services.progress_events import ProgressEvent
+from .models import ActivityEvent, GeneratedContent, Translation, User
+
+def _insert(session: AsyncSession, model):
+    """INSERT supporting ON CONFLICT on both Postgres and SQLite"""
+    dialect = session.get_bind().dialect.name
+    return (postgresql.insert if dialect == "postgresql" else sqlite.insert)(model)
+
+async def ensure_user(session: AsyncSession, user_id: str, **fields: Any) -> None:
+    await session.execute(
+        _insert(session, User).values(id=user_id, **fields).on_conflict_do_nothing(index_elements=[User.id])
+    )
+
+async def record_activities(session: AsyncSession, events: List[ProgressEvent]) -> None:
+    """Insert progress events in one statement, creating any users not seen before"""
+    if not events:
+        return
+    user_ids = sorted({event.user_id for event in events})
+    await session.execute(
+        _insert(session, User).values([{"id": user_id} for user_id in user_ids])
+        .on_conflict_do_nothing(index_elements=[User.id])
+    )
+    await session.execute(
+        _insert(session, ActivityEvent),
+        [
+            {
+                **event.model_dump(exclude={"timestamp"}),
+                "occurred_at": event.timestamp
+            }
+            for event in events
+        ]
+    )
+    latest: Dict[str, datetime] = {}
+    for event in events:
+        latest[event.user_id] = max(latest.get(event.user_id, event.timestamp), event.timestamp)
+    # SQLite's two-argument max() is Postgres' greatest()
+    greatest = func.max if session.get_bind().dialect.name == "sqlite" else func.greatest
+    for user_id, timestamp in latest.items():
+        await session.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(last_active_at=greatest(func.coalesce(User.last_active_at, timestamp), timestamp))
+        )
+
+async def latest_activities(session: AsyncSession, user_id: str, limit: int = 50) -> List[ActivityEvent]:
+    """A user's most recent activities, newest first (ix_activity_events_user_recent)"""
+    result = await session.execute(
+        select(ActivityEvent)
+        .where(ActivityEvent.user_id == user_id)
+        .order_by(ActivityEvent.occurred_at.desc(), ActivityEvent.id.desc())
+        .limit(limit)
+    )
+    return list(result.scalars())
+
+async def activity_aggregates(
+    session: AsyncSession,
+    user_id: str,
+    since: Optional[datetime] = None
+) -> Dict[str, Dict[str, float]]:
+    """Per activity type totals for a user (ix_activity_events_user_type)"""
+    query = (
+        select(
+            ActivityEvent.activity_type,
+            func.count().label("activities"),
+            func.sum(case((ActivityEvent.completion_status, 1), else_=0)).label("completed"),
+            func.avg(ActivityEvent.score).label("average_score"),
+            func.sum(ActivityEvent.time_spent).label("time_spent")
+        )
+        .where(ActivityEvent.user_id == user_id)
+        .group_by(ActivityEvent.activity_type)
+    )
+    if since is not None:
+        query = query.where(ActivityEvent.occurred_at >= since)
+
+    result = await session.execute(query)
+    return {
+        row.activity_type: {
+            "activities": row.activities,
+            "completed": int(row.completed or 0),
+            "average_score": round(float(row.average_score or 0.0), 4),
+            "time_spent": int(row.time_spent or 0)
+        }
+        for row in result
+    }
+
+async def content_by_key(session: AsyncSession, request_key: str) -> Optional[GeneratedContent]:
+    """Generated content for a request key (unique index on request_key)"""
+    result = await session.execute(select(GeneratedContent).where(GeneratedContent.request_key == request_key))
+    return result.scalar_one_or_none()
+
+async def store_content(session: AsyncSession, request_key: str, kind: str, language: str, payload: Any) -> None:
+    """Insert or replace the content generated for a request key"""
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    values = {
+        "request_key": request_key,
+        "kind": kind,
+        "language": language,
+        "payload": payload,
+        "content_hash": hashlib.sha256(encoded).hexdigest()
+    }
+    statement = _insert(session, GeneratedContent).values(**values)
+    await session.execute(statement.on_conflict_do_update(
+        index_elements=[GeneratedContent.request_key],
+        set_={key: statement.excluded[key] for key in ("payload", "content_hash")}
+    ))
+
+def translation_hash(text: str, source_language: str, context: str = "") -> str:
+    return hashlib.sha256("\x1f".join((source_language, context, text)).encode("utf-8")).hexdigest()
+
+async def find_translation(
+    session: AsyncSession,
+    text: str,
+    source_language: str,
+    target_language: str,
+    context: str = ""
+) -> Optional[Translation]:
+    """A cached translation (unique index on source_hash, target_language)"""
+    result = await session.execute(
+        select(Translation).where(
+            Translation.source_hash == translation_hash(text, source_language, context),
+            Translation.target_language == target_language
+        )
+    )
+    return result.scalar_one_or_none()
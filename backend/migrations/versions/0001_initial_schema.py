@@ -0,0 +1,92 @@
+"""initial schema: users, activity events, generated content, translations
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 16:47:05.014371
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+big_id = sa.BigInteger().with_variant(sa.Integer(), 'sqlite')
+json_document = sa.JSON().with_variant(postgresql.JSONB(astext_type=sa.Text()), 'postgresql')
+
+def upgrade() -> None:
+    op.create_table('users',
+    sa.Column('id', sa.String(length=64), nullable=False),
+    sa.Column('display_name', sa.String(length=120), nullable=True),
+    sa.Column('age_group', sa.String(length=32), nullable=True),
+    sa.Column('preferred_language', sa.String(length=8), server_default='en', nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.Column('last_active_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_users'))
+    )
+
+    op.create_table('activity_events',
+    sa.Column('id', big_id, autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.String(length=64), nullable=False),
+    sa.Column('activity_type', sa.String(length=32), nullable=False),
+    sa.Column('activity_id', sa.String(length=255), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('time_spent', sa.Integer(), nullable=False),
+    sa.Column('completion_status', sa.Boolean(), nullable=False),
+    sa.Column('difficulty', sa.String(length=16), nullable=False),
+    sa.Column('animal', sa.String(length=64), nullable=True),
+    sa.Column('language', sa.String(length=8), server_default='en', nullable=False),
+    sa.Column('occurred_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_activity_events_user_id_users'), ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_activity_events'))
+    )
+    # Latest N activities per user
+    op.create_index('ix_activity_events_user_recent', 'activity_events', ['user_id', 'occurred_at', 'id'])
+    # Per-type aggregates per user, answered from the index alone on Postgres
+    op.create_index(
+        'ix_activity_events_user_type', 'activity_events', ['user_id', 'activity_type', 'occurred_at'],
+        postgresql_include=['score', 'time_spent', 'completion_status']
+    )
+
+    op.create_table('generated_content',
+    sa.Column('id', big_id, autoincrement=True, nullable=False),
+    sa.Column('request_key', sa.String(length=512), nullable=False),
+    sa.Column('kind', sa.String(length=16), nullable=False),
+    sa.Column('language', sa.String(length=8), nullable=False),
+    sa.Column('payload', json_document, nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_generated_content')),
+    sa.UniqueConstraint('request_key', name=op.f('uq_generated_content_request_key'))
+    )
+    op.create_index('ix_generated_content_kind_language', 'generated_content', ['kind', 'language'])
+
+    op.create_table('translations',
+    sa.Column('id', big_id, autoincrement=True, nullable=False),
+    sa.Column('source_hash', sa.String(length=64), nullable=False),
+    sa.Column('source_language', sa.String(length=8), nullable=False),
+    sa.Column('target_language', sa.String(length=8), nullable=False),
+    sa.Column('content_type', sa.String(length=32), nullable=False),
+    sa.Column('source_text', sa.Text(), nullable=False),
+    sa.Column('translated_text', sa.Text(), nullable=False),
+    sa.Column('cultural_notes', json_document, nullable=False),
+    sa.Column('pronunciation_guide', sa.Text(), nullable=True),
+    sa.Column('content_id', big_id, nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    sa.ForeignKeyConstraint(['content_id'], ['generated_content.id'], name=op.f('fk_translations_content_id_generated_content'), ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_translations')),
+    sa.UniqueConstraint('source_hash', 'target_language', name=op.f('uq_translations_source_hash_target_language'))
+    )
+    op.create_index(op.f('ix_translations_content_id'), 'translations', ['content_id'])
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_translations_content_id'), table_name='translations')
+    op.drop_table('translations')
+    op.drop_index('ix_generated_content_kind_language', table_name='generated_content')
+    op.drop_table('generated_content')
+    op.drop_index('ix_activity_events_user_type', table_name='activity_events')
+    op.drop_index('ix_activity_events_user_recent', table_name='activity_events')
+    op.drop_table('activity_events')
+    op.drop_table('users')
@@ -0,0 +1,41 @@
+"""
+Recompute every child's achievement counters and badges from the event log.
+
+Usage (from the repository root):
+    python -m backend.scripts.backfill_achievements
+
+Run after adding or changing badge rules in config/achievements.py; running
+servers pick up the new snapshot within a minute.
+"""
+import logging
+import time
+from ..config.settings import ACHIEVEMENTS_PATH
+from ..services.achievements import AchievementEngine
+from ..services.progress_events import ProgressEventLog
+
+logger = logging.getLogger("backfill_achievements")
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s", force=True)
+    started = time.monotonic()
+
+    engine = AchievementEngine()
+    log = ProgressEventLog()
+
+    def events():
+        for offset, event in log.replay():
+            engine.log_offset = offset
+            yield event
+
+    used = engine.rebuild(events())
+    earned = sum(len(badges) for badges in engine.earned.values())
+    logger.info(
+        f"{used} events, {len(engine.earned)} children with badges, {earned} badges earned "
+        f"in {time.monotonic() - started:.2f}s"
+    )
+
+    engine.save(ACHIEVEMENTS_PATH)
+    logger.info(f"Snapshot written to {ACHIEVEMENTS_PATH}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Memory footprint of the in-memory activity history: ActivityStore against
+the per-user lists of ActivityProgress models it replaced.
+
+Usage (from the repository root):
+    python -m backend.scripts.benchmark_activity_store [--users 10000] [--activities 50]
+
+Both sides hold the same synthetic history, where every activity is a
+different game as in live play; memory is what tracemalloc sees allocated
+while building each. A store fed twice as many activities, so that every
+ring is overwritten once, shows its memory stays put. The timings are one
+progress analysis per user, from lists of models (as callers without a
+store pass them) and straight from the store's views.
+"""
+import argparse
+import asyncio
+import gc
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Tuple
+from ..agents.progress_tracker import ActivityProgress, ProgressTrackerAgent
+from ..config.agent_config import PUZZLE_TYPES
+from ..services.activity_store import ActivityStore
+
+ACTIVITY_TYPES = ["story", *PUZZLE_TYPES]
+DIFFICULTIES = ["easy", "medium", "hard"]
+
+def synthetic_history(users: int, activities: int, seed: int = 0, offset: int = 0) -> List[Tuple[str, Dict]]:
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1)
+    return [
+        (f"user-{user}", {
+            "activity_type": rng.choice(ACTIVITY_TYPES),
+            "activity_id": f"game-{user}-{index}",
+            "completion_status": rng.random() < 0.7,
+            "score": round(rng.random(), 2),
+            "time_spent": rng.randrange(30, 900),
+            "difficulty": rng.choice(DIFFICULTIES),
+            "timestamp": start + timedelta(minutes=index)
+        })
+        for index in range(offset, offset + activities)
+        for user in range(users)
+    ]
+
+def build_models(history: List[Tuple[str, Dict]], activities: int) -> Dict[str, List[ActivityProgress]]:
+    by_user: Dict[str, List[ActivityProgress]] = {}
+    for user_id, activity in history:
+        by_user.setdefault(user_id, []).append(ActivityProgress(**activity))
+    return by_user
+
+def build_store(history: List[Tuple[str, Dict]], activities: int) -> ActivityStore:
+    store = ActivityStore(capacity=activities)
+    for user_id, activity in history:
+        store.append(user_id, **activity)
+    return store
+
+def measure(build: Callable, *args):
+    gc.collect()
+    tracemalloc.start()
+    result = build(*args)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--activities", type=int, default=50, help="activities kept per user")
+    args = parser.parse_args()
+
+    history = synthetic_history(args.users, args.activities)
+    total = args.users * args.activities
+    models, model_bytes = measure(build_models, history, args.activities)
+    store, store_bytes = measure(build_store, history, args.activities)
+
+    print(f"{args.users} users x {args.activities} activities ({total} in all)")
+    print(f"  list of models  {model_bytes / 2**20:9.1f} MiB  {model_bytes / total:7.1f} B/activity")
+    print(f"  activity store  {store_bytes / 2**20:9.1f} MiB  {store_bytes / total:7.1f} B/activity"
+          f"  (arrays {store.nbytes() / 2**20:.1f} MiB)")
+    print(f"  ratio           {model_bytes / store_bytes:9.1f}x")
+
+    later = synthetic_history(args.users, args.activities, seed=1, offset=args.activities)
+    wrapped, wrapped_bytes = measure(build_store, history + later, args.activities)
+    print(f"  after {total} more  {wrapped_bytes / 2**20:9.1f} MiB  {len(wrapped.ids)} activity ids held")
+
+    agent = ProgressTrackerAgent()
+    sample = list(models)[:1000]
+
+    async def analyze_models():
+        for user_id in sample:
+            activities = ActivityStore.from_activities(models[user_id]).view("")
+            await agent._analyze_progress(activities, "beginner")
+
+    async def analyze_views():
+        for user_id in sample:
+            await agent._analyze_progress(store.view(user_id), "beginner")
+
+    for label, run in (("from models", analyze_models), ("from views", analyze_views)):
+        started = time.perf_counter()
+        asyncio.run(run())
+        elapsed = time.perf_counter() - started
+        print(f"  analysis {label:<11}{elapsed / len(sample) * 1e6:7.1f} us/user")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Cost of the response path for generated content: agents returning dicts
+that FastAPI validates and serializes against the response model, against
+agents returning models that are serialized once with model_dump_json.
+
+Usage (from the repository root):
+    python -m backend.scripts.benchmark_response_path [--requests 2000]
+
+Each case is timed twice: through a real FastAPI route called over ASGI,
+so routing and the response object are counted on both sides, and for the
+serialization alone (the .dict(), the response-model validation and the
+JSON encoding it replaces). Payloads are hard games of every puzzle type
+and a full story, in English and translated.
+"""
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from typing import List, Tuple, Type
+from fastapi import FastAPI
+from pydantic import BaseModel
+from ..agents.agent_factory import AgentFactory
+from ..api.responses import model_json, model_response
+from ..api.routers.games import GameResponse
+from ..api.routers.stories import StoryResponse
+from ..config.agent_config import PUZZLE_TYPES
+from ..services.content_generation import translate_payload
+
+def build_app(model: BaseModel, response_model: Type[BaseModel]) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/dict", response_model=response_model)
+    async def as_dict():
+        # Before: the agent returned .dict() and FastAPI validated it again
+        return model.model_dump()
+
+    @app.post("/model", response_model=response_model)
+    async def as_model():
+        return model_response(model, response_model)
+
+    return app
+
+async def call(app: FastAPI, path: str) -> bytes:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": b"", "headers": [], "client": ("bench", 1), "server": ("bench", 80)
+    }
+    chunks: List[bytes] = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(chunks)
+
+async def measure(app: FastAPI, path: str, requests: int) -> Tuple[float, int, int]:
+    """(CPU microseconds per request, peak bytes allocated by one request, body size)"""
+    body = await call(app, path)
+    started = time.process_time()
+    for _ in range(requests):
+        await call(app, path)
+    cpu = (time.process_time() - started) / requests * 1e6
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    await call(app, path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cpu, peak - baseline, len(body)
+
+def serialize_dict(model: BaseModel, response_model: Type[BaseModel]) -> bytes:
+    """What the response path did per request before: dump, re-validate, encode"""
+    content = response_model.model_validate(model.model_dump()).model_dump(mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def measure_serialization(serialize, requests: int) -> Tuple[float, int]:
+    """(CPU microseconds per call, peak bytes allocated by one call)"""
+    started = time.process_time()
+    for _ in range(requests):
+        serialize()
+    cpu = (time.process_time() - started) / requests * 1e6
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    serialize()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cpu, peak - baseline
+
+async def payloads() -> List[Tuple[str, BaseModel, Type[BaseModel]]]:
+    game_agent = AgentFactory.create_agent("game")
+    story_agent = AgentFactory.create_agent("story")
+    story = await story_agent.process({"animal_name": "Tembo", "lesson_theme": "Kindness", "age_group": "2-4 years"})
+    cases = [
+        (f"game {puzzle_type} hard", await game_agent.process({
+            "puzzle_type": puzzle_type,
+            "difficulty": "hard",
+            "animal_theme": "Tembo",
+            "lesson_theme": "Kindness",
+            "seed": 7
+        }), GameResponse)
+        for puzzle_type in PUZZLE_TYPES
+    ]
+    cases.append(("story", story, StoryResponse))
+    cases.append(("story, translated", await translate_payload(story, "sw", "story", "Children's story"), StoryResponse))
+    return cases
+
+def report(label: str, size: int, before: Tuple[float, int], after: Tuple[float, int]) -> None:
+    print(
+        f"{label:<26}{size:>7}  {before[0]:>8.1f}{after[0]:>9.1f}{before[0] / after[0]:>6.1f}"
+        f"  {before[1] / 1024:>9.1f}{after[1] / 1024:>10.1f}"
+    )
+
+async def run(requests: int) -> None:
+    cases = await payloads()
+    header = f"{'payload':<26}{'bytes':>7}  {'dict us':>8}{'model us':>9}{'x':>6}  {'dict KiB':>9}{'model KiB':>10}"
+
+    print("Serialization alone")
+    print(header)
+    for label, model, response_model in cases:
+        body = model_json(model, response_model)
+        assert json.loads(serialize_dict(model, response_model)) == json.loads(body), label
+        report(
+            label,
+            len(body),
+            measure_serialization(lambda: serialize_dict(model, response_model), requests),
+            measure_serialization(lambda: model_json(model, response_model), requests)
+        )
+
+    print("\nWhole request through FastAPI")
+    print(header)
+    for label, model, response_model in cases:
+        app = build_app(model, response_model)
+        assert json.loads(await call(app, "/dict")) == json.loads(await call(app, "/model")), label
+        dict_cpu, dict_peak, size = await measure(app, "/dict", requests)
+        model_cpu, model_peak, _ = await measure(app, "/model", requests)
+        report(label, size, (dict_cpu, dict_peak), (model_cpu, model_peak))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="requests timed per case")
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Cost of screening generated content against the blocklists.
+
+Usage (from the repository root):
+    python -m backend.scripts.benchmark_safety_filter [--sizes 500 2000 10000]
+
+Compares the Aho-Corasick filter (one pass over all of a payload's text)
+with checking every term against every field, and with a single regex
+alternation of all terms, on the shipped lists and on synthetic lists of
+the given sizes per language. Payloads are a full story, a long story, and
+hard games of every puzzle type.
+"""
+import argparse
+import asyncio
+import random
+import re
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+from pydantic import BaseModel
+from ..agents.agent_factory import AgentFactory
+from ..agents.story_generator import StoryContent, StoryScene
+from ..config.agent_config import PUZZLE_TYPES, SUPPORTED_LANGUAGES
+from ..config.settings import BLOCKLISTS_DIR
+from ..services.safety_filter import SafetyFilter, _strings, fold, read_blocklist
+
+SYLLABLES = ["ka", "ri", "mo", "ta", "ne", "lu", "si", "bo", "de", "gra", "sho", "vin", "tel", "pru", "zam"]
+WORDS = (
+    "the little elephant walked to the river with her friends and they shared "
+    "fruit under the big tree while the sun went down over the savanna"
+).split()
+
+def synthetic_blocklists(size: int, seed: int = 0) -> Dict[str, List[str]]:
+    rng = random.Random(seed)
+    lists = {}
+    for language in SUPPORTED_LANGUAGES:
+        terms = set()
+        while len(terms) < size:
+            word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5)))
+            terms.add(word + "*" if rng.random() < 0.25 else word)
+        lists[language] = sorted(terms)
+    return lists
+
+def long_story(scenes: int = 20, words: int = 150, seed: int = 0) -> StoryContent:
+    rng = random.Random(seed)
+    text = lambda count: " ".join(rng.choice(WORDS) for _ in range(count)).capitalize() + "."
+    return StoryContent(
+        title="Tembo's Long Journey",
+        animal_character="Tembo",
+        lesson_theme="Kindness",
+        age_group="4-6 years",
+        scenes=[
+            StoryScene(
+                scene_number=number + 1,
+                description=text(words),
+                dialogue=text(words // 2),
+                moral_lesson=text(12),
+                visual_elements=[text(4) for _ in range(3)]
+            )
+            for number in range(scenes)
+        ],
+        moral_summary=text(30),
+        parent_tips=[text(15) for _ in range(3)]
+    )
+
+async def payloads() -> List[Tuple[str, BaseModel]]:
+    story_agent = AgentFactory.create_agent("story")
+    game_agent = AgentFactory.create_agent("game")
+    cases = [
+        ("story", await story_agent.process({"animal_name": "Tembo", "lesson_theme": "Kindness", "age_group": "2-4 years"})),
+        ("long story", long_story())
+    ]
+    for puzzle_type in PUZZLE_TYPES:
+        cases.append((f"{puzzle_type} hard", await game_agent.process({
+            "puzzle_type": puzzle_type,
+            "difficulty": "hard",
+            "animal_theme": "Tembo",
+            "lesson_theme": "Kindness",
+            "seed": 7
+        })))
+    return cases
+
+def per_term_scanner(blocklists: Dict[str, List[str]]) -> Callable[[BaseModel], int]:
+    """Every term checked against every field, with the same boundary rules"""
+    terms = sorted({(fold(term.rstrip("*")), term.endswith("*")) for terms in blocklists.values() for term in terms})
+
+    def scan(content: BaseModel) -> int:
+        found = 0
+        for _, _, _, text in _strings(content):
+            folded = fold(text)
+            for word, prefix in terms:
+                start = folded.find(word)
+                while start != -1:
+                    end = start + len(word)
+                    if (start == 0 or not folded[start - 1].isalnum()) and (
+                        prefix or end == len(folded) or not folded[end].isalnum()
+                    ):
+                        found += 1
+                    start = folded.find(word, start + 1)
+        return found
+    return scan
+
+def regex_scanner(blocklists: Dict[str, List[str]]) -> Callable[[BaseModel], int]:
+    """One alternation of every term, run over each field"""
+    exact = {fold(term) for terms in blocklists.values() for term in terms if not term.endswith("*")}
+    prefixes = {fold(term[:-1]) for terms in blocklists.values() for term in terms if term.endswith("*")}
+    alternation = "|".join(
+        [re.escape(word) + r"(?!\w)" for word in sorted(exact, key=len, reverse=True)]
+        + [re.escape(word) for word in sorted(prefixes, key=len, reverse=True)]
+    )
+    pattern = re.compile(r"(?<!\w)(?:" + alternation + ")")
+
+    def scan(content: BaseModel) -> int:
+        return sum(len(pattern.findall(fold(text))) for _, _, _, text in _strings(content))
+    return scan
+
+def timed(scan: Callable[[], object], repeat: int) -> float:
+    """Microseconds per call"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        scan()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+def build(blocklists: Dict[str, List[str]]) -> Tuple[SafetyFilter, float, int]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    safety = SafetyFilter(blocklists)
+    elapsed = time.perf_counter() - started
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return safety, elapsed, memory
+
+def run(sizes: List[int], repeat: int) -> None:
+    cases = asyncio.run(payloads())
+    shipped = {path.stem: read_blocklist(path) for path in sorted(BLOCKLISTS_DIR.glob("*.txt"))}
+    configurations = [("shipped", shipped)] + [(f"{size}/language", synthetic_blocklists(size)) for size in sizes]
+
+    for name, blocklists in configurations:
+        terms = sum(len(terms) for terms in blocklists.values())
+        safety, build_seconds, memory = build(blocklists)
+        per_term = per_term_scanner(blocklists)
+        regex = regex_scanner(blocklists)
+        print(
+            f"\n{name} lists: {terms} terms, {len(safety.automaton)} states, "
+            f"built in {build_seconds * 1000:.0f} ms, {memory / 2**20:.1f} MiB"
+        )
+        print(f"  {'payload':<22}{'chars':>7}{'automaton us':>14}{'per-term us':>13}{'regex us':>10}")
+        for label, content in cases:
+            chars = sum(len(text) + 1 for _, _, _, text in _strings(content))
+            # Slow baselines get fewer rounds on big lists
+            rounds = max(1, repeat * 500 // max(terms, 500))
+            print(
+                f"  {label:<22}{chars:>7}"
+                f"{timed(lambda: safety.scan(content), repeat):>14.0f}"
+                f"{timed(lambda: per_term(content), rounds):>13.0f}"
+                f"{timed(lambda: regex(content), rounds):>10.0f}"
+            )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="*", default=[500, 2000, 10000], help="synthetic terms per language")
+    parser.add_argument("--repeat", type=int, default=50, help="scans timed per payload")
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Cost of getting schema-valid models out of unreliable LLM replies: strict
+parsing with a full retry on any defect, against the repairing incremental
+parser that asks again only for missing fields.
+
+Usage (from the repository root):
+    python -m backend.scripts.benchmark_structured_output [--items 200] [--truncate 0.15]
+
+A simulated model streams the JSON of real agent output (stories, every
+puzzle type, translations) a few characters at a time, with defects at the
+given rates: code fences, surrounding prose, trailing commas, replies cut
+off part way and, rarely, no JSON at all. Follow-up requests are answered
+from the same content. Reported per item: requests made, characters the
+model had to generate and items given up on, then the engine's repair and
+retry rates and the parser's throughput against json.loads.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import re
+import time
+from typing import Any, AsyncIterator, Dict, List, Tuple, Type
+from pydantic import BaseModel
+from ..agents.agent_factory import AgentFactory
+from ..config.agent_config import PUZZLE_TYPES
+from ..services.structured_output import IncrementalJSONParser, StructuredOutput, _split_path
+
+CHUNK = 4  # characters per streamed token
+STRICT_ATTEMPTS = 3
+FOLLOWUP_MARKER = "Your previous reply was incomplete."
+
+class Defects:
+    def __init__(self, fence: float, prose: float, trailing_comma: float, truncate: float, garbage: float):
+        self.fence = fence
+        self.prose = prose
+        self.trailing_comma = trailing_comma
+        self.truncate = truncate
+        self.garbage = garbage
+
+    def apply(self, text: str, rng: random.Random) -> str:
+        if rng.random() < self.garbage:
+            return "I'm sorry, I can't help with that."
+        if rng.random() < self.trailing_comma:
+            text = re.sub(r'(["\d\]}])(\n\s*[\]}])', r"\1,\2", text, count=rng.randint(1, 3))
+        if rng.random() < self.fence:
+            text = f"```json\n{text}\n```"
+        if rng.random() < self.prose:
+            text = f"Here is the content you asked for:\n{text}\nLet me know if you need changes."
+        if rng.random() < self.truncate:
+            # Out of tokens: the reply just stops
+            text = text[:int(len(text) * rng.uniform(0.5, 0.95))]
+        return text
+
+class SimulatedModel:
+    """Replies with the JSON of known content, defects included, and counts what it generated"""
+
+    def __init__(self, truth: Dict[str, Any], defects: Defects, rng: random.Random):
+        self.truth = truth
+        self.defects = defects
+        self.rng = rng
+        self.requests = 0
+        self.characters = 0
+
+    def _value(self, path: str) -> Any:
+        value = self.truth
+        for part in _split_path(path):
+            value = value[part]
+        return value
+
+    def reply(self, prompt: str) -> str:
+        if FOLLOWUP_MARKER in prompt:
+            paths = [line[2:] for line in prompt.rsplit(":\n", 1)[1].splitlines() if line.startswith("- ")]
+            return json.dumps({path: self._value(path) for path in paths}, ensure_ascii=False, indent=2)
+        return self.defects.apply(json.dumps(self.truth, ensure_ascii=False, indent=2), self.rng)
+
+    async def complete(self, prompt: str) -> AsyncIterator[str]:
+        self.requests += 1
+        text = self.reply(prompt)
+        for start in range(0, len(text), CHUNK):
+            self.characters += len(text[start:start + CHUNK])
+            yield text[start:start + CHUNK]
+
+async def strict(model: SimulatedModel, response_model: Type[BaseModel]) -> bool:
+    """Whole reply through json.loads and validation; anything wrong means asking again"""
+    for _ in range(STRICT_ATTEMPTS):
+        text = "".join([chunk async for chunk in model.complete("generate")])
+        try:
+            response_model.model_validate(json.loads(text))
+            return True
+        except ValueError:
+            continue
+    return False
+
+async def repairing(engine: StructuredOutput, model: SimulatedModel, response_model: Type[BaseModel]) -> bool:
+    """Success only when everything the model meant to send made it, not just a valid subset"""
+    try:
+        result = await engine.generate("generate", response_model, model.complete)
+    except ValueError:
+        return False
+    return result.model_dump(mode="json") == model.truth
+
+async def payloads() -> List[Tuple[str, BaseModel]]:
+    story_agent = AgentFactory.create_agent("story")
+    game_agent = AgentFactory.create_agent("game")
+    translation_agent = AgentFactory.create_agent("translation")
+    cases = [("story", await story_agent.process({"animal_name": "Tembo", "lesson_theme": "Kindness", "age_group": "2-4 years"}))]
+    for puzzle_type in PUZZLE_TYPES:
+        game = await game_agent.process({
+            "puzzle_type": puzzle_type,
+            "difficulty": "medium",
+            "animal_theme": "Tembo",
+            "lesson_theme": "Kindness",
+            "seed": 7
+        })
+        # The model would write the elements; the board layout is computed
+        cases.append((f"game {puzzle_type}", game.model_copy(update={"layout": None})))
+    cases.append(("translation", await translation_agent.process({
+        "text": "Tembo shared the fruit with all of her friends.",
+        "target_language": "sw",
+        "context": "Children's story",
+        "content_type": "story"
+    })))
+    return cases
+
+def parse_throughput(text: str, repeat: int = 200) -> Tuple[float, float]:
+    """MB/s for the incremental parser fed in CHUNK pieces, and for json.loads on the whole text"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        parser = IncrementalJSONParser()
+        for start in range(0, len(text), CHUNK):
+            parser.feed(text[start:start + CHUNK])
+        parser.finish()
+    incremental = len(text) * repeat / (time.perf_counter() - started) / 1e6
+    started = time.perf_counter()
+    for _ in range(repeat):
+        json.loads(text)
+    return incremental, len(text) * repeat / (time.perf_counter() - started) / 1e6
+
+async def run(items: int, defects: Defects, seed: int) -> None:
+    cases = await payloads()
+    engine = StructuredOutput()
+    # Every simulated defect would be logged otherwise
+    logging.getLogger("backend.services.structured_output").setLevel(logging.ERROR)
+    print(f"{items} items per payload, {CHUNK}-character tokens")
+    print(f"{'payload':<22}{'strict req':>11}{'chars':>8}{'failed':>7}{'repair req':>11}{'chars':>8}{'failed':>7}")
+    for label, content in cases:
+        truth = content.model_dump(mode="json")
+        response_model = type(content)
+        results = {}
+        for name in ("strict", "repairing"):
+            rng = random.Random(seed)
+            requests = characters = failed = 0
+            for _ in range(items):
+                model = SimulatedModel(truth, defects, rng)
+                ok = await (strict(model, response_model) if name == "strict" else repairing(engine, model, response_model))
+                requests += model.requests
+                characters += model.characters
+                failed += not ok
+            results[name] = (requests / items, characters / items, failed)
+        (strict_requests, strict_chars, strict_failed) = results["strict"]
+        (repair_requests, repair_chars, repair_failed) = results["repairing"]
+        print(
+            f"{label:<22}{strict_requests:>11.2f}{strict_chars:>8.0f}{strict_failed:>7}"
+            f"{repair_requests:>11.2f}{repair_chars:>8.0f}{repair_failed:>7}"
+        )
+
+    print("\nEngine rates per model")
+    for name, rates in engine.rates().items():
+        print(f"  {name:<18}" + "  ".join(f"{key} {value:.3f}" for key, value in rates.items()))
+    print("Repairs by kind: " + ", ".join(f"{kind} {count}" for kind, count in sorted(engine.repairs.items())))
+
+    text = json.dumps(cases[0][1].model_dump(mode="json"), ensure_ascii=False, indent=2)
+    incremental, loads = parse_throughput(text)
+    print(f"\nParsing a {len(text)}-character story: incremental {incremental:.1f} MB/s, json.loads {loads:.1f} MB/s")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=200, help="simulated replies per payload")
+    parser.add_argument("--fence", type=float, default=0.3)
+    parser.add_argument("--prose", type=float, default=0.2)
+    parser.add_argument("--trailing-comma", type=float, default=0.2)
+    parser.add_argument("--truncate", type=float, default=0.15)
+    parser.add_argument("--garbage", type=float, default=0.02, help="replies with no JSON at all")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    defects = Defects(args.fence, args.prose, args.trailing_comma, args.truncate, args.garbage)
+    asyncio.run(run(args.items, defects, args.seed))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Pack the per-animal sound clips into one audio sprite with an offset index.
+
+Usage (from the repository root):
+    python -m backend.scripts.build_audio_sprites [--force]
+
+Clips are WAV files in ANIMAL_SOUNDS_DIR named after the species (lion.wav),
+a catalog character (tembo.wav) or the matching image (ndovu2.wav). The sprite is only rebuilt when the clips change.
+Exits with an error when there are no clips, as sound games would have no audio.
+"""
+import argparse
+import logging
+import sys
+from ..services.audio_sprites import AudioSpriteService
+
+logger = logging.getLogger("audio_sprites")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the animal sound audio sprite")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the clips are unchanged")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s", force=True)
+    service = AudioSpriteService()
+    if not service.source_clips():
+        logger.error(f"No WAV clips found in {service.sounds_dir}")
+        sys.exit(1)
+
+    index = service.build(force=args.force)
+    for species, clip in sorted(index["clips"].items()):
+        logger.info(f"{species:<12} {clip['start']:>8.3f}s +{clip['duration']:.3f}s  bytes {clip['byte_offset']}-{clip['byte_offset'] + clip['byte_length'] - 1}")
+    logger.info(f"Sprite: {service.sprites_dir / index['sprite']}")
+    service.check()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Generate responsive WebP/AVIF variants of every animal image ahead of time.
+
+Usage (from the repository root):
+    python -m backend.scripts.build_image_variants --workers 4
+
+Variants not built here are generated lazily on first request.
+"""
+import argparse
+import asyncio
+import logging
+import time
+from ..services.image_variants import ImageVariantService
+
+logger = logging.getLogger("image_variants")
+
+async def build(workers: int) -> None:
+    service = ImageVariantService(max_workers=workers)
+    started = time.monotonic()
+    try:
+        manifest = await service.build_all()
+    finally:
+        service.shutdown()
+
+    variants = sum(len(entry["variants"]) for entry in manifest.values())
+    total_bytes = sum(v["bytes"] for entry in manifest.values() for v in entry["variants"])
+    logger.info(
+        f"{len(manifest)} images, {variants} variants ({total_bytes / 1024:.0f} KiB) "
+        f"in {time.monotonic() - started:.1f}s, formats: {', '.join(service.formats)}"
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build responsive animal image variants")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s", force=True)
+    asyncio.run(build(args.workers))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Rebuild the activity co-occurrence matrix and top-k neighbour lists.
+
+Usage (from the repository root):
+    python -m backend.scripts.build_recommendations --top-k 20
+
+Servers keep the lists current between runs by applying new events
+incrementally, and pick up the rebuilt snapshot within a minute.
+"""
+import argparse
+import logging
+import time
+from ..config.settings import RECOMMENDATIONS_PATH
+from ..services.activity_recommender import ActivityRecommender, TOP_K
+from ..services.progress_events import ProgressEventLog
+
+logger = logging.getLogger("build_recommendations")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Precompute activity recommendations")
+    parser.add_argument("--top-k", type=int, default=TOP_K, help="Neighbours kept per activity")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s", force=True)
+    started = time.monotonic()
+
+    recommender = ActivityRecommender(top_k=args.top_k)
+    log = ProgressEventLog()
+
+    def events():
+        for offset, event in log.replay():
+            recommender.log_offset = offset
+            yield event
+
+    used = recommender.rebuild(events())
+    pairs = sum(len(row) for row in recommender.cooccurrence.values())
+    logger.info(
+        f"{used} events, {len(recommender.occurrences)} activities, {pairs} co-occurring pairs "
+        f"in {time.monotonic() - started:.2f}s"
+    )
+
+    recommender.save(RECOMMENDATIONS_PATH)
+    logger.info(f"Snapshot written to {RECOMMENDATIONS_PATH}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Compile the UI string translations into the memory-mapped UI catalog.
+
+Usage (from the repository root):
+    python -m backend.scripts.build_ui_catalog [--force]
+
+Reads <language>.json files ({English text: translation}) from
+UI_TRANSLATIONS_DIR and writes UI_CATALOG_PATH. Strings a language has no
+translation for are listed and fall back to English. The API compiles the
+catalog itself at startup when it is missing or out of date; run this to
+check the translations or to ship a catalog with a deploy.
+"""
+import argparse
+import logging
+from ..config.settings import UI_CATALOG_PATH
+from ..services.ui_catalog import UICatalog, build_ui_catalog
+
+logger = logging.getLogger("ui_catalog")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compile the UI string catalog")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the translations are unchanged")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s", force=True)
+    if not build_ui_catalog(force=args.force):
+        logger.info(f"{UI_CATALOG_PATH} is up to date")
+
+    catalog = UICatalog(UI_CATALOG_PATH)
+    logger.info(f"{len(catalog)} strings in {', '.join(catalog.languages)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Inspect, verify and rebuild binary content packs.
+
+Usage (from the repository root):
+    python -m backend.scripts.manage_content_pack info
+    python -m backend.scripts.manage_content_pack verify path/to/pack.bin
+    python -m backend.scripts.manage_content_pack build --checkpoint ckpt.jsonl --output pack.bin
+
+A running API swaps to a rebuilt pack on its own once the file is replaced.
+"""
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+from ..config.agent_config import SUPPORTED_LANGUAGES
+from ..config.settings import CONTENT_PACK_PATH
+from ..services.content_pack import ContentPack, ContentPackError
+from .pregenerate_content import build_pack, load_checkpoint, localize_catalogs
+
+logger = logging.getLogger("content_pack")
+
+def verify(path: Path) -> int:
+    """Check the header, checksum and that every entry decodes"""
+    if not path.exists():
+        logger.error(f"FAILED: {path} does not exist")
+        return 1
+
+    try:
+        pack = ContentPack(path, verify=True)
+    except (OSError, ContentPackError) as e:
+        logger.error(f"FAILED: {e}")
+        return 1
+
+    for entry in pack.entries():
+        if pack.get_entry(entry.key) is None:
+            logger.error(f"FAILED: {entry.key} is not reachable through the index")
+            return 1
+        try:
+            entry.json()
+        except ValueError as e:
+            logger.error(f"FAILED: {entry.key} does not decode: {e}")
+            return 1
+
+    logger.info(f"OK: {len(pack)} entries in {path}")
+    return 0
+
+def info(path: Path) -> int:
+    pack = ContentPack(path, verify=False)
+    print(json.dumps(pack.metadata, indent=2, ensure_ascii=False))
+    return 0
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage binary content packs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("info", "verify"):
+        sub = subparsers.add_parser(name)
+        sub.add_argument("path", type=Path, nargs="?", default=CONTENT_PACK_PATH)
+
+    build = subparsers.add_parser("build", help="Build a pack from a pre-generation checkpoint")
+    build.add_argument("--checkpoint", type=Path, required=True)
+    build.add_argument("--output", type=Path, default=CONTENT_PACK_PATH)
+    build.add_argument("--compress", action="store_true")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s", force=True)
+
+    if args.command == "info":
+        sys.exit(info(args.path))
+    if args.command == "verify":
+        sys.exit(verify(args.path))
+
+    completed = load_checkpoint(args.checkpoint)
+    completed.update(localize_catalogs(SUPPORTED_LANGUAGES))
+    build_pack(completed, args.output, args.compress, {"source": str(args.checkpoint)})
+    sys.exit(verify(args.output))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Pre-generate the full content catalog into a content pack.
+
+Enumerates every animal x theme story and every puzzle type x difficulty x
+animal x theme game in every supported language, and generates them with a
+pool of concurrent workers. Completed items are appended to a checkpoint
+file so an interrupted run resumes where it stopped. The static catalogs
+(themes, animals, game types) are localized from the UI string catalog
+into the pack on every run.
+
+Usage (from the repository root):
+    python -m backend.scripts.pregenerate_content --workers 8
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+from pydantic import BaseModel
+from ..agents.agent_factory import AgentFactory
+from ..api.responses import model_json
+from ..api.routers.games import GameResponse
+from ..api.routers.stories import StoryResponse
+from ..config.agent_config import PUZZLE_TYPES, SUPPORTED_LANGUAGES
+from ..config.settings import CONTENT_PACK_PATH
+from ..config.ui_strings import AVAILABLE_ANIMALS, STORY_THEMES, UI_CATALOGS
+from ..services.content_generation import (
+    generate_story,
+    generate_game,
+    story_key,
+    game_key,
+    catalog_key
+)
+from ..services.content_pack import ContentPackBuilder
+from ..services.ui_catalog import get_ui_catalog
+
+logger = logging.getLogger("pregenerate")
+
+class PregenerationJob(BaseModel):
+    key: str
+    kind: str  # story, game
+    params: Dict[str, Any]
+
+async def build_jobs(languages: List[str], age_group: str) -> List[PregenerationJob]:
+    """Enumerate the cross-product of all generatable content"""
+    jobs = []
+    for language in languages:
+        for animal in AVAILABLE_ANIMALS:
+            for theme in STORY_THEMES:
+                jobs.append(PregenerationJob(
+                    key=story_key(animal["name"], theme, age_group, language),
+                    kind="story",
+                    params={
+                        "animal_name": animal["name"],
+                        "lesson_theme": theme,
+                        "age_group": age_group,
+                        "language": language
+                    }
+                ))
+
+                for puzzle_type, difficulties in PUZZLE_TYPES.items():
+                    for difficulty in difficulties:
+                        jobs.append(PregenerationJob(
+                            key=game_key(puzzle_type, difficulty, animal["name"], theme, language),
+                            kind="game",
+                            params={
+                                "puzzle_type": puzzle_type,
+                                "difficulty": difficulty,
+                                "animal_theme": animal["name"],
+                                "lesson_theme": theme,
+                                "language": language
+                            }
+                        ))
+
+    return jobs
+
+async def run_job(job: PregenerationJob, agents: Dict[str, Any]) -> Any:
+    """Generate a single item using the worker's own agents"""
+    if job.kind == "story":
+        return await generate_story(agents=agents, **job.params)
+
+    return await generate_game(agents=agents, **job.params)
+
+def localize_catalogs(languages: List[str]) -> Dict[str, bytes]:
+    """Response bodies of the static catalogs in each language, from the UI catalog"""
+    catalog = get_ui_catalog()
+    return {
+        catalog_key(name, language): serialize_for_response(
+            catalog_key(name, language), catalog.localize(payload, language)
+        )
+        for language in languages
+        for name, payload in UI_CATALOGS.items()
+    }
+
+# Response models the API would have applied, per content kind
+RESPONSE_MODELS = {
+    "story": StoryResponse,
+    "game": GameResponse
+}
+
+def serialize_for_response(key: str, payload: Any) -> bytes:
+    """Serialize a payload (an agent's model, or checkpointed JSON) exactly as the API would send it"""
+    response_model = RESPONSE_MODELS.get(key.split(":", 1)[0])
+    if isinstance(payload, BaseModel):
+        return model_json(payload, response_model)
+    if response_model is not None:
+        return response_model.model_validate(payload).model_dump_json().encode("utf-8")
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def build_pack(
+    completed: Dict[str, bytes],
+    output: Path,
+    compress: bool,
+    metadata: Dict[str, Any]
+) -> None:
+    builder = ContentPackBuilder(compress=compress)
+    for key, body in completed.items():
+        builder.add(key, body)
+    builder.write(output, metadata)
+    logger.info(f"Wrote content pack with {len(builder)} items to {output}")
+
+def load_checkpoint(path: Path) -> Dict[str, bytes]:
+    """Read completed items' response bodies, ignoring a line truncated by an interrupted write"""
+    completed = {}
+    if not path.exists():
+        return completed
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning("Skipping truncated checkpoint line")
+                continue
+            completed[record["key"]] = serialize_for_response(record["key"], record["payload"])
+    return completed
+
+class ProgressReporter:
+    """Logs throughput and ETA at a fixed interval"""
+
+    def __init__(self, total: int, interval: float = 5.0):
+        self.total = total
+        self.done = 0
+        self.interval = interval
+        self.started = time.monotonic()
+        self.last_report = self.started
+
+    def advance(self) -> None:
+        self.done += 1
+        now = time.monotonic()
+        if now - self.last_report >= self.interval or self.done == self.total:
+            self.last_report = now
+            self.report(now)
+
+    def report(self, now: float) -> None:
+        elapsed = max(now - self.started, 1e-9)
+        rate = self.done / elapsed
+        remaining = (self.total - self.done) / rate if rate > 0 else float("inf")
+        logger.info(
+            f"{self.done}/{self.total} items "
+            f"({rate:.1f} items/s, ETA {_format_duration(remaining)})"
+        )
+
+def _format_duration(seconds: float) -> str:
+    if seconds == float("inf"):
+        return "unknown"
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:d}:{minutes:02d}:{seconds:02d}"
+
+async def pregenerate(
+    output: Path,
+    checkpoint: Path,
+    workers: int,
+    languages: List[str],
+    age_group: str,
+    compress: bool
+) -> None:
+    jobs = await build_jobs(languages, age_group)
+    completed = load_checkpoint(checkpoint)
+    pending = [job for job in jobs if job.key not in completed]
+
+    logger.info(
+        f"{len(jobs)} items in catalog, {len(completed)} already checkpointed, "
+        f"{len(pending)} to generate with {workers} workers"
+    )
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for job in pending:
+        queue.put_nowait(job)
+
+    reporter = ProgressReporter(len(pending))
+    checkpoint.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(checkpoint, "ab") as checkpoint_file:
+        async def worker() -> None:
+            # Each worker keeps its own agents for the whole run
+            agents = AgentFactory.create_crew(["story", "game", "translation"])
+            while True:
+                try:
+                    job = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    body = serialize_for_response(job.key, await run_job(job, agents))
+                    completed[job.key] = body
+                    checkpoint_file.write(b'{"key":' + json.dumps(job.key).encode("utf-8") + b',"payload":' + body + b"}\n")
+                    checkpoint_file.flush()
+                except Exception as e:
+                    logger.error(f"Failed to generate {job.key}: {e}")
+                finally:
+                    reporter.advance()
+
+        await asyncio.gather(*[worker() for _ in range(max(1, workers))])
+
+    # Catalogs are a lookup each, so they're rebuilt rather than checkpointed
+    completed.update(localize_catalogs(languages))
+    build_pack(completed, output, compress, {
+        "languages": languages,
+        "age_group": age_group
+    })
+
+    missing = len(jobs) - sum(1 for job in jobs if job.key in completed)
+    if missing:
+        logger.warning(f"{missing} items failed; re-run to retry them from the checkpoint")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pre-generate stories, games and catalogs into a content pack")
+    parser.add_argument("--output", type=Path, default=CONTENT_PACK_PATH, help="Content pack to write")
+    parser.add_argument("--checkpoint", type=Path, default=None, help="Checkpoint file (default: <output>.checkpoint.jsonl)")
+    parser.add_argument("--workers", type=int, default=4, help="Number of concurrent generation workers")
+    parser.add_argument("--languages", nargs="+", default=SUPPORTED_LANGUAGES, choices=SUPPORTED_LANGUAGES)
+    parser.add_argument("--age-group", default="2-4 years")
+    parser.add_argument("--compress", action="store_true", help="Store large bodies gzip-compressed")
+    parser.add_argument("--fresh", action="store_true", help="Discard the checkpoint and start over")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s", force=True)
+
+    checkpoint = args.checkpoint or args.output.with_suffix(".checkpoint.jsonl")
+    if args.fresh and checkpoint.exists():
+        checkpoint.unlink()
+
+    asyncio.run(pregenerate(args.output, checkpoint, args.workers, args.languages, args.age_group, args.compress))
+
+if __name__ == "__main__":
+    main()
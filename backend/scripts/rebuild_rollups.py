@@ -0,0 +1,38 @@
+"""
+Rebuild the per-user, per-language progress rollups from the event log.
+
+Usage (from the repository root):
+    python -m backend.scripts.rebuild_rollups
+
+Servers maintain the rollups incrementally; run this after changing the
+bucketing, or nightly to compact users who haven't been active since.
+"""
+import logging
+import time
+from ..config.settings import PROGRESS_ROLLUPS_PATH
+from ..services.progress_events import ProgressEventLog
+from ..services.progress_rollups import ProgressRollups
+
+logger = logging.getLogger("rebuild_rollups")
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s", force=True)
+    started = time.monotonic()
+
+    rollups = ProgressRollups()
+    log = ProgressEventLog()
+
+    def events():
+        for offset, event in log.replay():
+            rollups.log_offset = offset
+            yield event
+
+    used = rollups.rebuild(events())
+    rows = sum(len(user_rows) for user_rows in rollups.rows.values())
+    logger.info(f"{used} events rolled up into {rows} rows for {len(rollups.rows)} users in {time.monotonic() - started:.2f}s")
+
+    rollups.save(PROGRESS_ROLLUPS_PATH)
+    logger.info(f"Snapshot written to {PROGRESS_ROLLUPS_PATH}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Refit the adaptive-difficulty model over the full progress history.
+
+Usage (from the repository root):
+    python -m backend.scripts.recalibrate_difficulty
+
+Writes a snapshot that running servers pick up within a minute, replaying
+any events logged after it.
+"""
+import argparse
+import logging
+import time
+from ..config.settings import ABILITY_MODEL_PATH
+from ..services.adaptive_difficulty import AdaptiveDifficultyModel
+from ..services.progress_events import ProgressEventLog
+
+logger = logging.getLogger("recalibrate_difficulty")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recalibrate learner abilities and difficulty parameters")
+    parser.add_argument("--dry-run", action="store_true", help="Fit and report without writing the snapshot")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s", force=True)
+    started = time.monotonic()
+
+    model = AdaptiveDifficultyModel()
+    log = ProgressEventLog()
+
+    def events():
+        for offset, event in log.replay():
+            model.log_offset = offset
+            yield event
+
+    used = model.recalibrate(events())
+    logger.info(
+        f"Fitted {len(model.abilities)} ability estimates from {used} events "
+        f"in {time.monotonic() - started:.2f}s"
+    )
+    for skill, parameters in sorted(model.difficulty.items()):
+        logger.info(f"{skill:<16} " + "  ".join(f"{level}={value:+.2f}" for level, value in parameters.items()))
+
+    if not args.dry_run:
+        model.save(ABILITY_MODEL_PATH)
+        logger.info(f"Snapshot written to {ABILITY_MODEL_PATH}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Achievements evaluated incrementally on the progress event stream.
+
+Badge rules are data (config/achievements.py). They are indexed by the
+activity types they depend on, so an incoming event only evaluates the
+rules that can match it, each against a per-user counter (an event count,
+or a set of distinct values). Earned badges are kept per user, so reading
+them is a dictionary lookup rather than a scan of the child's history.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Set, Union
+from ..config.achievements import ACHIEVEMENTS, AchievementRule
+from ..config.animal_assets import species_for_theme
+from ..config.settings import ACHIEVEMENTS_PATH
+from .progress_events import LogProjection, ProgressEvent, ProjectionStore
+
+ANY_ACTIVITY = "*"
+
+Counter = Union[int, Set[str]]
+
+def index_rules(rules: Iterable[AchievementRule]) -> Dict[str, List[AchievementRule]]:
+    """Rules by the activity type they depend on; ANY_ACTIVITY for rules matching all"""
+    index: Dict[str, List[AchievementRule]] = {}
+    for rule in rules:
+        for activity_type in rule.activity_types or [ANY_ACTIVITY]:
+            index.setdefault(activity_type, []).append(rule)
+    return index
+
+def rule_value(rule: AchievementRule, event: ProgressEvent) -> Optional[str]:
+    """The value a distinct-counting rule records for an event"""
+    value = getattr(event, rule.distinct, None)
+    if value is None:
+        return None
+    value = species_for_theme(value) if rule.distinct == "animal" else str(value).strip().lower()
+    if rule.values and value not in rule.values:
+        return None
+    return value
+
+def rule_matches(rule: AchievementRule, event: ProgressEvent) -> bool:
+    return (
+        (not rule.completed or event.completion_status)
+        and event.score >= rule.min_score
+        and (not rule.difficulties or event.difficulty.strip().lower() in rule.difficulties)
+    )
+
+class AchievementEngine(LogProjection):
+    def __init__(self, rules: List[AchievementRule] = ACHIEVEMENTS):
+        super().__init__()
+        self.rules = rules
+        self.index = index_rules(rules)
+        # user -> rule id -> counter
+        self.counters: Dict[str, Dict[str, Counter]] = {}
+        # user -> rule id -> ISO timestamp of the event that earned it
+        self.earned: Dict[str, Dict[str, str]] = {}
+
+    def observe(self, event: ProgressEvent) -> None:
+        """Evaluate the rules this event's activity type can affect"""
+        activity_type = event.activity_type.strip().lower()
+        earned = self.earned.get(event.user_id, {})
+        for rule in self.index.get(activity_type, []) + self.index.get(ANY_ACTIVITY, []):
+            if rule.id in earned or not rule_matches(rule, event):
+                continue
+
+            counters = self.counters.setdefault(event.user_id, {})
+            if rule.distinct:
+                value = rule_value(rule, event)
+                if value is None:
+                    continue
+                seen = counters.setdefault(rule.id, set())
+                seen.add(value)
+                progress = len(seen)
+            else:
+                progress = counters[rule.id] = counters.get(rule.id, 0) + 1
+
+            if progress >= rule.threshold:
+                self.earned.setdefault(event.user_id, {})[rule.id] = event.timestamp.isoformat()
+                # The counter is no longer needed once the badge is earned
+                counters.pop(rule.id, None)
+                earned = self.earned[event.user_id]
+
+    def earned_ids(self, user_id: str) -> Set[str]:
+        return set(self.earned.get(user_id, ()))
+
+    def achievements(self, user_id: str) -> List[Dict[str, Any]]:
+        """Every badge with the user's earned state and progress towards it"""
+        earned = self.earned.get(user_id, {})
+        counters = self.counters.get(user_id, {})
+        result = []
+        for rule in self.rules:
+            counter = counters.get(rule.id, 0)
+            progress = rule.threshold if rule.id in earned else (len(counter) if isinstance(counter, set) else counter)
+            result.append({
+                "id": rule.id,
+                "title": rule.title,
+                "description": rule.description,
+                "icon": rule.icon,
+                "earned": rule.id in earned,
+                "earned_at": earned.get(rule.id),
+                "progress": progress,
+                "threshold": rule.threshold
+            })
+        return result
+
+    def rebuild(self, events: Iterable[ProgressEvent]) -> int:
+        """Recompute every counter and badge from the full history"""
+        self.counters = {}
+        self.earned = {}
+        count = 0
+        for event in events:
+            self.observe(event)
+            count += 1
+        return count
+
+    def to_dict(self) -> Dict:
+        return {
+            "counters": {
+                user: {rule_id: sorted(c) if isinstance(c, set) else c for rule_id, c in counters.items()}
+                for user, counters in self.counters.items()
+            },
+            "earned": self.earned
+        }
+
+    def restore(self, data: Dict) -> None:
+        self.counters = {
+            user: {rule_id: set(c) if isinstance(c, list) else c for rule_id, c in counters.items()}
+            for user, counters in data.get("counters", {}).items()
+        }
+        self.earned = data.get("earned", {})
+
+_store = ProjectionStore(AchievementEngine, ACHIEVEMENTS_PATH)
+
+def get_achievement_engine() -> AchievementEngine:
+    """Return the live achievements, picking up backfills as they land"""
+    return _store.current()
@@ -0,0 +1,192 @@
+"""
+"Children who did this next did..." recommendations.
+
+Items are kinds of activity rather than single plays. Activity ids are
+per game and never repeat, so an item is (activity type, difficulty,
+animal), which other learners can actually do next. Activities that
+follow each other in learners' histories (within a few steps) are counted
+in a sparse, directed item-item co-occurrence matrix, weighted by
+1 / distance. Each pair is scored as
+count / sqrt(occurrences(a) * occurrences(b)) so popular activities don't
+crowd out everything else, and every activity keeps its top-k neighbours.
+
+The matrix and neighbour lists are built offline in one vectorized pass
+(scripts/build_recommendations.py). New events update the affected counts
+and neighbour lists in place. An event also changes its item's occurrence
+count, and with it the score of that item in other rows' lists, so
+serving re-scores the (at most top_k) entries of each list it reads with
+current counts before merging the lists, best first, with a heap.
+"""
+import heapq
+import math
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from ..config.settings import RECOMMENDATIONS_PATH
+from .progress_events import LogProjection, ProgressEvent, ProjectionStore
+
+# How many following activities count as "did next"
+WINDOW = 3
+TOP_K = 20
+
+# Weight of the learner's recent activities when merging, newest first
+RECENCY_DECAY = 0.7
+
+def activity_key(activity_type: str, difficulty: str, animal: Optional[str] = None) -> str:
+    """The recommendable item an activity is an instance of"""
+    animal = (animal or "").strip().lower() or "any"
+    return f"{activity_type.strip().lower()}:{difficulty.strip().lower()}:{animal}"
+
+def event_key(event: ProgressEvent) -> str:
+    return activity_key(event.activity_type, event.difficulty, event.animal)
+
+class ActivityRecommender(LogProjection):
+    # 2: items are (type, difficulty, animal) rather than activity ids
+    snapshot_version = 2
+
+    def __init__(self, top_k: int = TOP_K):
+        super().__init__()
+        self.top_k = top_k
+        self.occurrences: Dict[str, float] = {}
+        # a -> b -> weighted count of b following a
+        self.cooccurrence: Dict[str, Dict[str, float]] = {}
+        # a -> [(score, b), ...] best first
+        self.neighbors: Dict[str, List[Tuple[float, str]]] = {}
+        # Each learner's last WINDOW activities, to pair with their next one
+        self.tails: Dict[str, Deque[str]] = {}
+
+    def _score(self, a: str, b: str) -> float:
+        return self.cooccurrence[a][b] / math.sqrt(self.occurrences[a] * self.occurrences[b])
+
+    def observe(self, event: ProgressEvent) -> None:
+        """Add the pairs an event forms with the learner's previous activities"""
+        item = event_key(event)
+        self.occurrences[item] = self.occurrences.get(item, 0.0) + 1.0
+
+        tail = self.tails.get(event.user_id)
+        if tail is None:
+            tail = self.tails[event.user_id] = deque(maxlen=WINDOW)
+
+        for distance, previous in enumerate(reversed(tail), start=1):
+            if previous == item:
+                continue
+            row = self.cooccurrence.setdefault(previous, {})
+            row[item] = row.get(item, 0.0) + 1.0 / distance
+            self._update_neighbor(previous, item)
+        tail.append(item)
+
+    def _update_neighbor(self, a: str, b: str) -> None:
+        """Re-score a's top-k list with current counts, considering b for it; O(k)"""
+        candidates = {neighbor for _, neighbor in self.neighbors.get(a, [])}
+        candidates.add(b)
+        ranked = sorted(
+            ((self._score(a, neighbor), neighbor) for neighbor in candidates),
+            key=lambda entry: (-entry[0], entry[1])
+        )
+        self.neighbors[a] = ranked[:self.top_k]
+
+    def recommend(self, recent: Sequence[str], limit: int = 5, exclude: Iterable[str] = ()) -> List[str]:
+        """
+        Activities to try next, given recent activity keys (oldest first).
+
+        Each neighbour list is re-scored with current counts and sorted
+        (O(k)), then a heap merge of the recency-weighted lists yields
+        candidates best first and stops after limit of them.
+        """
+        skip = set(exclude) | set(recent)
+        lists = []
+        weight = 1.0
+        for item in reversed(recent):
+            neighbors = self.neighbors.get(item)
+            if neighbors:
+                scored = sorted((-weight * self._score(item, candidate), candidate) for _, candidate in neighbors)
+                lists.append(scored)
+            weight *= RECENCY_DECAY
+
+        picked: List[str] = []
+        for _, candidate in heapq.merge(*lists):
+            if candidate not in skip:
+                skip.add(candidate)
+                picked.append(candidate)
+                if len(picked) == limit:
+                    break
+        return picked
+
+    def rebuild(self, events: Iterable[ProgressEvent]) -> int:
+        """Recompute the matrix and every neighbour list from the full history"""
+        item_ids: Dict[str, int] = {}
+        user_ids: Dict[str, int] = {}
+        items, users = [], []
+        for event in events:
+            items.append(item_ids.setdefault(event_key(event), len(item_ids)))
+            users.append(user_ids.setdefault(event.user_id, len(user_ids)))
+
+        names = list(item_ids)
+        item = np.array(items, dtype=np.int64)
+        user = np.array(users, dtype=np.int64)
+
+        # Group each learner's events together, keeping log order within a learner
+        order = np.argsort(user, kind="stable")
+        item, user = item[order], user[order]
+        occurrences = np.bincount(item, minlength=len(names)).astype(float)
+
+        sources, targets, weights = [], [], []
+        for distance in range(1, WINDOW + 1):
+            a, b = item[:-distance], item[distance:]
+            mask = (user[:-distance] == user[distance:]) & (a != b)
+            sources.append(a[mask])
+            targets.append(b[mask])
+            weights.append(np.full(int(mask.sum()), 1.0 / distance))
+
+        source = np.concatenate(sources) if sources else np.zeros(0, dtype=np.int64)
+        target = np.concatenate(targets) if targets else np.zeros(0, dtype=np.int64)
+        pair_keys, inverse = np.unique(source * len(names) + target, return_inverse=True)
+        counts = np.bincount(inverse, np.concatenate(weights) if weights else None, len(pair_keys))
+        row, col = pair_keys // max(len(names), 1), pair_keys % max(len(names), 1)
+        scores = counts / np.sqrt(occurrences[row] * occurrences[col])
+
+        # Top-k per row: sort by (row, -score), then keep each row's first k
+        ranked = np.lexsort((col, -scores, row))
+        row, col, counts, scores = row[ranked], col[ranked], counts[ranked], scores[ranked]
+        row_start = np.searchsorted(row, row)
+        keep = np.arange(len(row)) - row_start < self.top_k
+
+        self.occurrences = {names[i]: float(count) for i, count in enumerate(occurrences)}
+        self.cooccurrence = {}
+        for a, b, count in zip(row.tolist(), col.tolist(), counts.tolist()):
+            self.cooccurrence.setdefault(names[a], {})[names[b]] = count
+        self.neighbors = {}
+        for a, b, score in zip(row[keep].tolist(), col[keep].tolist(), scores[keep].tolist()):
+            self.neighbors.setdefault(names[a], []).append((score, names[b]))
+
+        # Learners' last activities, so pairs across the snapshot boundary count
+        self.tails = {}
+        reverse_users = list(user_ids)
+        for u, i in zip(user.tolist(), item.tolist()):
+            tail = self.tails.get(reverse_users[u])
+            if tail is None:
+                tail = self.tails[reverse_users[u]] = deque(maxlen=WINDOW)
+            tail.append(names[i])
+        return len(items)
+
+    def to_dict(self) -> Dict:
+        return {
+            "top_k": self.top_k,
+            "occurrences": self.occurrences,
+            "cooccurrence": self.cooccurrence,
+            "neighbors": {a: [[score, b] for score, b in ranked] for a, ranked in self.neighbors.items()},
+            "tails": {user: list(tail) for user, tail in self.tails.items()}
+        }
+
+    def restore(self, data: Dict) -> None:
+        self.top_k = data.get("top_k", TOP_K)
+        self.occurrences = data.get("occurrences", {})
+        self.cooccurrence = data.get("cooccurrence", {})
+        self.neighbors = {a: [(score, b) for score, b in ranked] for a, ranked in data.get("neighbors", {}).items()}
+        self.tails = {user: deque(tail, maxlen=WINDOW) for user, tail in data.get("tails", {}).items()}
+
+_store = ProjectionStore(ActivityRecommender, RECOMMENDATIONS_PATH)
+
+def get_activity_recommender() -> ActivityRecommender:
+    """Return the live recommender, picking up new batch builds as they land"""
+    return _store.current()
@@ -0,0 +1,239 @@
+"""
+Compact in-memory store of each user's recent activities.
+
+Every user owns one row of a set of parallel typed arrays, used as a ring
+buffer of the last `capacity` activities: interned activity type, activity
+id, difficulty and animal codes, float32 score, uint32 time spent, int64
+epoch milliseconds and a completion flag, 26 bytes per activity in all. Rows live
+in shared 2-D slabs that grow by doubling, so a user costs one dict entry
+and a row rather than dozens of Python objects.
+
+Activity ids are mostly per-game and never repeat, so their codes are
+reference counted: when the ring overwrites the last slot holding an id,
+its code and string are released and the code is reused. The strings
+held are therefore bounded by the slots in use, however many games have
+been played.
+
+view() returns NumPy views into a user's row without copying. Slots are in
+storage order (rotated once the ring has wrapped); aggregates don't care,
+and chronological() gives the order for the few things that do.
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+import numpy as np
+
+# Activities kept per user
+DEFAULT_CAPACITY = 50
+INITIAL_USERS = 1024
+
+class Interner:
+    """Maps strings to small integer codes and back"""
+
+    def __init__(self, dtype):
+        self.dtype = np.dtype(dtype)
+        self.codes: Dict[str, int] = {}
+        self.names: List[str] = []
+
+    def code(self, name: str) -> int:
+        code = self.codes.get(name)
+        if code is None:
+            if len(self.names) > np.iinfo(self.dtype).max:
+                raise OverflowError(f"More than {np.iinfo(self.dtype).max + 1} distinct values for {self.dtype}")
+            code = self.codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+    def name(self, code: int) -> str:
+        return self.names[code]
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+class RecyclingInterner(Interner):
+    """An Interner whose codes are released when no slot holds them any more"""
+
+    def __init__(self, dtype):
+        super().__init__(dtype)
+        self.refs: List[int] = []
+        self.free: List[int] = []
+
+    def code(self, name: str) -> int:
+        """The code for name, with one more reference to it"""
+        code = self.codes.get(name)
+        if code is None:
+            if self.free:
+                code = self.free.pop()
+                self.names[code] = name
+            else:
+                code = super().code(name)
+                self.refs.append(0)
+            self.codes[name] = code
+        self.refs[code] += 1
+        return code
+
+    def release(self, code: int) -> None:
+        self.refs[code] -= 1
+        if not self.refs[code]:
+            del self.codes[self.names[code]]
+            self.names[code] = None
+            self.free.append(code)
+
+class ActivityView:
+    """Zero-copy views of one user's activity arrays"""
+    __slots__ = ("store", "head", "activity_type", "activity_id", "difficulty", "animal",
+                 "score", "time_spent", "timestamp", "completed")
+
+    def __init__(self, store: "ActivityStore", row: int, count: int, head: int):
+        self.store = store
+        self.head = head  # slot of the oldest activity
+        self.activity_type = store.activity_type[row, :count]
+        self.activity_id = store.activity_id[row, :count]
+        self.difficulty = store.difficulty[row, :count]
+        self.animal = store.animal[row, :count]
+        self.score = store.score[row, :count]
+        self.time_spent = store.time_spent[row, :count]
+        self.timestamp = store.timestamp[row, :count]
+        self.completed = store.completed[row, :count]
+
+    def __len__(self) -> int:
+        return len(self.score)
+
+    def chronological(self) -> np.ndarray:
+        """Slot indices oldest first"""
+        return (np.arange(len(self)) + self.head) % max(len(self), 1)
+
+    def latest(self) -> Optional[int]:
+        """Slot of the newest activity"""
+        return (self.head - 1) % len(self) if len(self) else None
+
+    def type_names(self) -> List[str]:
+        return self.store.types.names
+
+    def difficulty_name(self, slot: int) -> str:
+        return self.store.difficulties.name(int(self.difficulty[slot]))
+
+    def keys(self, slots: Iterable[int]) -> List[tuple]:
+        """(activity_type, difficulty, animal) for the given slots; animal is "" when unknown"""
+        return [
+            (
+                self.store.types.name(int(self.activity_type[slot])),
+                self.store.difficulties.name(int(self.difficulty[slot])),
+                self.store.animals.name(int(self.animal[slot]))
+            )
+            for slot in slots
+        ]
+
+class ActivityStore:
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, initial_users: int = INITIAL_USERS):
+        self.capacity = capacity
+        self.types = Interner(np.uint16)
+        self.difficulties = Interner(np.uint8)
+        self.animals = Interner(np.uint16)
+        self.ids = RecyclingInterner(np.uint32)
+        self.rows: Dict[str, int] = {}
+        self.counts = np.zeros(initial_users, dtype=np.uint16)
+        self.heads = np.zeros(initial_users, dtype=np.uint16)  # next slot to write
+        shape = (initial_users, capacity)
+        self.activity_type = np.zeros(shape, dtype=np.uint16)
+        self.activity_id = np.zeros(shape, dtype=np.uint32)
+        self.difficulty = np.zeros(shape, dtype=np.uint8)
+        self.animal = np.zeros(shape, dtype=np.uint16)
+        self.score = np.zeros(shape, dtype=np.float32)
+        self.time_spent = np.zeros(shape, dtype=np.uint32)
+        self.timestamp = np.zeros(shape, dtype=np.int64)  # epoch milliseconds
+        self.completed = np.zeros(shape, dtype=np.bool_)
+
+    _ARRAYS = ("activity_type", "activity_id", "difficulty", "animal", "score", "time_spent", "timestamp", "completed")
+
+    def _grow(self) -> None:
+        size = len(self.counts) * 2
+        self.counts = np.resize(self.counts, size)
+        self.heads = np.resize(self.heads, size)
+        for name in self._ARRAYS:
+            old = getattr(self, name)
+            new = np.zeros((size, self.capacity), dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+        self.counts[size // 2:] = 0
+        self.heads[size // 2:] = 0
+
+    def _row(self, user_id: str) -> int:
+        row = self.rows.get(user_id)
+        if row is None:
+            if len(self.rows) == len(self.counts):
+                self._grow()
+            row = self.rows[user_id] = len(self.rows)
+        return row
+
+    def append(
+        self,
+        user_id: str,
+        activity_type: str,
+        activity_id: str,
+        score: float,
+        time_spent: int,
+        completion_status: bool,
+        difficulty: str,
+        timestamp: datetime,
+        animal: Optional[str] = None
+    ) -> None:
+        row = self._row(user_id)
+        slot = int(self.heads[row])
+        if self.counts[row] == self.capacity:
+            # The oldest activity is overwritten
+            self.ids.release(int(self.activity_id[row, slot]))
+        self.activity_type[row, slot] = self.types.code(activity_type)
+        self.activity_id[row, slot] = self.ids.code(activity_id)
+        self.difficulty[row, slot] = self.difficulties.code(difficulty)
+        self.animal[row, slot] = self.animals.code(animal or "")
+        self.score[row, slot] = score
+        self.time_spent[row, slot] = max(int(time_spent), 0)
+        self.timestamp[row, slot] = int(timestamp.timestamp() * 1000)
+        self.completed[row, slot] = completion_status
+        self.heads[row] = (slot + 1) % self.capacity
+        self.counts[row] = min(int(self.counts[row]) + 1, self.capacity)
+
+    def add(self, event) -> None:
+        """Append a ProgressEvent (or anything with the same fields)"""
+        self.append(
+            event.user_id, event.activity_type, event.activity_id, event.score,
+            event.time_spent, event.completion_status, event.difficulty, event.timestamp,
+            getattr(event, "animal", None)
+        )
+
+    def view(self, user_id: str) -> ActivityView:
+        row = self.rows.get(user_id)
+        if row is None:
+            return ActivityView(self, 0, 0, 0)
+        count = int(self.counts[row])
+        # Until the ring wraps the oldest activity is in slot 0
+        head = int(self.heads[row]) if count == self.capacity else 0
+        return ActivityView(self, row, count, head)
+
+    @classmethod
+    def from_activities(cls, activities: Iterable[Any], user_id: str = "") -> "ActivityStore":
+        """A one-user store holding activities (dicts or models), oldest first"""
+        activities = list(activities)
+        store = cls(capacity=max(len(activities), 1), initial_users=1)
+        for activity in activities:
+            if not isinstance(activity, dict):
+                activity = vars(activity)
+            timestamp = activity["timestamp"]
+            if isinstance(timestamp, str):
+                timestamp = datetime.fromisoformat(timestamp)
+            store.append(
+                user_id,
+                activity["activity_type"],
+                activity["activity_id"],
+                activity["score"],
+                activity["time_spent"],
+                activity["completion_status"],
+                activity["difficulty"],
+                timestamp,
+                activity.get("animal")
+            )
+        return store
+
+    def nbytes(self) -> int:
+        """Bytes held by the arrays (allocated rows, used or not)"""
+        return sum(getattr(self, name).nbytes for name in self._ARRAYS) + self.counts.nbytes + self.heads.nbytes
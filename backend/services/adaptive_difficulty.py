@@ -0,0 +1,209 @@
+"""
+Adaptive difficulty from per-skill ability estimates.
+
+A learner has an ability estimate per skill (activity type) and each
+(skill, difficulty) has a difficulty parameter, both on a logit scale: the
+predicted success rate is sigmoid(ability - difficulty). Every event nudges
+the learner's ability Elo-style, in O(1), by K * (outcome - predicted). K
+shrinks as evidence accumulates and grows again after a break, since
+evidence decays with a half-life. An overall ("*") ability is tracked next
+to the per-skill ones and seeds skills the learner hasn't tried yet.
+
+A batch job (scripts/recalibrate_difficulty.py) refits all abilities and
+difficulty parameters over the full history in one vectorized pass and
+writes a snapshot; servers pick it up and replay newer events on top.
+"""
+import math
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from ..config.settings import ABILITY_MODEL_PATH
+from .progress_events import LogProjection, ProgressEvent, ProjectionStore
+
+DIFFICULTIES = ["easy", "medium", "hard"]
+LEVELS = ["beginner", "intermediate", "advanced"]
+LEVEL_FOR_DIFFICULTY = dict(zip(DIFFICULTIES, LEVELS))
+DIFFICULTY_FOR_LEVEL = dict(zip(LEVELS, DIFFICULTIES))
+
+# Starting difficulty parameters, before any recalibration
+DEFAULT_DIFFICULTY = {"easy": -1.0, "medium": 0.0, "hard": 1.0}
+
+OVERALL = "*"
+
+# Pick the difficulty whose predicted success rate is closest to this
+TARGET_SUCCESS = 0.75
+
+# Learning rate: K_MAX for a new skill, decaying towards K_MIN with evidence
+K_MAX = 0.8
+K_MIN = 0.1
+K_EVIDENCE = 5.0
+
+# Evidence (and batch sample weight) halves over this many days
+HALF_LIFE_DAYS = 14.0
+
+# Priors for the batch fit: abilities around 0, difficulties around the defaults
+ABILITY_PRIOR = 0.1
+DIFFICULTY_PRIOR = 1.0
+FIT_ITERATIONS = 50
+MAX_STEP = 1.0
+
+SECONDS_PER_DAY = 86400.0
+
+def sigmoid(x: float) -> float:
+    if x >= 0:
+        return 1.0 / (1.0 + math.exp(-x))
+    z = math.exp(x)
+    return z / (1.0 + z)
+
+def event_outcome(event: ProgressEvent) -> float:
+    """Success in [0, 1]; an abandoned activity counts as a miss"""
+    return min(max(event.score, 0.0), 1.0) if event.completion_status else 0.0
+
+def normalize_difficulty(difficulty: str) -> Optional[str]:
+    """easy/medium/hard for a difficulty or level name, None for anything else"""
+    difficulty = difficulty.strip().lower()
+    difficulty = DIFFICULTY_FOR_LEVEL.get(difficulty, difficulty)
+    return difficulty if difficulty in DEFAULT_DIFFICULTY else None
+
+class AdaptiveDifficultyModel(LogProjection):
+    def __init__(self):
+        super().__init__()
+        # (user_id, skill) -> [ability, evidence, last_seen (epoch seconds)]
+        self.abilities: Dict[Tuple[str, str], List[float]] = {}
+        # skill -> difficulty -> parameter; missing skills use DEFAULT_DIFFICULTY
+        self.difficulty: Dict[str, Dict[str, float]] = {}
+
+    def _difficulty(self, skill: str, difficulty: str) -> float:
+        return self.difficulty.get(skill, DEFAULT_DIFFICULTY).get(difficulty, DEFAULT_DIFFICULTY[difficulty])
+
+    def _state(self, user_id: str, skill: str) -> List[float]:
+        state = self.abilities.get((user_id, skill))
+        if state is None:
+            # New skills start from the learner's overall ability
+            overall = self.abilities.get((user_id, OVERALL))
+            state = [overall[0] if overall else 0.0, 0.0, 0.0]
+        return state
+
+    def ability(self, user_id: str, skill: str = OVERALL) -> float:
+        return self._state(user_id, skill)[0]
+
+    def _update(self, user_id: str, skill: str, difficulty: float, outcome: float, timestamp: float) -> None:
+        state = self._state(user_id, skill)
+        ability, evidence, last_seen = state
+        if last_seen:
+            evidence *= 0.5 ** (max(timestamp - last_seen, 0.0) / SECONDS_PER_DAY / HALF_LIFE_DAYS)
+
+        k = max(K_MIN, K_MAX / (1.0 + evidence / K_EVIDENCE))
+        ability += k * (outcome - sigmoid(ability - difficulty))
+        self.abilities[(user_id, skill)] = [ability, evidence + 1.0, max(timestamp, last_seen)]
+
+    def observe(self, event: ProgressEvent) -> None:
+        """Update the learner's skill and overall ability from one event"""
+        difficulty = normalize_difficulty(event.difficulty)
+        if difficulty is None:
+            return
+        skill = event.activity_type.strip().lower()
+        outcome = event_outcome(event)
+        timestamp = event.timestamp.timestamp()
+        self._update(event.user_id, skill, self._difficulty(skill, difficulty), outcome, timestamp)
+        self._update(event.user_id, OVERALL, self._difficulty(OVERALL, difficulty), outcome, timestamp)
+
+    def success_probability(self, user_id: str, skill: str, difficulty: str) -> float:
+        skill = skill.strip().lower()
+        return sigmoid(self.ability(user_id, skill) - self._difficulty(skill, difficulty))
+
+    def recommend_difficulty(self, user_id: str, skill: str = OVERALL, options: Sequence[str] = DIFFICULTIES) -> str:
+        """The difficulty the learner is most likely to succeed at TARGET_SUCCESS of the time"""
+        candidates = [option for option in options if option in DEFAULT_DIFFICULTY] or DIFFICULTIES
+        return min(
+            candidates,
+            key=lambda option: abs(self.success_probability(user_id, skill, option) - TARGET_SUCCESS)
+        )
+
+    def recommend_level(self, user_id: str, skill: str = OVERALL) -> str:
+        return LEVEL_FOR_DIFFICULTY[self.recommend_difficulty(user_id, skill)]
+
+    def skills(self, user_id: str) -> List[str]:
+        return sorted(skill for user, skill in self.abilities if user == user_id and skill != OVERALL)
+
+    def recalibrate(self, events: Iterable[ProgressEvent], now: Optional[float] = None) -> int:
+        """
+        Refit every ability and difficulty parameter over the full history.
+
+        Maximises the recency-weighted Bernoulli likelihood of the outcomes,
+        with Gaussian priors, using diagonal Newton steps over NumPy arrays;
+        every observation counts once for its skill and once for OVERALL.
+        Returns the number of events used.
+        """
+        now = time.time() if now is None else now
+        user_keys: Dict[Tuple[str, str], int] = {}
+        item_keys: Dict[Tuple[str, str], int] = {}
+        rows_user, rows_item, outcomes, timestamps = [], [], [], []
+
+        for event in events:
+            difficulty = normalize_difficulty(event.difficulty)
+            if difficulty is None:
+                continue
+            skill = event.activity_type.strip().lower()
+            timestamp = event.timestamp.timestamp()
+            outcome = event_outcome(event)
+            for key_skill in (skill, OVERALL):
+                rows_user.append(user_keys.setdefault((event.user_id, key_skill), len(user_keys)))
+                rows_item.append(item_keys.setdefault((key_skill, difficulty), len(item_keys)))
+                outcomes.append(outcome)
+                timestamps.append(timestamp)
+
+        if not rows_user:
+            return 0
+
+        users = np.array(rows_user)
+        items = np.array(rows_item)
+        outcome = np.array(outcomes)
+        stamps = np.array(timestamps)
+        weight = 0.5 ** (np.maximum(now - stamps, 0.0) / SECONDS_PER_DAY / HALF_LIFE_DAYS)
+
+        prior = np.array([DEFAULT_DIFFICULTY[difficulty] for _, difficulty in item_keys])
+        ability = np.zeros(len(user_keys))
+        difficulty = prior.copy()
+
+        for _ in range(FIT_ITERATIONS):
+            # Alternate ability and difficulty steps; each is a damped Newton step
+            for params, index, sign, strength, center in (
+                (ability, users, 1.0, ABILITY_PRIOR, 0.0),
+                (difficulty, items, -1.0, DIFFICULTY_PRIOR, prior)
+            ):
+                predicted = 1.0 / (1.0 + np.exp(difficulty[items] - ability[users]))
+                residual = weight * (outcome - predicted)
+                curvature = weight * predicted * (1.0 - predicted)
+                gradient = sign * np.bincount(index, residual, len(params)) - strength * (params - center)
+                hessian = np.bincount(index, curvature, len(params)) + strength
+                params += np.clip(gradient / hessian, -MAX_STEP, MAX_STEP)
+
+        evidence = np.bincount(users, weight, len(user_keys))
+        last_seen = np.zeros(len(user_keys))
+        np.maximum.at(last_seen, users, stamps)
+
+        self.abilities = {
+            key: [float(ability[i]), float(evidence[i]), float(last_seen[i])]
+            for key, i in user_keys.items()
+        }
+        self.difficulty = {}
+        for (skill, level), i in item_keys.items():
+            self.difficulty.setdefault(skill, dict(DEFAULT_DIFFICULTY))[level] = round(float(difficulty[i]), 4)
+        return len(rows_user) // 2
+
+    def to_dict(self) -> Dict:
+        return {
+            "difficulty": self.difficulty,
+            "abilities": [[user, skill, *state] for (user, skill), state in self.abilities.items()]
+        }
+
+    def restore(self, data: Dict) -> None:
+        self.difficulty = data.get("difficulty", {})
+        self.abilities = {(user, skill): list(state) for user, skill, *state in data.get("abilities", [])}
+
+_store = ProjectionStore(AdaptiveDifficultyModel, ABILITY_MODEL_PATH)
+
+def get_difficulty_model() -> AdaptiveDifficultyModel:
+    """Return the live ability model, picking up new recalibrations as they land"""
+    return _store.current()
@@ -0,0 +1,249 @@
+"""
+Fire-and-forget analytics.
+
+Request handlers call emit(), which only appends to an in-memory queue. A
+background task drains the queue in batches to the configured sink
+(Mixpanel, or a local JSONL file) from a worker thread, so a slow or
+unreachable analytics backend never holds up a request.
+
+When a send fails or times out, the batch is spooled to disk and the sink
+is left alone for a backoff period; spooled batches are replayed, oldest
+first, once a send succeeds again. The spool is capped in bytes (oldest
+batches go first). If the queue itself backs up past SAMPLE_DEPTH, the
+high-volume events in SAMPLED_EVENTS are sampled, recording the rate they
+were kept at; past MAX_DEPTH every new event is dropped and counted.
+
+Events carry an insert id, so a batch that was spooled after a timeout but
+did reach Mixpanel is de-duplicated on replay.
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Protocol
+from pydantic import BaseModel, Field
+from ..config.agent_config import ANALYTICS_EVENTS
+from ..config.settings import ANALYTICS_FILE, ANALYTICS_SPOOL_DIR, MIXPANEL_TOKEN
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50  # Mixpanel's per-request limit
+FLUSH_INTERVAL = 2.0
+SEND_TIMEOUT = 10.0
+BACKOFF = (5.0, 300.0)  # seconds before retrying a failing sink, doubling up to the max
+
+SAMPLE_DEPTH = 2000  # queued events before high-volume events are sampled
+MAX_DEPTH = 10000  # queued events before everything new is dropped
+MIN_SAMPLE_RATE = 0.05
+SAMPLED_EVENTS = {"puzzle_attempted", "time_spent", "animal_selected"}
+
+MAX_SPOOL_BYTES = 64 * 1024 * 1024
+
+class AnalyticsEvent(BaseModel):
+    event: str
+    distinct_id: str
+    properties: Dict[str, Any] = {}
+    time: float = Field(default_factory=time.time)
+    insert_id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+
+class AnalyticsSink(Protocol):
+    def send(self, events: List[AnalyticsEvent]) -> None:
+        """Deliver a batch, raising on failure; runs in a worker thread"""
+        ...
+
+class FileSink:
+    """Appends events as JSON lines; for development and tests"""
+
+    def __init__(self, path: Path = ANALYTICS_FILE):
+        self.path = Path(path)
+
+    def send(self, events: List[AnalyticsEvent]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "ab") as f:
+            f.write(b"".join(event.model_dump_json().encode("utf-8") + b"\n" for event in events))
+
+class MixpanelSink:
+    """Sends batches to Mixpanel's /track endpoint, one request per batch"""
+
+    def __init__(self, token: str = MIXPANEL_TOKEN, request_timeout: float = SEND_TIMEOUT):
+        from mixpanel import Consumer
+
+        self.token = token
+        self.consumer = Consumer(request_timeout=request_timeout, retry_limit=1)
+
+    def send(self, events: List[AnalyticsEvent]) -> None:
+        messages = [
+            {
+                "event": event.event,
+                "properties": {
+                    **event.properties,
+                    "token": self.token,
+                    "distinct_id": event.distinct_id,
+                    "time": event.time,
+                    "$insert_id": event.insert_id,
+                    "mp_lib": "python"
+                }
+            }
+            for event in events
+        ]
+        self.consumer.send("events", json.dumps(messages, separators=(",", ":")))
+
+class Spool:
+    """Failed batches on disk, one JSONL file per batch, replayed oldest first"""
+
+    def __init__(self, directory: Path = ANALYTICS_SPOOL_DIR, max_bytes: int = MAX_SPOOL_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def files(self) -> List[Path]:
+        # Names start with a zero-padded timestamp, so they sort oldest first
+        return sorted(self.directory.glob("*.jsonl")) if self.directory.exists() else []
+
+    def write(self, events: List[AnalyticsEvent]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.jsonl"
+        tmp = self.directory / (name + ".tmp")
+        tmp.write_bytes(b"".join(event.model_dump_json().encode("utf-8") + b"\n" for event in events))
+        os.replace(tmp, self.directory / name)
+        self._trim()
+
+    def _trim(self) -> None:
+        files = self.files()
+        sizes = [path.stat().st_size for path in files]
+        total = sum(sizes)
+        for path, size in zip(files, sizes):
+            if total <= self.max_bytes:
+                break
+            logger.warning(f"Analytics spool over {self.max_bytes} bytes, dropping {path.name}")
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def read(self, path: Path) -> List[AnalyticsEvent]:
+        events = []
+        for line in path.read_bytes().splitlines():
+            try:
+                events.append(AnalyticsEvent.model_validate_json(line))
+            except ValueError:
+                logger.warning(f"Skipping malformed spooled analytics event in {path.name}")
+        return events
+
+class AnalyticsEmitter:
+    def __init__(self, sink: AnalyticsSink, spool: Optional[Spool] = None):
+        self.sink = sink
+        self.spool = spool or Spool()
+        self._queue: Deque[AnalyticsEvent] = deque()
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._retry_at = 0.0
+        self._backoff = BACKOFF[0]
+        self.stats = {"emitted": 0, "sent": 0, "spooled": 0, "sampled_out": 0, "dropped": 0}
+
+    # Producer side: never blocks, never raises
+
+    def emit(self, event: str, distinct_id: Optional[str] = None, **properties: Any) -> None:
+        """Queue an event for delivery"""
+        if event not in ANALYTICS_EVENTS:
+            logger.warning(f"Ignoring unknown analytics event {event!r}")
+            return
+
+        depth = len(self._queue)
+        if depth >= MAX_DEPTH:
+            self.stats["dropped"] += 1
+            return
+        if depth >= SAMPLE_DEPTH and event in SAMPLED_EVENTS:
+            rate = max(MIN_SAMPLE_RATE, 1.0 - (depth - SAMPLE_DEPTH) / (MAX_DEPTH - SAMPLE_DEPTH))
+            if random.random() >= rate:
+                self.stats["sampled_out"] += 1
+                return
+            properties["sample_rate"] = round(rate, 3)
+
+        self._queue.append(AnalyticsEvent(event=event, distinct_id=distinct_id or "anonymous", properties=properties))
+        self.stats["emitted"] += 1
+        if len(self._queue) >= BATCH_SIZE and self._loop is not None:
+            # emit may be called from worker threads
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    # Consumer side
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            self._task = self._loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Analytics flush failed")
+
+    def _take(self) -> List[AnalyticsEvent]:
+        count = min(BATCH_SIZE, len(self._queue))
+        return [self._queue.popleft() for _ in range(count)]
+
+    async def _send(self, events: List[AnalyticsEvent]) -> bool:
+        if time.monotonic() < self._retry_at:
+            return False
+        try:
+            await asyncio.wait_for(asyncio.to_thread(self.sink.send, events), SEND_TIMEOUT)
+        except Exception as e:
+            self._retry_at = time.monotonic() + self._backoff
+            logger.warning(f"Analytics sink failed ({e!r}); spooling for {self._backoff:.0f}s")
+            self._backoff = min(self._backoff * 2, BACKOFF[1])
+            return False
+        self._backoff = BACKOFF[0]
+        self.stats["sent"] += len(events)
+        return True
+
+    async def flush(self) -> None:
+        """Send (or spool) everything queued, then replay spooled batches while the sink keeps up"""
+        while self._queue:
+            batch = self._take()
+            if not await self._send(batch):
+                await asyncio.to_thread(self.spool.write, batch)
+                self.stats["spooled"] += len(batch)
+
+        for path in await asyncio.to_thread(self.spool.files):
+            events = await asyncio.to_thread(self.spool.read, path)
+            if events and not await self._send(events):
+                break
+            path.unlink(missing_ok=True)
+
+    async def stop(self) -> None:
+        """Stop the background task, sending or spooling whatever is still queued"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Final analytics flush failed")
+
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+def default_sink() -> AnalyticsSink:
+    """Mixpanel when MIXPANEL_TOKEN is set, otherwise a local JSONL file"""
+    if MIXPANEL_TOKEN:
+        return MixpanelSink(MIXPANEL_TOKEN)
+    return FileSink(ANALYTICS_FILE)
+
+_emitter: Optional[AnalyticsEmitter] = None
+
+def get_analytics() -> AnalyticsEmitter:
+    global _emitter
+    if _emitter is None:
+        _emitter = AnalyticsEmitter(default_sink())
+    return _emitter
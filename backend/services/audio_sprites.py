@@ -0,0 +1,254 @@
+"""
+Audio sprites for the animal sounds game.
+
+All per-animal clips are normalised to one PCM format and concatenated
+into a single WAV file, with a short silence between clips, plus an index
+of where each clip starts (in seconds and in bytes). A game then needs one
+download instead of one per sound, and clients that prefer to can fetch a
+single clip with an HTTP Range request. Sprites are built offline with the
+standard-library wave module and written under a content-hash filename.
+The index file is re-checked every few seconds, so a sprite rebuilt by
+scripts/build_audio_sprites.py is served without a restart.
+"""
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import time
+import wave
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from ..config.animal_assets import images_by_species, species_for_sound
+from ..config.settings import ANIMAL_SOUNDS_DIR, AUDIO_SPRITES_DIR
+
+logger = logging.getLogger(__name__)
+
+# Sprite format: 16-bit mono is plenty for short animal calls
+SAMPLE_RATE = 22050
+SAMPLE_WIDTH = 2
+CHANNELS = 1
+
+MAX_CLIP_SECONDS = 4.0
+FADE_SECONDS = 0.01  # avoids clicks at clip boundaries
+GAP_SECONDS = 0.25  # silence between clips, so a late stop doesn't play the next one
+
+INDEX_NAME = "index.json"
+SPRITE_NAME = re.compile(r"^animals\.[0-9a-f]{16}\.wav$")
+
+def read_clip(path: Path) -> np.ndarray:
+    """Decode a WAV file to mono float samples at the sprite sample rate"""
+    with wave.open(str(path), "rb") as source:
+        channels = source.getnchannels()
+        width = source.getsampwidth()
+        rate = source.getframerate()
+        frames = source.readframes(source.getnframes())
+
+    if width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2:
+        samples = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768
+    elif width == 4:
+        samples = np.frombuffer(frames, dtype="<i4").astype(np.float32) / 2147483648
+    else:
+        raise ValueError(f"{path.name}: unsupported sample width {width * 8} bits")
+
+    samples = samples.reshape(-1, channels).mean(axis=1)
+    if rate != SAMPLE_RATE:
+        # Linear interpolation is fine for short, band-limited animal calls
+        duration = len(samples) / rate
+        positions = np.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE
+        samples = np.interp(positions, np.arange(len(samples)) / rate, samples).astype(np.float32)
+
+    samples = samples[:int(MAX_CLIP_SECONDS * SAMPLE_RATE)].copy()
+    fade = min(int(FADE_SECONDS * SAMPLE_RATE), len(samples) // 2)
+    if fade:
+        ramp = np.linspace(0.0, 1.0, fade, dtype=np.float32)
+        samples[:fade] *= ramp
+        samples[-fade:] *= ramp[::-1]
+    return samples
+
+def build_sprite(sources: Dict[str, Path], output_dir: Path) -> Dict[str, Any]:
+    """Concatenate clips (species -> WAV path) into one sprite; returns its index"""
+    gap = np.zeros(int(GAP_SECONDS * SAMPLE_RATE), dtype=np.float32)
+    parts = []
+    clips: Dict[str, Dict[str, Any]] = {}
+    position = 0  # in frames
+
+    for species in sorted(sources):
+        samples = read_clip(sources[species])
+        clips[species] = {"source": sources[species].name, "start_frame": position, "frames": len(samples)}
+        parts.extend([samples, gap])
+        position += len(samples) + len(gap)
+
+    pcm = np.clip(np.concatenate(parts) if parts else gap, -1.0, 1.0)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as sprite:
+        sprite.setnchannels(CHANNELS)
+        sprite.setsampwidth(SAMPLE_WIDTH)
+        sprite.setframerate(SAMPLE_RATE)
+        sprite.writeframes((pcm * 32767).astype("<i2").tobytes())
+    data = buffer.getvalue()
+
+    digest = hashlib.sha256(data).hexdigest()[:16]
+    filename = f"animals.{digest}.wav"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    target = output_dir / filename
+    if not target.exists():
+        tmp = target.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, target)
+
+    data_offset = data.index(b"data") + 8
+    frame_bytes = SAMPLE_WIDTH * CHANNELS
+    return {
+        "sprite": filename,
+        "etag": f'"{digest}"',
+        "bytes": len(data),
+        "sample_rate": SAMPLE_RATE,
+        "channels": CHANNELS,
+        "sample_width": SAMPLE_WIDTH,
+        "data_offset": data_offset,
+        "clips": {
+            species: {
+                "source": clip["source"],
+                "start": round(clip["start_frame"] / SAMPLE_RATE, 4),
+                "duration": round(clip["frames"] / SAMPLE_RATE, 4),
+                "byte_offset": data_offset + clip["start_frame"] * frame_bytes,
+                "byte_length": clip["frames"] * frame_bytes
+            }
+            for species, clip in clips.items()
+        }
+    }
+
+class AudioSpriteService:
+    """Builds the animal sound sprite and answers clip lookups from its index"""
+
+    def __init__(
+        self,
+        sounds_dir: Path = ANIMAL_SOUNDS_DIR,
+        sprites_dir: Path = AUDIO_SPRITES_DIR,
+        check_interval: float = 5.0
+    ):
+        self.sounds_dir = sounds_dir
+        self.sprites_dir = sprites_dir
+        self.check_interval = check_interval
+        self._index: Dict[str, Any] = {}
+        self._signature: Optional[Tuple[int, int, int]] = None
+        self._last_check = float("-inf")
+        self.reload()
+
+    def _file_signature(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self.sprites_dir / INDEX_NAME)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def reload(self) -> bool:
+        """Re-read the index if the file changed (e.g. a build in another process); True on change"""
+        signature = self._file_signature()
+        if signature == self._signature:
+            return False
+        if signature is None:
+            self._index, self._signature = {}, None
+            return True
+        try:
+            with open(self.sprites_dir / INDEX_NAME, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError) as e:
+            # Keep serving the previous sprite
+            logger.warning(f"Could not load audio sprite index: {e}")
+            return False
+        self._index, self._signature = index, signature
+        return True
+
+    def _current(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        if now - self._last_check >= self.check_interval:
+            self._last_check = now
+            self.reload()
+        return self._index
+
+    def _save_index(self) -> None:
+        self.sprites_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.sprites_dir / (INDEX_NAME + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, indent=2)
+        os.replace(tmp, self.sprites_dir / INDEX_NAME)
+        self._signature = self._file_signature()
+
+    def source_clips(self) -> Dict[str, Path]:
+        """Source WAV per species; the first file wins when a species has several"""
+        if not self.sounds_dir.is_dir():
+            return {}
+        clips: Dict[str, Path] = {}
+        for path in sorted(self.sounds_dir.iterdir()):
+            if path.suffix.lower() == ".wav":
+                clips.setdefault(species_for_sound(path.name), path)
+        return clips
+
+    def _sources_hash(self, sources: Dict[str, Path]) -> str:
+        digest = hashlib.sha256()
+        for species, path in sorted(sources.items()):
+            digest.update(species.encode("utf-8"))
+            digest.update(path.read_bytes())
+        return digest.hexdigest()
+
+    def build(self, force: bool = False) -> Dict[str, Any]:
+        """Rebuild the sprite when the source clips changed; returns the index"""
+        sources = self.source_clips()
+        sources_hash = self._sources_hash(sources)
+        self.reload()
+        if not force and self._index.get("sources_hash") == sources_hash and self.sprite_path(self._index["sprite"]):
+            return self._index
+
+        # Earlier sprites stay on disk: stored game payloads may still reference them
+        index = build_sprite(sources, self.sprites_dir)
+        index["sources_hash"] = sources_hash
+        self._index = index
+        self._save_index()
+        logger.info(f"Built audio sprite {index['sprite']} with {len(index['clips'])} clips ({index['bytes'] / 1024:.0f} KiB)")
+        return index
+
+    @property
+    def index(self) -> Dict[str, Any]:
+        return self._current()
+
+    def clips(self) -> Dict[str, Dict[str, Any]]:
+        """Clip offsets by species; empty until a sprite has been built"""
+        return self._current().get("clips", {})
+
+    def missing_species(self) -> List[str]:
+        """Species with artwork but no clip in the sprite; sound games leave them out"""
+        return sorted(set(images_by_species()) - set(self.clips()))
+
+    def check(self) -> bool:
+        """Log what sound games will be missing; False when there is no audio at all"""
+        if not self.clips():
+            logger.warning(
+                f"No audio sprite has been built, so animal sound games have no audio: "
+                f"add WAV clips to {self.sounds_dir} and run `make sounds`"
+            )
+            return False
+        missing = self.missing_species()
+        if missing:
+            logger.warning(f"Audio sprite has no clips for {', '.join(missing)}")
+        return True
+
+    def sprite_path(self, filename: str) -> Optional[Path]:
+        """Path of a built sprite, or None for anything that isn't one"""
+        if not SPRITE_NAME.match(filename):
+            return None
+        path = self.sprites_dir / filename
+        return path if path.is_file() else None
+
+_service: Optional[AudioSpriteService] = None
+
+def get_audio_sprite_service() -> AudioSpriteService:
+    global _service
+    if _service is None:
+        _service = AudioSpriteService()
+    return _service
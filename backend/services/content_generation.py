@@ -0,0 +1,213 @@
+import asyncio
+import threading
+import time
+from typing import Dict, Any, List, Optional
+from pydantic import BaseModel
+from ..agents.agent_factory import AgentFactory
+from ..agents.base_agent import BaseCrewAgent
+from ..agents.game_designer import GameContent
+from ..agents.story_generator import StoryContent
+from ..config.ui_strings import UI_FIELDS
+from .ui_catalog import get_ui_catalog
+
+# Fields holding child-facing text, per content type. Everything else
+# (names, ids, numbers, answers) is passed through untranslated.
+TRANSLATABLE_FIELDS: Dict[str, set] = {
+    "story": {"title", "moral_summary", "parent_tips", "description", "dialogue", "moral_lesson"},
+    "game": {"title", "description", "instructions", "reward_message", "learning_outcome", "hints"},
+    "ui": UI_FIELDS
+}
+
+# Agents every request shares; building one (its crewai Agent and LLM
+# client) takes tens of milliseconds
+SHARED_AGENTS = ("story", "game", "translation", "image")
+
+_agents: Optional[Dict[str, BaseCrewAgent]] = None
+_agents_lock = threading.Lock()
+
+def get_agents() -> Dict[str, BaseCrewAgent]:
+    """The shared agents, built on first use (the API builds them at startup, off the event loop)"""
+    global _agents
+    with _agents_lock:
+        if _agents is None:
+            _agents = AgentFactory.create_crew(list(SHARED_AGENTS))
+        return _agents
+
+def _normalize(part: Any) -> str:
+    return str(part).strip().lower()
+
+def content_key(kind: str, *parts: Any) -> str:
+    """Build the lookup key for a piece of pre-generated content"""
+    return ":".join([kind] + [_normalize(part) for part in parts])
+
+def story_key(animal_name: str, lesson_theme: str, age_group: str, language: str) -> str:
+    return content_key("story", animal_name, lesson_theme, age_group, language)
+
+def game_key(
+    puzzle_type: str,
+    difficulty: str,
+    animal_theme: str,
+    lesson_theme: str,
+    language: str
+) -> str:
+    return content_key("game", puzzle_type, difficulty, animal_theme, lesson_theme, language)
+
+def catalog_key(catalog: str, language: str) -> str:
+    return content_key("catalog", catalog, language)
+
+async def generate_story(
+    animal_name: str,
+    lesson_theme: str,
+    age_group: str = "2-4 years",
+    language: str = "en",
+    agents: Optional[Dict[str, BaseCrewAgent]] = None,
+    timings: Optional[Dict[str, float]] = None
+) -> StoryContent:
+    """
+    Generate a story and translate it when a non-English language is requested
+
+    When given, timings receives the seconds spent generating and translating.
+    """
+    agents = agents if agents is not None else {}
+    timings = timings if timings is not None else {}
+    story_agent = agents.get("story") or get_agents()["story"]
+
+    start = time.perf_counter()
+    story = await story_agent.process({
+        "animal_name": animal_name,
+        "lesson_theme": lesson_theme,
+        "age_group": age_group
+    })
+    timings["generate"] = time.perf_counter() - start
+
+    if language != "en":
+        start = time.perf_counter()
+        story = await translate_payload(
+            story,
+            language,
+            "story",
+            f"Children's story about {animal_name}",
+            agents.get("translation")
+        )
+        timings["translate"] = time.perf_counter() - start
+
+    return story
+
+async def generate_game(
+    puzzle_type: str,
+    difficulty: str,
+    animal_theme: str,
+    lesson_theme: str,
+    language: str = "en",
+    agents: Optional[Dict[str, BaseCrewAgent]] = None,
+    timings: Optional[Dict[str, float]] = None
+) -> GameContent:
+    """
+    Generate a game and translate it when a non-English language is requested
+
+    When given, timings receives the seconds spent generating and translating.
+    """
+    agents = agents if agents is not None else {}
+    timings = timings if timings is not None else {}
+    game_agent = agents.get("game") or get_agents()["game"]
+
+    start = time.perf_counter()
+    game = await game_agent.process({
+        "puzzle_type": puzzle_type,
+        "difficulty": difficulty,
+        "animal_theme": animal_theme,
+        "lesson_theme": lesson_theme
+    })
+    timings["generate"] = time.perf_counter() - start
+
+    if language != "en":
+        start = time.perf_counter()
+        game = await translate_payload(
+            game,
+            language,
+            "game",
+            f"Educational game about {animal_theme}",
+            agents.get("translation")
+        )
+        timings["translate"] = time.perf_counter() - start
+
+    return game
+
+async def translate_payload(
+    payload: Any,
+    language: str,
+    content_type: str,
+    context: str,
+    translation_agent: Optional[BaseCrewAgent] = None
+) -> Any:
+    """
+    Translate the text fields of a generated payload, keeping its shape
+
+    Payloads may be models (as the agents return them) or plain dicts and
+    lists. Each translatable string is sent to the translation agent
+    separately and all of them run concurrently; the result is a copy of the
+    same shape and types, so models stay models. UI strings are read from
+    the compiled UI catalog, and only ones it doesn't know reach the agent.
+    """
+    fields = TRANSLATABLE_FIELDS.get(content_type, set())
+
+    # Collect (container, key) slots holding translatable strings
+    slots: List[tuple] = []
+    result = _copy_and_collect(payload, fields, slots, translate=False)
+
+    if content_type == "ui":
+        catalog = get_ui_catalog()
+        misses = []
+        for container, key in slots:
+            translated = catalog.lookup(container[key], language)
+            if translated is None:
+                misses.append((container, key))
+            else:
+                container[key] = translated
+        slots = misses
+    if not slots:
+        return result
+
+    agent = translation_agent or get_agents()["translation"]
+    translations = await asyncio.gather(*[
+        agent.process({
+            "text": container[key],
+            "target_language": language,
+            "content_type": content_type,
+            "context": context
+        })
+        for container, key in slots
+    ])
+
+    for (container, key), translation in zip(slots, translations):
+        container[key] = translation.translated_text
+
+    return result
+
+def _copy_and_collect(value: Any, fields: set, slots: List[tuple], translate: bool) -> Any:
+    """Deep-copy models/dicts/lists, recording string slots under translatable keys"""
+    if isinstance(value, BaseModel):
+        # Fields are written straight into the copy's __dict__: the
+        # translated strings are still strings, so there's nothing to validate
+        copied = value.model_copy()
+        for key, item in value.__dict__.items():
+            copied.__dict__[key] = _copy_and_collect(item, fields, slots, key in fields)
+            if key in fields and isinstance(item, str):
+                slots.append((copied.__dict__, key))
+        return copied
+
+    if isinstance(value, dict):
+        copied = {}
+        for key, item in value.items():
+            copied[key] = _copy_and_collect(item, fields, slots, key in fields)
+            if key in fields and isinstance(item, str):
+                slots.append((copied, key))
+        return copied
+
+    if isinstance(value, list):
+        copied = [_copy_and_collect(item, fields, slots, translate) for item in value]
+        if translate:
+            slots.extend((copied, i) for i, item in enumerate(copied) if isinstance(item, str))
+        return copied
+
+    return value
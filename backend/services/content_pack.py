@@ -0,0 +1,306 @@
+"""
+Binary content pack for serving pre-generated content without decoding.
+
+Layout (little-endian, sections 8-byte aligned):
+
+    header     magic, version, entry count, section offsets, blake2b checksum
+    metadata   UTF-8 JSON describing the build
+    hashes     entry_count x u64 key hashes, sorted (binary-searched in place)
+    entries    entry_count x ENTRY records, parallel to hashes
+    data       per entry: key bytes followed by the serialized response body
+
+Bodies are stored exactly as they go on the wire (JSON, optionally gzip),
+so the API can memory-map the pack and send a slice of it as the response.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+from bisect import bisect_left
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+from ..config.settings import CONTENT_PACK_PATH
+
+logger = logging.getLogger(__name__)
+
+PACK_MAGIC = b"SAFPACK\x00"
+PACK_FORMAT_VERSION = 2
+
+# magic, version, flags, entry_count, metadata_offset, metadata_length,
+# hashes_offset, entries_offset, data_offset, data_length, checksum
+HEADER = struct.Struct("<8sHHIQQQQQQ32s")
+
+# data_offset (relative to data section), body_length, key_length,
+# encoding, padding, blake2b-128 of the uncompressed body
+ENTRY = struct.Struct("<QIHBx16s")
+
+ENCODING_IDENTITY = 0
+ENCODING_GZIP = 1
+ENCODING_NAMES = {ENCODING_IDENTITY: None, ENCODING_GZIP: "gzip"}
+
+# Bodies smaller than this are not worth compressing
+COMPRESS_MIN_BYTES = 512
+
+class ContentPackError(ValueError):
+    """Raised when a content pack is malformed or fails its integrity check"""
+
+def key_hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+class PackEntry:
+    """A zero-copy view of one stored response body"""
+    __slots__ = ("key", "body", "encoding", "content_hash")
+
+    def __init__(self, key: str, body: memoryview, encoding: int, content_hash: bytes):
+        self.key = key
+        self.body = body
+        self.encoding = encoding
+        self.content_hash = content_hash
+
+    @property
+    def content_encoding(self) -> Optional[str]:
+        return ENCODING_NAMES[self.encoding]
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.content_hash.hex()}"'
+
+    def decoded_bytes(self) -> bytes:
+        """Return the uncompressed body (copies; use body for the fast path)"""
+        if self.encoding == ENCODING_GZIP:
+            return gzip.decompress(self.body)
+        return bytes(self.body)
+
+    def json(self) -> Any:
+        return json.loads(self.decoded_bytes())
+
+class ContentPack:
+    """Memory-mapped, read-only view of a built content pack"""
+
+    def __init__(self, path: Optional[Path] = None, verify: bool = True):
+        self.path = path
+        self.metadata: Dict[str, Any] = {}
+        self.checksum = ""  # hex blake2b from the header; identifies the build
+        self._mmap: Optional[mmap.mmap] = None
+        self._hashes: Any = ()
+        self._count = 0
+
+        if path is not None and path.exists():
+            self._open(path, verify)
+
+    def _open(self, path: Path, verify: bool) -> None:
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        view = memoryview(self._mmap)
+        if len(view) < HEADER.size:
+            raise ContentPackError(f"{path} is too small to be a content pack")
+
+        (
+            magic, version, _flags, count,
+            metadata_offset, metadata_length,
+            hashes_offset, entries_offset,
+            data_offset, data_length, checksum
+        ) = HEADER.unpack_from(view, 0)
+
+        if magic != PACK_MAGIC:
+            raise ContentPackError(f"{path} is not a content pack")
+        if version != PACK_FORMAT_VERSION:
+            raise ContentPackError(f"Unsupported content pack version: {version}")
+        if data_offset + data_length != len(view):
+            raise ContentPackError(f"{path} is truncated")
+        if verify and hashlib.blake2b(view[HEADER.size:], digest_size=32).digest() != checksum:
+            raise ContentPackError(f"{path} failed its integrity check")
+
+        self.metadata = json.loads(bytes(view[metadata_offset:metadata_offset + metadata_length]))
+        self.checksum = checksum.hex()
+        self._count = count
+        self._hashes = view[hashes_offset:hashes_offset + 8 * count].cast("Q")
+        self._entries_offset = entries_offset
+        self._data_offset = data_offset
+        self._view = view
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _entry_at(self, index: int) -> Tuple[str, PackEntry]:
+        offset, body_length, key_length, encoding, content_hash = ENTRY.unpack_from(
+            self._view, self._entries_offset + index * ENTRY.size
+        )
+        start = self._data_offset + offset
+        key = bytes(self._view[start:start + key_length]).decode("utf-8")
+        body = self._view[start + key_length:start + key_length + body_length]
+        return key, PackEntry(key, body, encoding, content_hash)
+
+    def get_entry(self, key: str) -> Optional[PackEntry]:
+        """Binary-search the index; returns None if the key was not pre-generated"""
+        if not self._count:
+            return None
+
+        target = key_hash(key)
+        index = bisect_left(self._hashes, target)
+        # Walk past the (rare) entries sharing the same 64-bit hash
+        while index < self._count and self._hashes[index] == target:
+            stored_key, entry = self._entry_at(index)
+            if stored_key == key:
+                return entry
+            index += 1
+        return None
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the decoded payload for a key, or None"""
+        entry = self.get_entry(key)
+        return entry.json() if entry is not None else None
+
+    def entries(self) -> Iterator[PackEntry]:
+        for index in range(self._count):
+            yield self._entry_at(index)[1]
+
+class ContentPackBuilder:
+    """Collects serialized bodies and writes them out as a content pack"""
+
+    def __init__(self, compress: bool = False):
+        self.compress = compress
+        self._items: Dict[str, Tuple[bytes, int, bytes]] = {}
+
+    def add(self, key: str, payload: Any) -> None:
+        """Add a payload (already-serialized JSON bytes or a JSON-able object)"""
+        if isinstance(payload, (bytes, bytearray)):
+            body = bytes(payload)
+        else:
+            body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+        content_hash = hashlib.blake2b(body, digest_size=16).digest()
+        encoding = ENCODING_IDENTITY
+        if self.compress and len(body) >= COMPRESS_MIN_BYTES:
+            compressed = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(compressed) < len(body):
+                body, encoding = compressed, ENCODING_GZIP
+
+        self._items[key] = (body, encoding, content_hash)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def write(self, path: Path, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """Write the pack atomically; a running server picks it up on its next check"""
+        ordered: List[Tuple[int, str]] = sorted((key_hash(key), key) for key in self._items)
+        count = len(ordered)
+
+        metadata_bytes = json.dumps({
+            **(metadata or {}),
+            "item_count": count,
+            "built_at": datetime.now(timezone.utc).isoformat()
+        }, ensure_ascii=False).encode("utf-8")
+
+        metadata_offset = HEADER.size
+        hashes_offset = _align(metadata_offset + len(metadata_bytes))
+        entries_offset = hashes_offset + 8 * count
+        data_offset = _align(entries_offset + ENTRY.size * count)
+
+        sections = bytearray(data_offset - HEADER.size)
+        sections[0:len(metadata_bytes)] = metadata_bytes
+
+        data = bytearray()
+        for index, (hashed, key) in enumerate(ordered):
+            body, encoding, content_hash = self._items[key]
+            key_bytes = key.encode("utf-8")
+            struct.pack_into("<Q", sections, hashes_offset - HEADER.size + 8 * index, hashed)
+            ENTRY.pack_into(
+                sections,
+                entries_offset - HEADER.size + ENTRY.size * index,
+                len(data), len(body), len(key_bytes), encoding, content_hash
+            )
+            data += key_bytes
+            data += body
+
+        checksum = hashlib.blake2b(digest_size=32)
+        checksum.update(sections)
+        checksum.update(data)
+
+        header = HEADER.pack(
+            PACK_MAGIC, PACK_FORMAT_VERSION, 0, count,
+            metadata_offset, len(metadata_bytes),
+            hashes_offset, entries_offset,
+            data_offset, len(data), checksum.digest()
+        )
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            f.write(sections)
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+class ContentPackStore:
+    """
+    Holds the live content pack and swaps in a new version without a restart.
+
+    The pack file is re-checked at most every check_interval seconds; a new
+    build (written via os.replace) is verified before it replaces the current
+    one, and a file that fails verification isn't read again until it
+    changes. Responses still streaming from the old mapping keep it alive
+    until they finish.
+    """
+
+    def __init__(self, path: Path, check_interval: float = 5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._pack = ContentPack()
+        self._signature: Optional[Tuple[int, int, int]] = None
+        self._last_check = float("-inf")
+
+    def _file_signature(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def current(self) -> ContentPack:
+        now = time.monotonic()
+        if now - self._last_check >= self.check_interval:
+            self._last_check = now
+            self.reload()
+        return self._pack
+
+    def reload(self) -> bool:
+        """Swap to the pack on disk if it changed; returns True on swap"""
+        signature = self._file_signature()
+        if signature == self._signature:
+            return False
+
+        if signature is None:
+            self._pack, self._signature = ContentPack(), None
+            return True
+
+        # Recorded before verifying, so a bad file is rejected once rather
+        # than re-hashed on every check; a new build changes the signature
+        self._signature = signature
+        try:
+            pack = ContentPack(self.path)
+        except (OSError, ContentPackError) as e:
+            # Keep serving the previous version
+            logger.warning(f"Could not load content pack {self.path}: {e}")
+            return False
+
+        self._pack = pack
+        logger.info(f"Loaded content pack with {len(pack)} items from {self.path}")
+        return True
+
+_store = ContentPackStore(CONTENT_PACK_PATH)
+
+def get_content_pack() -> ContentPack:
+    """Return the live content pack, picking up new builds as they land"""
+    return _store.current()
@@ -0,0 +1,233 @@
+"""
+Procedural counting scenes.
+
+A scene places N copies of an animal sprite on a fixed canvas without
+overlap, using Poisson-disk sampling (Bridson's algorithm) and then a seeded
+pick of N of the sampled points. Scenes are pure functions of
+(count, animal_theme, seed), so they are cached under that key and warmed
+in batches in a process pool; requests pick one of the warmed seeds.
+"""
+import asyncio
+import io
+import logging
+import math
+import random
+import threading
+from functools import lru_cache
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+from pydantic import BaseModel
+from ..config.animal_assets import images_by_species, species_for_theme
+from ..config.settings import ANIMAL_IMAGES_DIR
+
+logger = logging.getLogger(__name__)
+
+CANVAS_WIDTH = 1000
+CANVAS_HEIGHT = 700
+MAX_SPRITE_SIZE = 200
+MIN_SPRITE_SIZE = 56
+
+# Counts covered by the counting game's difficulty ranges (1-20)
+COUNT_RANGE = range(1, 21)
+
+# Each (count, animal) key is pre-generated for this many seeds
+SEEDS_PER_KEY = 8
+CACHE_SIZE = 8192
+BATCH_SIZE = 64
+
+# Bridson: candidates tried around each active point before retiring it
+BRIDSON_ATTEMPTS = 30
+
+SceneKey = Tuple[int, str, int]
+
+class CountingScene(BaseModel):
+    count: int
+    animal: str
+    image: str
+    seed: int
+    canvas: List[int]  # [width, height]
+    sprite_size: int
+    sprites: List[List[int]]  # [x, y] centre of each sprite
+
+def sprite_size_for(count: int) -> int:
+    """Largest sprite that still leaves room to scatter count of them"""
+    # Aim for roughly a third of the canvas covered by sprites
+    size = math.sqrt(CANVAS_WIDTH * CANVAS_HEIGHT * 0.33 / max(count, 1))
+    return int(max(MIN_SPRITE_SIZE, min(MAX_SPRITE_SIZE, size)))
+
+def poisson_disk(width: float, height: float, radius: float, rng: random.Random) -> List[Tuple[float, float]]:
+    """Bridson's Poisson-disk sampling: points at least radius apart"""
+    cell = radius / math.sqrt(2)
+    grid_w, grid_h = int(math.ceil(width / cell)), int(math.ceil(height / cell))
+    grid: List[Optional[int]] = [None] * (grid_w * grid_h)
+    points: List[Tuple[float, float]] = []
+
+    def fits(x: float, y: float) -> bool:
+        gx, gy = int(x / cell), int(y / cell)
+        for j in range(max(gy - 2, 0), min(gy + 3, grid_h)):
+            for i in range(max(gx - 2, 0), min(gx + 3, grid_w)):
+                index = grid[j * grid_w + i]
+                if index is not None:
+                    px, py = points[index]
+                    if (px - x) ** 2 + (py - y) ** 2 < radius * radius:
+                        return False
+        return True
+
+    def add(x: float, y: float) -> None:
+        grid[int(y / cell) * grid_w + int(x / cell)] = len(points)
+        points.append((x, y))
+        active.append(len(points) - 1)
+
+    active: List[int] = []
+    add(rng.uniform(0, width), rng.uniform(0, height))
+    while active:
+        slot = rng.randrange(len(active))
+        px, py = points[active[slot]]
+        for _ in range(BRIDSON_ATTEMPTS):
+            angle = rng.uniform(0, 2 * math.pi)
+            distance = rng.uniform(radius, 2 * radius)
+            x, y = px + distance * math.cos(angle), py + distance * math.sin(angle)
+            if 0 <= x < width and 0 <= y < height and fits(x, y):
+                add(x, y)
+                break
+        else:
+            active[slot] = active[-1]
+            active.pop()
+
+    return points
+
+def generate_scene(count: int, animal_theme: str, seed: int) -> CountingScene:
+    """Place count non-overlapping sprites; deterministic for a given key"""
+    rng = random.Random(f"{count}:{animal_theme}:{seed}")
+    images = images_by_species()
+    animal = species_for_theme(animal_theme)
+    if animal not in images:
+        animal = sorted(images)[rng.randrange(len(images))]
+
+    size = sprite_size_for(count)
+    while True:
+        # Sample sprite centres inside the canvas margins, then keep count of them
+        margin = size / 2
+        points = poisson_disk(CANVAS_WIDTH - size, CANVAS_HEIGHT - size, size, rng)
+        if len(points) >= count or size <= MIN_SPRITE_SIZE:
+            break
+        size = max(MIN_SPRITE_SIZE, int(size * 0.9))
+
+    chosen = rng.sample(points, min(count, len(points)))
+    return CountingScene(
+        count=count,
+        animal=animal,
+        image=images[animal],
+        seed=seed,
+        canvas=[CANVAS_WIDTH, CANVAS_HEIGHT],
+        sprite_size=size,
+        sprites=[[int(x + margin), int(y + margin)] for x, y in sorted(chosen, key=lambda p: (p[1], p[0]))]
+    )
+
+def generate_scene_batch(keys: List[SceneKey]) -> List[Dict[str, Any]]:
+    """Worker-process entry point: generate a batch of scenes"""
+    return [generate_scene(*key).dict() for key in keys]
+
+def render_scene(scene: CountingScene, image_dir: Path = ANIMAL_IMAGES_DIR, fmt: str = "WEBP") -> bytes:
+    """Composite the scene into a single image for clients that can't lay it out"""
+    from PIL import Image, ImageDraw
+
+    canvas = Image.new("RGB", (CANVAS_WIDTH, CANVAS_HEIGHT), (250, 236, 200))
+    with Image.open(image_dir / scene.image) as source:
+        sprite = source.convert("RGB")
+        sprite.thumbnail((scene.sprite_size, scene.sprite_size), Image.LANCZOS)
+
+    # Round sprites so neighbours read as separate animals
+    mask = Image.new("L", sprite.size, 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, sprite.width - 1, sprite.height - 1), fill=255)
+    for x, y in scene.sprites:
+        canvas.paste(sprite, (x - sprite.width // 2, y - sprite.height // 2), mask)
+
+    buffer = io.BytesIO()
+    canvas.save(buffer, format=fmt, quality=80)
+    return buffer.getvalue()
+
+@lru_cache(maxsize=256)
+def rendered_scene(count: int, animal_theme: str, seed: int) -> bytes:
+    """Pre-rendered WebP of a scene; deterministic, so safe to cache forever"""
+    return render_scene(get_counting_scene_service().get(count, animal_theme, seed))
+
+class CountingSceneService:
+    """LRU cache of scenes plus background warm-up in a process pool"""
+
+    def __init__(self, cache_size: int = CACHE_SIZE, max_workers: Optional[int] = None):
+        self.cache_size = cache_size
+        self.max_workers = max_workers
+        self._cache: "OrderedDict[SceneKey, CountingScene]" = OrderedDict()
+        # The image endpoint reads the cache from threadpool threads
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _store(self, key: SceneKey, scene: CountingScene) -> None:
+        with self._lock:
+            self._cache[key] = scene
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def get(self, count: int, animal_theme: str, seed: int) -> CountingScene:
+        """Cached scene for a key, generated inline (outside the lock) on a miss"""
+        key = (count, species_for_theme(animal_theme), seed)
+        with self._lock:
+            scene = self._cache.get(key)
+            if scene is not None:
+                self._cache.move_to_end(key)
+                return scene
+        scene = generate_scene(*key)
+        self._store(key, scene)
+        return scene
+
+    def pick_seed(self, rng: random.Random) -> int:
+        """A seed from the warmed set, so lookups hit the cache"""
+        return rng.randrange(SEEDS_PER_KEY)
+
+    async def warm(self, animal_themes: Optional[List[str]] = None) -> int:
+        """Generate every (count, animal, seed) scene in batches across worker processes"""
+        animals = animal_themes or sorted(images_by_species())
+        keys = [
+            (count, species_for_theme(animal), seed)
+            for animal in animals
+            for count in COUNT_RANGE
+            for seed in range(SEEDS_PER_KEY)
+        ]
+        with self._lock:
+            keys = [key for key in keys if key not in self._cache]
+        if not keys:
+            return 0
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+        loop = asyncio.get_running_loop()
+        batches = [keys[i:i + BATCH_SIZE] for i in range(0, len(keys), BATCH_SIZE)]
+        results = await asyncio.gather(*[
+            loop.run_in_executor(self._executor, generate_scene_batch, batch)
+            for batch in batches
+        ])
+
+        for batch, scenes in zip(batches, results):
+            for key, scene in zip(batch, scenes):
+                self._store(key, CountingScene(**scene))
+
+        logger.info(f"Warmed {len(keys)} counting scenes")
+        return len(keys)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+_service: Optional[CountingSceneService] = None
+
+def get_counting_scene_service() -> CountingSceneService:
+    global _service
+    if _service is None:
+        _service = CountingSceneService()
+    return _service
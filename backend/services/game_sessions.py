@@ -0,0 +1,368 @@
+"""
+Game sessions streamed over WebSockets.
+
+A client streams fine-grained play events (attempts, hints, completion),
+each numbered with a per-session sequence number. Events are queued on
+their session and one flusher per worker writes every session's pending
+events in a single append to the game event log, folds them into the
+session's running totals, appends a progress event when a game ends, and
+only then acknowledges cumulatively: "everything up to seq N is stored".
+
+A dropped connection leaves its session detached for RESUME_TTL seconds.
+Reconnecting with the session's resume token re-attaches it; the server
+reports the last acked seq, the client resends anything after it, and
+already-seen seqs are ignored, so no event is lost or counted twice.
+
+Memory per session is bounded: a fixed-size slot object, at most
+MAX_PENDING queued events (the connection stops reading until the
+flusher drains them) and at most MAX_MESSAGE_BYTES per message. Sessions
+share one flusher task rather than a timer each, so a worker holds
+thousands of mostly idle sessions cheaply.
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import secrets
+import time
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime
+from pathlib import Path
+from typing import Deque, Dict, List, Literal, Optional, Tuple
+from pydantic import BaseModel, Field
+from ..config.settings import GAME_EVENTS_PATH, SESSION_SECRET
+from .analytics import get_analytics
+from .progress_events import ProgressEvent, get_progress_log
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 1.0  # seconds between flushes, and so between acks
+BATCH_SIZE = 64  # pending events that trigger an early flush
+MAX_PENDING = 256  # unflushed events per session before reads pause
+MAX_MESSAGE_BYTES = 16 * 1024
+RESUME_TTL = 300.0  # seconds a detached session waits for its client
+MAX_SESSIONS = 20000  # per worker; detached sessions are evicted first
+
+class PlayEvent(BaseModel):
+    seq: int = Field(..., ge=1)
+    kind: Literal["attempt", "hint", "complete", "abandon"]
+    correct: Optional[bool] = None  # attempts
+    element_id: Optional[str] = None  # the piece, card or answer involved
+    elapsed_ms: Optional[int] = Field(None, ge=0)  # since the game started
+    score: Optional[float] = Field(None, ge=0.0, le=1.0)  # complete; derived from attempts if omitted
+
+class SessionClosed(Exception):
+    """The session ended (or was replaced) while the connection waited"""
+
+class GameSession:
+    __slots__ = (
+        "session_id", "user_id", "game_id", "puzzle_type", "difficulty", "animal", "language",
+        "received", "acked", "pending", "attempts", "correct", "hints", "elapsed_ms",
+        "finished", "socket", "detached_at"
+    )
+
+    def __init__(self, session_id: str, user_id: str, game_id: str, puzzle_type: str,
+                 difficulty: str, animal: Optional[str], language: str):
+        self.session_id = session_id
+        self.user_id = user_id
+        self.game_id = game_id
+        self.puzzle_type = puzzle_type
+        self.difficulty = difficulty
+        self.animal = animal
+        self.language = language
+        self.received = 0  # highest seq queued
+        self.acked = 0  # highest seq stored
+        self.pending: Deque[PlayEvent] = deque()
+        self.attempts = 0
+        self.correct = 0
+        self.hints = 0
+        self.elapsed_ms = 0
+        self.finished = False
+        self.socket = None
+        self.detached_at: Optional[float] = None
+
+    def apply(self, event: PlayEvent) -> Optional[ProgressEvent]:
+        """Fold one stored event into the totals; the progress event when the game ends"""
+        if event.elapsed_ms is not None:
+            self.elapsed_ms = max(self.elapsed_ms, event.elapsed_ms)
+        if event.kind == "attempt":
+            self.attempts += 1
+            self.correct += int(bool(event.correct))
+        elif event.kind == "hint":
+            self.hints += 1
+        elif not self.finished:
+            self.finished = True
+            return self.progress_event(event.kind == "complete", event.score)
+        return None
+
+    def progress_event(self, completed: bool, score: Optional[float] = None) -> ProgressEvent:
+        if score is None:
+            score = self.correct / self.attempts if self.attempts else 0.0
+        return ProgressEvent(
+            user_id=self.user_id,
+            activity_type=self.puzzle_type,
+            activity_id=self.game_id,
+            score=score,
+            time_spent=round(self.elapsed_ms / 1000),
+            completion_status=completed,
+            difficulty=self.difficulty,
+            timestamp=datetime.now(),
+            animal=self.animal,
+            language=self.language
+        )
+
+    def summary(self) -> Dict:
+        return {
+            "attempts": self.attempts,
+            "correct": self.correct,
+            "hints": self.hints,
+            "finished": self.finished
+        }
+
+class GameSessionRegistry:
+    def __init__(self, events_path: Path = GAME_EVENTS_PATH, secret: Optional[str] = SESSION_SECRET):
+        self.events_path = events_path
+        self._secret = secret.encode("utf-8") if secret else secrets.token_bytes(32)
+        # Oldest first, so eviction finds long-detached sessions quickly
+        self._sessions: "OrderedDict[str, GameSession]" = OrderedDict()
+        self._dirty: Dict[str, GameSession] = {}
+        self._wake = asyncio.Event()
+        self._flushed: Optional[asyncio.Future] = None
+        self._flusher: Optional[asyncio.Task] = None
+
+    # Resume tokens
+
+    def _sign(self, session_id: str) -> str:
+        return hmac.new(self._secret, session_id.encode("utf-8"), hashlib.sha256).hexdigest()[:32]
+
+    def resume_token(self, session: GameSession) -> str:
+        return f"{session.session_id}.{self._sign(session.session_id)}"
+
+    def _verify(self, token: str) -> Optional[str]:
+        session_id, _, signature = token.partition(".")
+        if signature and hmac.compare_digest(signature, self._sign(session_id)):
+            return session_id
+        return None
+
+    # Lifecycle
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.get_running_loop().create_task(self._run_flusher())
+
+    def start(self, socket, user_id: str, game_id: str, puzzle_type: str, difficulty: str,
+              animal: Optional[str] = None, language: str = "en") -> Optional[GameSession]:
+        """A new session attached to socket; None when the worker is full"""
+        if len(self._sessions) >= MAX_SESSIONS and not self._evict_detached():
+            return None
+        session = GameSession(uuid.uuid4().hex, user_id, game_id, puzzle_type, difficulty, animal, language)
+        self._sessions[session.session_id] = session
+        session.socket = socket
+        self._ensure_flusher()
+        return session
+
+    def resume(self, socket, token: str) -> Optional[GameSession]:
+        """Re-attach a detached (or still-attached) session; None when expired or forged"""
+        session_id = self._verify(token)
+        session = self._sessions.get(session_id) if session_id else None
+        if session is None:
+            return None
+        previous = session.socket
+        session.socket = socket
+        session.detached_at = None
+        self._sessions.move_to_end(session_id)
+        self._ensure_flusher()
+        if previous is not None and previous is not socket:
+            asyncio.get_running_loop().create_task(_close_quietly(previous, 4000, "resumed elsewhere"))
+        return session
+
+    def detach(self, session: GameSession, socket) -> None:
+        if session.socket is socket:
+            session.socket = None
+            session.detached_at = time.monotonic()
+
+    def _evict_detached(self) -> bool:
+        for session_id, session in self._sessions.items():
+            if session.socket is None:
+                self._end(session)
+                return True
+        return False
+
+    def _end(self, session: GameSession) -> None:
+        """Drop a session, recording an abandoned game if play had started"""
+        self._sessions.pop(session.session_id, None)
+        self._dirty.pop(session.session_id, None)
+        if not session.finished and (session.attempts or session.pending):
+            for event in session.pending:
+                session.apply(event)
+            session.finished = True
+            get_progress_log().append(session.progress_event(False))
+
+    # Receiving
+
+    async def receive(self, session: GameSession, events: List[PlayEvent]) -> Tuple[int, Optional[int]]:
+        """
+        Queue events in seq order, skipping ones already received.
+
+        Returns (queued count, expected seq if an event skipped ahead).
+        Waits for a flush while the session's queue is full.
+        """
+        queued = 0
+        for event in events:
+            if event.seq <= session.received:
+                continue
+            if event.seq != session.received + 1:
+                return queued, session.received + 1
+            while len(session.pending) >= MAX_PENDING:
+                # Mark the session first, or the flush it waits for skips it
+                self._dirty[session.session_id] = session
+                self._wake.set()
+                await self._next_flush()
+                if session.session_id not in self._sessions:
+                    raise SessionClosed(session.session_id)
+            session.pending.append(event)
+            session.received = event.seq
+            queued += 1
+
+        if session.pending:
+            self._dirty[session.session_id] = session
+            if len(session.pending) >= BATCH_SIZE:
+                self._wake.set()
+        return queued, None
+
+    def _next_flush(self) -> asyncio.Future:
+        if self._flushed is None or self._flushed.done():
+            self._flushed = asyncio.get_running_loop().create_future()
+        return asyncio.shield(self._flushed)
+
+    # Flushing
+
+    async def _run_flusher(self) -> None:
+        while self._sessions:
+            try:
+                await asyncio.wait_for(self._wake.wait(), FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Game session flush failed")
+            self._expire()
+
+    async def flush(self) -> int:
+        """Store every session's pending events, then ack them; returns events stored"""
+        sessions = list(self._dirty.values())
+        self._dirty.clear()
+        batches = [(session, list(session.pending)) for session in sessions]
+        for session, _ in batches:
+            session.pending.clear()
+        batches = [(session, events) for session, events in batches if events]
+
+        try:
+            if batches:
+                await asyncio.to_thread(self._write_events, batches)
+        except Exception:
+            # Put the events back for the next flush; nothing was acked
+            for session, events in batches:
+                session.pending.extendleft(reversed(events))
+                self._dirty[session.session_id] = session
+            raise
+        finally:
+            if self._flushed is not None and not self._flushed.done():
+                self._flushed.set_result(None)
+
+        progress = []
+        analytics = get_analytics()
+        for session, events in batches:
+            for event in events:
+                finished = session.apply(event)
+                if finished is not None:
+                    progress.append(finished)
+                    if finished.completion_status:
+                        analytics.emit(
+                            "puzzle_completed", session.user_id,
+                            puzzle_type=session.puzzle_type, game_id=session.game_id,
+                            score=finished.score, attempts=session.attempts, hints=session.hints
+                        )
+                elif event.kind == "attempt":
+                    analytics.emit(
+                        "puzzle_attempted", session.user_id,
+                        puzzle_type=session.puzzle_type, game_id=session.game_id, correct=bool(event.correct)
+                    )
+            session.acked = events[-1].seq
+        # Projections (abilities, badges, rollups) update as these are appended
+        get_progress_log().append_many(progress)
+
+        await asyncio.gather(*(
+            self._ack(session) for session, _ in batches if session.socket is not None
+        ))
+        return sum(len(events) for _, events in batches)
+
+    def _write_events(self, batches: List[Tuple[GameSession, List[PlayEvent]]]) -> None:
+        now = datetime.now().isoformat()
+        lines = []
+        for session, events in batches:
+            for event in events:
+                record = {
+                    "session_id": session.session_id,
+                    "user_id": session.user_id,
+                    "game_id": session.game_id,
+                    "puzzle_type": session.puzzle_type,
+                    "received_at": now,
+                    **event.model_dump(exclude_none=True)
+                }
+                lines.append(json.dumps(record).encode("utf-8") + b"\n")
+        self.events_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.events_path, "ab") as f:
+            f.write(b"".join(lines))
+
+    async def _ack(self, session: GameSession) -> None:
+        message = {"type": "ack", "seq": session.acked, **session.summary()}
+        try:
+            await session.socket.send_json(message)
+        except Exception:
+            # The receive loop notices the broken connection and detaches
+            pass
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        expired = [
+            session for session in self._sessions.values()
+            if session.socket is None and not session.pending
+            and (session.finished or now - session.detached_at >= RESUME_TTL)
+        ]
+        for session in expired:
+            self._end(session)
+
+    async def close(self) -> None:
+        """Flush and end every session, e.g. on shutdown"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+        for session in self._sessions.values():
+            if session.pending:
+                self._dirty[session.session_id] = session
+        await self.flush()
+        for session in list(self._sessions.values()):
+            if session.socket is not None:
+                await _close_quietly(session.socket, 1001, "server shutting down")
+            self._end(session)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+async def _close_quietly(socket, code: int, reason: str) -> None:
+    try:
+        await socket.close(code=code, reason=reason)
+    except Exception:
+        pass
+
+_registry: Optional[GameSessionRegistry] = None
+
+def get_game_sessions() -> GameSessionRegistry:
+    global _registry
+    if _registry is None:
+        _registry = GameSessionRegistry()
+    return _registry
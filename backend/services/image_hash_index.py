@@ -0,0 +1,214 @@
+"""
+Perceptual-hash index over the animal artwork.
+
+Every image gets a 64-bit difference hash (dHash): visually similar images
+get hashes a small Hamming distance apart. The hashes live in a BK-tree,
+which prunes whole subtrees using the triangle inequality, so a nearest
+neighbour lookup touches only a fraction of the catalog.
+"""
+import io
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple, Union
+from ..config.settings import ANIMAL_IMAGES_DIR, IMAGE_HASH_INDEX_PATH
+
+logger = logging.getLogger(__name__)
+
+HASH_SIZE = 8  # 8x8 comparisons -> 64-bit hash
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+
+# Rebuild the tree once this share of its nodes belongs to removed images
+REBUILD_TOMBSTONE_RATIO = 0.25
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+def dhash(image_source: Union[bytes, str, Path]) -> int:
+    """Compute the 64-bit difference hash of an image"""
+    from PIL import Image
+
+    source = io.BytesIO(image_source) if isinstance(image_source, bytes) else image_source
+    with Image.open(source) as image:
+        # Let the JPEG decoder downscale while decoding; much faster on photos
+        image.draft("L", (HASH_SIZE * 8, HASH_SIZE * 8))
+        small = image.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS)
+        pixels = list(small.getdata())
+
+    value = 0
+    for row in range(HASH_SIZE):
+        offset = row * (HASH_SIZE + 1)
+        for col in range(HASH_SIZE):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+class BKTree:
+    """Burkhard-Keller tree over 64-bit hashes under Hamming distance"""
+
+    __slots__ = ("root", "size")
+
+    def __init__(self):
+        # Node: [hash, [item, ...], {distance: child_node}]
+        self.root: Optional[list] = None
+        self.size = 0
+
+    def add(self, value: int, item: str) -> None:
+        self.size += 1
+        if self.root is None:
+            self.root = [value, [item], {}]
+            return
+
+        node = self.root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [item], {}]
+                return
+            node = child
+
+    def search(self, value: int, max_distance: int) -> List[Tuple[int, str]]:
+        """All (distance, item) pairs within max_distance, nearest first"""
+        results = []
+        if self.root is None:
+            return results
+
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= max_distance:
+                results.extend((distance, item) for item in node[1])
+            # Only children whose edge lies within the search ring can match
+            low, high = distance - max_distance, distance + max_distance
+            for edge, child in node[2].items():
+                if low <= edge <= high:
+                    stack.append(child)
+
+        results.sort()
+        return results
+
+class ImageHashIndex:
+    """
+    Hash index over an image directory, kept current incrementally.
+
+    Hashes are persisted with each file's (mtime, size), so a refresh only
+    decodes new or modified images. Removed or replaced images are filtered
+    out of results and the tree is rebuilt from the stored hashes (without
+    re-decoding) once they make up a large share of it. Refreshes and
+    lookups take a lock, so the index can be used from worker threads.
+    """
+
+    def __init__(self, image_dir: Path = ANIMAL_IMAGES_DIR, index_path: Path = IMAGE_HASH_INDEX_PATH):
+        self.image_dir = image_dir
+        self.index_path = index_path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.tree = BKTree()
+        self._live: Dict[str, int] = {}
+        self._last_refresh = float("-inf")
+        self._lock = threading.RLock()
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+        self._rebuild_tree()
+
+    def _save(self) -> None:
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_suffix(self.index_path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=2)
+        os.replace(tmp, self.index_path)
+
+    def _rebuild_tree(self) -> None:
+        self.tree = BKTree()
+        self._live = {}
+        for filename, entry in self.entries.items():
+            self.tree.add(entry["hash"], filename)
+            self._live[filename] = entry["hash"]
+
+    def refresh(self) -> int:
+        """Hash new or changed images and drop removed ones; returns files hashed"""
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self) -> int:
+        current = {
+            path.name: path
+            for path in self.image_dir.iterdir()
+            if path.suffix.lower() in IMAGE_EXTENSIONS
+        }
+
+        hashed = 0
+        for filename, path in current.items():
+            stat = path.stat()
+            signature = [stat.st_mtime_ns, stat.st_size]
+            entry = self.entries.get(filename)
+            if entry is not None and entry["signature"] == signature:
+                continue
+
+            value = dhash(path)
+            self.entries[filename] = {"hash": value, "signature": signature}
+            self._live[filename] = value
+            self.tree.add(value, filename)
+            hashed += 1
+
+        removed = [filename for filename in self.entries if filename not in current]
+        for filename in removed:
+            del self.entries[filename]
+            self._live.pop(filename, None)
+
+        if self.tree.size and (self.tree.size - len(self._live)) / self.tree.size > REBUILD_TOMBSTONE_RATIO:
+            self._rebuild_tree()
+
+        if hashed or removed:
+            self._save()
+            logger.info(f"Image hash index: {hashed} hashed, {len(removed)} removed")
+        self._last_refresh = time.monotonic()
+        return hashed
+
+    def maybe_refresh(self, interval: float = 30.0) -> None:
+        """Pick up added images without re-scanning the directory on every lookup"""
+        if time.monotonic() - self._last_refresh >= interval:
+            with self._lock:
+                # Another thread may have refreshed while this one waited
+                if time.monotonic() - self._last_refresh >= interval:
+                    self._refresh()
+
+    def nearest(self, value: int, max_distance: int, limit: int = 3) -> List[Tuple[int, str]]:
+        """Closest live images to a hash, at most max_distance bits away"""
+        matches = []
+        seen = set()
+        with self._lock:
+            for distance, filename in self.tree.search(value, max_distance):
+                # Skip removed images and superseded hashes of replaced ones
+                live_hash = self._live.get(filename)
+                if live_hash is None or filename in seen or hamming(value, live_hash) != distance:
+                    continue
+                seen.add(filename)
+                matches.append((distance, filename))
+                if len(matches) == limit:
+                    break
+        return matches
+
+_index: Optional[ImageHashIndex] = None
+_index_lock = threading.Lock()
+
+def get_image_hash_index() -> ImageHashIndex:
+    """Return the shared index, hashing any images added since the last check (blocking)"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = ImageHashIndex()
+    _index.maybe_refresh()
+    return _index
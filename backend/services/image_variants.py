@@ -0,0 +1,284 @@
+"""
+Responsive variants of the animal artwork.
+
+Each source image is resized to the standard widths and re-encoded as WebP
+(and AVIF where Pillow supports it). Encoding runs in a process pool, and
+every variant is written once under a content-hash filename, so it can be
+served with an immutable, year-long cache lifetime.
+"""
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Set, Tuple
+from ..config.settings import ANIMAL_IMAGES_DIR, IMAGE_VARIANTS_DIR
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = [160, 320, 640, 1024]
+VARIANT_QUALITY = {"webp": 80, "avif": 60}
+SOURCE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+MANIFEST_NAME = "manifest.json"
+
+def supported_formats() -> List[str]:
+    """Output formats this Pillow build can encode, preferred first"""
+    from PIL import features
+
+    formats = []
+    for fmt in ("avif", "webp"):
+        try:
+            if features.check(fmt):
+                formats.append(fmt)
+        except ValueError:
+            # Older Pillow releases don't know the feature name at all
+            continue
+    return formats
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def render_variants(source: str, formats: List[str], widths: List[int], output_dir: str) -> List[Dict[str, Any]]:
+    """
+    Resize and encode one source image into every width/format combination.
+
+    Runs inside a worker process: the source is decoded once and each width
+    is downscaled from the previous (larger) one.
+    """
+    from PIL import Image
+
+    source_path = Path(source)
+    out_dir = Path(output_dir)
+    variants = []
+
+    with Image.open(source_path) as image:
+        image = image.convert("RGB")
+        original_width, original_height = image.size
+        # Never upscale; always include at least the original width
+        targets = sorted({min(width, original_width) for width in widths}, reverse=True)
+
+        current = image
+        for width in targets:
+            height = round(original_height * width / original_width)
+            current = current.resize((width, height), Image.LANCZOS) if current.width != width else current
+
+            for fmt in formats:
+                buffer = io.BytesIO()
+                current.save(buffer, format=fmt.upper(), quality=VARIANT_QUALITY.get(fmt, 75))
+                data = buffer.getvalue()
+                digest = hashlib.sha256(data).hexdigest()[:16]
+                filename = f"{source_path.stem}-{width}w.{digest}.{fmt}"
+
+                target = out_dir / filename
+                if not target.exists():
+                    tmp = target.with_suffix(target.suffix + ".tmp")
+                    tmp.write_bytes(data)
+                    os.replace(tmp, target)
+
+                variants.append({
+                    "filename": filename,
+                    "format": fmt,
+                    "width": width,
+                    "height": height,
+                    "bytes": len(data)
+                })
+
+    return variants
+
+class ImageVariantService:
+    def __init__(
+        self,
+        source_dir: Path = ANIMAL_IMAGES_DIR,
+        output_dir: Path = IMAGE_VARIANTS_DIR,
+        widths: Optional[List[int]] = None,
+        max_workers: Optional[int] = None
+    ):
+        self.source_dir = source_dir
+        self.output_dir = output_dir
+        self.widths = widths or VARIANT_WIDTHS
+        self.max_workers = max_workers
+        self.formats = supported_formats()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manifest: Dict[str, Any] = self._load_manifest()
+        self._variant_files = self._index_variant_files()
+        self._source_hashes: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        # Source directory listing and the variant listing, by the directory's mtime
+        self._sources: Optional[Tuple[int, Dict[str, Path]]] = None
+        self._listing: Optional[Tuple[int, Dict[str, Any]]] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(self.output_dir / MANIFEST_NAME, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.output_dir / (MANIFEST_NAME + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._manifest, f, indent=2)
+        os.replace(tmp, self.output_dir / MANIFEST_NAME)
+
+    def source_images(self) -> Dict[str, Path]:
+        """Source images by name (file stem), re-listed only when the directory changes"""
+        mtime = self.source_dir.stat().st_mtime_ns
+        if self._sources is None or self._sources[0] != mtime:
+            self._sources = (mtime, {
+                path.stem: path
+                for path in sorted(self.source_dir.iterdir())
+                if path.suffix.lower() in SOURCE_EXTENSIONS
+            })
+        return self._sources[1]
+
+    def _source_hash(self, source: Path) -> str:
+        """Hash a source image, re-reading it only when it changed on disk"""
+        stat = source.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._source_hashes.get(source.name)
+        if cached is None or cached[0] != signature:
+            cached = (signature, file_hash(source))
+            self._source_hashes[source.name] = cached
+        return cached[1]
+
+    def _is_current(self, name: str, source_hash: str) -> bool:
+        entry = self._manifest.get(name)
+        return (
+            entry is not None
+            and entry["source_hash"] == source_hash
+            and entry["widths"] == self.widths
+            and entry["formats"] == self.formats
+            and all((self.output_dir / v["filename"]).exists() for v in entry["variants"])
+        )
+
+    async def ensure(self, name: str) -> Dict[str, Any]:
+        """Return variant metadata for an image, generating variants on first request"""
+        sources = self.source_images()
+        if name not in sources:
+            raise KeyError(name)
+
+        source = sources[name]
+        source_hash = self._source_hash(source)
+        if self._is_current(name, source_hash):
+            return self._manifest[name]
+
+        # Concurrent requests for the same image share one render job
+        task = self._in_flight.get(name)
+        if task is None:
+            task = asyncio.ensure_future(self._render(name, source, source_hash))
+            task.add_done_callback(lambda _: self._in_flight.pop(name, None))
+            self._in_flight[name] = task
+        return await asyncio.shield(task)
+
+    async def _render(self, name: str, source: Path, source_hash: str) -> Dict[str, Any]:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        loop = asyncio.get_running_loop()
+        variants = await loop.run_in_executor(
+            self.executor,
+            render_variants,
+            str(source), self.formats, self.widths, str(self.output_dir)
+        )
+
+        self._manifest[name] = {
+            "source": source.name,
+            "source_hash": source_hash,
+            "widths": self.widths,
+            "formats": self.formats,
+            "variants": variants
+        }
+        self._variant_files = self._index_variant_files()
+        self._save_manifest()
+        logger.info(f"Generated {len(variants)} variants for {source.name}")
+        return self._manifest[name]
+
+    async def build_all(self) -> Dict[str, Any]:
+        """Generate variants for every source image in parallel (build step)"""
+        names = list(self.source_images())
+        await asyncio.gather(*[self.ensure(name) for name in names])
+        return {name: self._manifest[name] for name in names}
+
+    async def listing(self) -> Dict[str, Any]:
+        """
+        Variant metadata for every source image, kept until the directory changes
+
+        An image whose variants can't be generated is logged and left out
+        instead of failing the whole listing.
+        """
+        sources = self.source_images()
+        mtime = self._sources[0]
+        if self._listing is not None and self._listing[0] == mtime:
+            return self._listing[1]
+
+        names = list(sources)
+        results = await asyncio.gather(*[self.ensure(name) for name in names], return_exceptions=True)
+        listing = {}
+        for name, result in zip(names, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Leaving {name} out of the image listing: {result!r}")
+            else:
+                listing[name] = result
+        self._listing = (mtime, listing)
+        return listing
+
+    def _index_variant_files(self) -> Set[str]:
+        return {
+            variant["filename"]
+            for entry in self._manifest.values()
+            for variant in entry["variants"]
+        }
+
+    def variant_path(self, filename: str) -> Optional[Path]:
+        """Path of a generated variant, or None for anything not in the manifest"""
+        if filename not in self._variant_files:
+            return None
+        return self.output_dir / filename
+
+def srcset_metadata(name: str, entry: Dict[str, Any], url_prefix: str) -> Dict[str, Any]:
+    """Shape variant metadata for <picture>/<img srcset> markup"""
+    sources = []
+    for fmt in entry["formats"]:
+        variants = sorted(
+            (v for v in entry["variants"] if v["format"] == fmt),
+            key=lambda v: v["width"]
+        )
+        sources.append({
+            "type": f"image/{fmt}",
+            "srcset": ", ".join(f"{url_prefix}/{v['filename']} {v['width']}w" for v in variants)
+        })
+
+    largest = max(entry["variants"], key=lambda v: v["width"])
+    return {
+        "name": name,
+        "original": f"/svannah_animals/{entry['source']}",
+        "width": largest["width"],
+        "height": largest["height"],
+        "sources": sources,
+        "sizes": "(max-width: 640px) 50vw, 320px"
+    }
+
+_service: Optional[ImageVariantService] = None
+
+def get_image_variant_service() -> ImageVariantService:
+    global _service
+    if _service is None:
+        _service = ImageVariantService()
+    return _service
@@ -0,0 +1,101 @@
+"""
+Whole lessons (a story and a game on one animal and theme) in one request.
+
+Both components start at once. Each is served from the content pack when
+pre-generated, otherwise generated by its agent and, for non-English
+lessons, translated as soon as that component is ready, without waiting
+for the other. Components are yielded in the order they finish, so a
+client can render the first while the second is still being written.
+
+Generation goes through the shared agents (content_generation.get_agents),
+so no agent is built while a lesson's components run. Components are
+handed back as they are: the pack entry (already serialized JSON) or the
+agent's model, for the router to serialize exactly once.
+"""
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, Optional, Tuple, Union
+from pydantic import BaseModel
+from .content_generation import game_key, generate_game, generate_story, story_key
+from .content_pack import PackEntry, get_content_pack
+
+# (component name, pack entry or generated model, timing metadata)
+LessonComponent = Tuple[str, Union[PackEntry, BaseModel], Dict[str, Any]]
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+async def _component(name: str, key: str, generate, **kwargs) -> LessonComponent:
+    start = time.perf_counter()
+    entry = get_content_pack().get_entry(key)
+    if entry is not None:
+        data = entry
+        timing: Dict[str, Any] = {"source": "pack"}
+    else:
+        steps: Dict[str, float] = {}
+        data = await generate(**kwargs, timings=steps)
+        timing = {"source": "generated", **{f"{step}_ms": _ms(seconds) for step, seconds in steps.items()}}
+    timing["total_ms"] = _ms(time.perf_counter() - start)
+    return name, data, timing
+
+async def iter_lesson(
+    animal_name: str,
+    lesson_theme: str,
+    puzzle_type: str,
+    difficulty: str,
+    age_group: str = "2-4 years",
+    language: str = "en"
+) -> AsyncIterator[LessonComponent]:
+    """Yield the lesson's story and game as each becomes ready"""
+    keys = {
+        "story": story_key(animal_name, lesson_theme, age_group, language),
+        "game": game_key(puzzle_type, difficulty, animal_name, lesson_theme, language)
+    }
+    tasks = [
+        asyncio.create_task(_component(
+            "story", keys["story"], generate_story,
+            animal_name=animal_name,
+            lesson_theme=lesson_theme,
+            age_group=age_group,
+            language=language
+        )),
+        asyncio.create_task(_component(
+            "game", keys["game"], generate_game,
+            puzzle_type=puzzle_type,
+            difficulty=difficulty,
+            animal_theme=animal_name,
+            lesson_theme=lesson_theme,
+            language=language
+        ))
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # A failed component (or a disconnected client) stops the other one
+        for task in tasks:
+            task.cancel()
+
+async def generate_lesson(
+    animal_name: str,
+    lesson_theme: str,
+    puzzle_type: str,
+    difficulty: str,
+    age_group: str = "2-4 years",
+    language: str = "en",
+    metadata: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """The lesson's components, with per-component timings in its metadata"""
+    start = time.perf_counter()
+    lesson: Dict[str, Any] = {}
+    timings: Dict[str, Any] = {}
+    async for name, data, timing in iter_lesson(animal_name, lesson_theme, puzzle_type, difficulty, age_group, language):
+        lesson[name] = data
+        timings[name] = timing
+
+    lesson["metadata"] = {
+        **(metadata or {}),
+        "language": language,
+        "timings": {**timings, "total_ms": _ms(time.perf_counter() - start)}
+    }
+    return lesson
@@ -0,0 +1,155 @@
+"""
+Seeded memory-game layouts with difficulty scoring.
+
+For each request thousands of candidate shuffles are generated and scored
+at once as NumPy arrays. A layout is harder when matching cards sit far
+apart and when look-alike animals are placed next to each other; it is
+easier when pairs touch. The difficulty level then picks from the ranking:
+"hard" takes the hardest candidate, "easy" the easiest.
+"""
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from pydantic import BaseModel
+from ..config.animal_assets import LOOKALIKE_GROUPS, images_by_species, species_for_theme
+
+# Grid (rows, cols) per difficulty; every grid holds rows * cols / 2 pairs
+GRID_SHAPES: Dict[str, Tuple[int, int]] = {
+    "easy": (2, 2),
+    "medium": (2, 4),
+    "hard": (3, 4)
+}
+
+# Where in the ranking (0 = easiest, 1 = hardest) each difficulty picks from
+DIFFICULTY_QUANTILES = {"easy": 0.0, "medium": 0.5, "hard": 1.0}
+
+DEFAULT_CANDIDATES = 4096
+
+# Score weights: pair distance, look-alike neighbours, touching pairs
+DISTANCE_WEIGHT = 0.6
+LOOKALIKE_WEIGHT = 0.4
+ADJACENT_PAIR_WEIGHT = 0.3
+
+class MemoryLayout(BaseModel):
+    rows: int
+    cols: int
+    seed: int
+    animals: List[str]  # species per pair id
+    images: List[str]  # image file per pair id
+    cells: List[int]  # pair id per grid cell, row-major
+    difficulty_score: float
+    percentile: float
+    candidates: int
+
+def adjacency_edges(rows: int, cols: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Index pairs (a, b) of horizontally and vertically adjacent cells"""
+    cells = np.arange(rows * cols).reshape(rows, cols)
+    horizontal = (cells[:, :-1].ravel(), cells[:, 1:].ravel())
+    vertical = (cells[:-1, :].ravel(), cells[1:, :].ravel())
+    return (
+        np.concatenate([horizontal[0], vertical[0]]),
+        np.concatenate([horizontal[1], vertical[1]])
+    )
+
+def similarity_matrix(animals: List[str]) -> np.ndarray:
+    """Boolean matrix: True where two different animals share a look-alike group"""
+    n = len(animals)
+    similar = np.zeros((n, n), dtype=bool)
+    for group in LOOKALIKE_GROUPS:
+        members = [i for i, animal in enumerate(animals) if animal in group]
+        for i in members:
+            similar[i, members] = True
+    np.fill_diagonal(similar, False)
+    return similar
+
+def choose_animals(num_pairs: int, animal_theme: str, rng: np.random.Generator) -> List[str]:
+    """The theme animal (when it has artwork) plus a seeded pick of others"""
+    available = sorted(images_by_species())
+    theme_species = species_for_theme(animal_theme)
+
+    chosen = [theme_species] if theme_species in available else []
+    others = [animal for animal in available if animal not in chosen]
+    picks = rng.choice(len(others), size=num_pairs - len(chosen), replace=False)
+    return chosen + [others[i] for i in sorted(picks)]
+
+def score_layouts(layouts: np.ndarray, rows: int, cols: int, similar: np.ndarray) -> np.ndarray:
+    """
+    Difficulty score per candidate layout, vectorized over all candidates.
+
+    layouts has shape (candidates, cells) holding the pair id in each cell.
+    """
+    num_candidates, num_cells = layouts.shape
+    num_pairs = num_cells // 2
+
+    # Cell positions of both cards of every pair: (candidates, pairs, 2)
+    positions = np.argsort(layouts, axis=1, kind="stable").reshape(num_candidates, num_pairs, 2)
+    row_gap = np.abs(positions[..., 0] // cols - positions[..., 1] // cols)
+    col_gap = np.abs(positions[..., 0] % cols - positions[..., 1] % cols)
+    max_distance = max(rows - 1 + cols - 1, 1)
+    distance = (row_gap + col_gap).mean(axis=1) / max_distance
+
+    a, b = adjacency_edges(rows, cols)
+    left, right = layouts[:, a], layouts[:, b]
+    touching_pairs = (left == right).mean(axis=1)
+    lookalikes = similar[left, right].mean(axis=1)
+
+    return (
+        DISTANCE_WEIGHT * distance
+        + LOOKALIKE_WEIGHT * lookalikes
+        - ADJACENT_PAIR_WEIGHT * touching_pairs
+    )
+
+def generate_memory_layout(
+    difficulty: str,
+    animal_theme: str,
+    seed: Optional[int] = None,
+    candidates: int = DEFAULT_CANDIDATES
+) -> MemoryLayout:
+    """Generate, rank and pick a memory grid for the requested difficulty"""
+    if seed is None:
+        seed = int(np.random.default_rng().integers(0, 2 ** 31))
+    rng = np.random.default_rng(seed)
+
+    rows, cols = GRID_SHAPES[difficulty]
+    num_pairs = rows * cols // 2
+    animals = choose_animals(num_pairs, animal_theme, rng)
+    images = images_by_species()
+
+    base = np.repeat(np.arange(num_pairs, dtype=np.int8), 2)
+    layouts = rng.permuted(np.tile(base, (candidates, 1)), axis=1)
+    scores = score_layouts(layouts, rows, cols, similarity_matrix(animals))
+
+    ranking = np.argsort(scores, kind="stable")
+    rank = int(round(DIFFICULTY_QUANTILES[difficulty] * (candidates - 1)))
+    chosen = int(ranking[rank])
+
+    return MemoryLayout(
+        rows=rows,
+        cols=cols,
+        seed=seed,
+        animals=animals,
+        images=[images[animal] for animal in animals],
+        cells=layouts[chosen].tolist(),
+        difficulty_score=round(float(scores[chosen]), 4),
+        percentile=round(rank / max(candidates - 1, 1), 4),
+        candidates=candidates
+    )
+
+def card_elements(layout: MemoryLayout) -> List[Dict[str, Any]]:
+    """Per-card content: position, face and the position of its match"""
+    partner: Dict[int, List[int]] = {}
+    for position, pair_id in enumerate(layout.cells):
+        partner.setdefault(pair_id, []).append(position)
+
+    cards = []
+    for position, pair_id in enumerate(layout.cells):
+        first, second = partner[pair_id]
+        cards.append({
+            "position": position,
+            "row": position // layout.cols,
+            "col": position % layout.cols,
+            "pair_id": pair_id,
+            "animal": layout.animals[pair_id],
+            "image": layout.images[pair_id],
+            "match_position": second if position == first else first
+        })
+    return cards
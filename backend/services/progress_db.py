@@ -0,0 +1,129 @@
+"""
+Progress events into the database.
+
+ActivityRecorder subscribes to the progress event log and queues every
+appended event; a background task writes the queue in batches with
+db.queries.record_activities, one transaction per batch, so recording
+progress never waits on the database.
+
+The event log stays the source of truth. When a write fails (the database
+is down, or the migrations haven't been run) the batch is put back and the
+database is left alone for a backoff period; past MAX_DEPTH queued events
+the oldest are dropped and counted.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Callable, Deque, List, Optional
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from ..db.engine import get_sessionmaker
+from ..db.queries import record_activities
+from .progress_events import ProgressEvent, get_progress_log
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 200
+FLUSH_INTERVAL = 1.0
+BACKOFF = (5.0, 300.0)  # seconds before retrying a failing database, doubling up to the max
+MAX_DEPTH = 50000
+
+class ActivityRecorder:
+    def __init__(self, sessionmaker: Callable[[], async_sessionmaker] = get_sessionmaker):
+        self.sessionmaker = sessionmaker
+        self._queue: Deque[ProgressEvent] = deque()
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._subscribed = False
+        self._retry_at = 0.0
+        self._backoff = BACKOFF[0]
+        self.stats = {"queued": 0, "written": 0, "failed_writes": 0, "dropped": 0}
+
+    def observe(self, event: ProgressEvent) -> None:
+        """Progress log subscriber: queue an event for writing"""
+        if len(self._queue) >= MAX_DEPTH:
+            self._queue.popleft()
+            self.stats["dropped"] += 1
+        self._queue.append(event)
+        self.stats["queued"] += 1
+        if len(self._queue) >= BATCH_SIZE and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def start(self) -> None:
+        if not self._subscribed:
+            get_progress_log().subscribe(self.observe)
+            self._subscribed = True
+        if self._task is None or self._task.done():
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            self._task = self._loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Progress database flush failed")
+
+    async def _write(self, events: List[ProgressEvent]) -> bool:
+        if time.monotonic() < self._retry_at:
+            return False
+        try:
+            async with self.sessionmaker()() as session:
+                await record_activities(session, events)
+                await session.commit()
+        except Exception as e:
+            self._retry_at = time.monotonic() + self._backoff
+            self.stats["failed_writes"] += 1
+            logger.warning(f"Writing progress to the database failed ({e!r}); retrying in {self._backoff:.0f}s")
+            self._backoff = min(self._backoff * 2, BACKOFF[1])
+            return False
+        self._backoff = BACKOFF[0]
+        self.stats["written"] += len(events)
+        return True
+
+    async def flush(self) -> None:
+        """Write everything queued, stopping at the first failed batch (which stays queued)"""
+        while self._queue:
+            batch = [self._queue.popleft() for _ in range(min(BATCH_SIZE, len(self._queue)))]
+            written = False
+            try:
+                written = await self._write(batch)
+            finally:
+                if not written:
+                    # Back at the front, also when cancelled mid-write
+                    self._queue.extendleft(reversed(batch))
+            if not written:
+                return
+
+    async def stop(self) -> None:
+        """Stop the background task after a last attempt at writing what is queued"""
+        if self._task is not None:
+            task, self._task = self._task, None
+            task.cancel()
+            # Let it put back a batch it was writing
+            await asyncio.gather(task, return_exceptions=True)
+        self._retry_at = 0.0
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Final progress database flush failed")
+        if self._queue:
+            logger.warning(f"{len(self._queue)} progress event(s) not written to the database")
+
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+_recorder: Optional[ActivityRecorder] = None
+
+def get_activity_recorder() -> ActivityRecorder:
+    global _recorder
+    if _recorder is None:
+        _recorder = ActivityRecorder()
+    return _recorder
@@ -0,0 +1,206 @@
+"""
+Append-only log of learner activity events.
+
+Every progress update is appended to a JSONL file, which is the source of
+truth for anything derived from learner history. Derived state (ability
+estimates, recommendations, ...) is a LogProjection: it is updated as each
+event is appended, periodically rebuilt by a batch job that writes a
+snapshot, and on startup restored from that snapshot plus a replay of the
+events written after it, addressed by byte offset into the log.
+"""
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Generic, Iterator, List, Optional, Tuple, Type, TypeVar
+from pydantic import BaseModel
+from ..config.settings import PROGRESS_EVENTS_PATH
+from .activity_store import ActivityStore, ActivityView
+
+logger = logging.getLogger(__name__)
+
+# Recent events kept in memory per user for progress analysis
+RECENT_EVENTS = 50
+
+class ProgressEvent(BaseModel):
+    user_id: str
+    activity_type: str
+    activity_id: str
+    score: float
+    time_spent: int
+    completion_status: bool
+    difficulty: str
+    timestamp: datetime
+    animal: Optional[str] = None  # animal character featured in the activity
+    language: str = "en"
+
+Subscriber = Callable[[ProgressEvent], None]
+
+class ProgressEventLog:
+    def __init__(self, path: Path = PROGRESS_EVENTS_PATH):
+        self.path = path
+        self._subscribers: List[Subscriber] = []
+        self._recent = ActivityStore(capacity=RECENT_EVENTS)
+        for _, event in self.replay():
+            self._recent.add(event)
+
+    def subscribe(self, subscriber: Subscriber) -> None:
+        """Call subscriber with every event appended from now on"""
+        self._subscribers.append(subscriber)
+
+    def append(self, event: ProgressEvent) -> int:
+        """Persist an event and notify subscribers; returns the log offset after it"""
+        return self.append_many([event])
+
+    def append_many(self, events: List[ProgressEvent]) -> int:
+        """Persist several events in one write, then notify subscribers of each"""
+        if not events:
+            return self.size()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "ab") as f:
+            f.write(b"".join(event.model_dump_json().encode("utf-8") + b"\n" for event in events))
+            offset = f.tell()
+
+        for event in events:
+            self._recent.add(event)
+            for subscriber in self._subscribers:
+                try:
+                    subscriber(event)
+                except Exception:
+                    # Derived state can always be rebuilt from the log
+                    logger.exception(f"Progress event subscriber {subscriber!r} failed")
+        return offset
+
+    def replay(self, offset: int = 0) -> Iterator[Tuple[int, ProgressEvent]]:
+        """Events from a byte offset on, each with the offset just after it"""
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            f.seek(offset)
+            for line in f:
+                offset += len(line)
+                if not line.endswith(b"\n"):
+                    # Partially written last line; picked up on the next replay
+                    break
+                try:
+                    event = ProgressEvent.model_validate(json.loads(line))
+                except ValueError:
+                    logger.warning(f"Skipping malformed progress event at offset {offset - len(line)}")
+                    continue
+                yield offset, event
+
+    def size(self) -> int:
+        try:
+            return self.path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def recent(self, user_id: str) -> ActivityView:
+        """A view of the user's most recent activities (not a copy)"""
+        return self._recent.view(user_id)
+
+_log: Optional[ProgressEventLog] = None
+
+def get_progress_log() -> ProgressEventLog:
+    global _log
+    if _log is None:
+        _log = ProgressEventLog()
+    return _log
+
+class LogProjection:
+    """State derived from the event log, snapshotted as JSON"""
+
+    # Bumped when the snapshot layout or meaning changes; older snapshots are
+    # ignored and the projection is rebuilt by replaying the whole log
+    snapshot_version = 1
+
+    def __init__(self):
+        self.log_offset = 0  # log position the state reflects
+
+    def observe(self, event: ProgressEvent) -> None:
+        """Apply one new event; must be cheap, it runs on every append"""
+        raise NotImplementedError
+
+    def to_dict(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def restore(self, data: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"log_offset": self.log_offset, "snapshot_version": self.snapshot_version, **self.to_dict()}, f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path):
+        """The snapshot at path, or an empty projection when there is none"""
+        projection = cls()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return projection
+        if data.get("snapshot_version", 1) != cls.snapshot_version:
+            logger.info(f"Ignoring {path}: snapshot version {data.get('snapshot_version', 1)}, expected {cls.snapshot_version}")
+            return projection
+        projection.restore(data)
+        projection.log_offset = data.get("log_offset", 0)
+        return projection
+
+P = TypeVar("P", bound=LogProjection)
+
+class ProjectionStore(Generic[P]):
+    """
+    Holds a live projection: the latest batch snapshot plus every event
+    logged since. A new snapshot is picked up at most every check_interval
+    seconds.
+    """
+
+    def __init__(self, projection_class: Type[P], path: Path, check_interval: float = 60.0):
+        self.projection_class = projection_class
+        self.path = path
+        self.check_interval = check_interval
+        self._projection: Optional[P] = None
+        self._snapshot_mtime: Optional[int] = None
+        self._last_check = float("-inf")
+
+    def _snapshot_signature(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _load(self) -> None:
+        log = get_progress_log()
+        projection = self.projection_class.load(self.path)
+        replayed = 0
+        for offset, event in log.replay(projection.log_offset):
+            projection.observe(event)
+            projection.log_offset = offset
+            replayed += 1
+
+        first_load = self._projection is None
+        self._projection = projection
+        if first_load:
+            log.subscribe(self._observe)
+        logger.info(f"Loaded {self.projection_class.__name__} from {self.path} ({replayed} events replayed)")
+
+    def _observe(self, event: ProgressEvent) -> None:
+        self._projection.observe(event)
+
+    def current(self) -> P:
+        now = time.monotonic()
+        if self._projection is None or now - self._last_check >= self.check_interval:
+            self._last_check = now
+            signature = self._snapshot_signature()
+            if self._projection is None or signature != self._snapshot_mtime:
+                self._snapshot_mtime = signature
+                self._load()
+        return self._projection
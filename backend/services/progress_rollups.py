@@ -0,0 +1,225 @@
+"""
+Time-bucketed progress rollups per user x language x activity type.
+
+Every progress event adds to its daily bucket and to a running total row
+as it is written. Compaction folds daily buckets older than DAILY_DAYS into
+their (Monday-aligned) week and weekly buckets older than WEEKLY_WEEKS into
+the month the week starts in, so each user keeps a bounded number of fine
+buckets however long they have used the app. Each period is held at
+exactly one granularity, so a week is its weekly row plus any of its days
+not yet compacted, and a month likewise.
+"""
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from ..config.agent_config import SUPPORTED_LANGUAGES
+from ..config.settings import PROGRESS_ROLLUPS_PATH
+from .progress_events import LogProjection, ProgressEvent, ProjectionStore
+
+DAY, WEEK, MONTH, TOTAL = "day", "week", "month", "total"
+
+# Buckets kept at daily / weekly resolution before compaction
+DAILY_DAYS = 35
+WEEKLY_WEEKS = 26
+
+# Completed activities (stories + games) per proficiency label, highest first
+PROFICIENCY_LEVELS = [(30, "confident"), (10, "learning"), (0, "beginner")]
+
+# (granularity, bucket start ISO date or "", language, activity_type)
+RowKey = Tuple[str, str, str, str]
+
+def week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+def next_month(day: date) -> date:
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+def activity_category(activity_type: str) -> str:
+    """stories or games, as reported by the language-progress endpoint"""
+    return "stories" if activity_type == "story" else "games"
+
+class Rollup:
+    __slots__ = ("activities", "completed", "score_sum", "time_spent")
+
+    def __init__(self, activities: int = 0, completed: int = 0, score_sum: float = 0.0, time_spent: int = 0):
+        self.activities = activities
+        self.completed = completed
+        self.score_sum = score_sum
+        self.time_spent = time_spent
+
+    def add(self, other: "Rollup") -> None:
+        self.activities += other.activities
+        self.completed += other.completed
+        self.score_sum += other.score_sum
+        self.time_spent += other.time_spent
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "activities": self.activities,
+            "completed": self.completed,
+            "average_score": round(self.score_sum / self.activities, 4) if self.activities else 0.0,
+            "time_spent": self.time_spent
+        }
+
+class ProgressRollups(LogProjection):
+    def __init__(self):
+        super().__init__()
+        # user -> row key -> rollup
+        self.rows: Dict[str, Dict[RowKey, Rollup]] = {}
+        # user -> (language, activity_type) pairs they have rows for
+        self.dimensions: Dict[str, set] = {}
+        # user -> date their rows were last compacted
+        self.compacted: Dict[str, date] = {}
+
+    def observe(self, event: ProgressEvent) -> None:
+        """Add an event to its daily bucket and running total; O(1)"""
+        user = event.user_id
+        language = event.language.strip().lower()
+        activity_type = event.activity_type.strip().lower()
+        day = event.timestamp.date()
+
+        value = Rollup(1, int(event.completion_status), event.score, event.time_spent)
+        rows = self.rows.setdefault(user, {})
+        for key in ((DAY, day.isoformat(), language, activity_type), (TOTAL, "", language, activity_type)):
+            row = rows.get(key)
+            if row is None:
+                row = rows[key] = Rollup()
+            row.add(value)
+        self.dimensions.setdefault(user, set()).add((language, activity_type))
+
+        # Compact each user at most once a day, as their events arrive
+        if self.compacted.get(user) != day:
+            self.compact_user(user, day)
+
+    def compact_user(self, user: str, today: date) -> int:
+        """Fold a user's old daily rows into weeks and old weeks into months"""
+        rows = self.rows.get(user, {})
+        day_cutoff = week_start(today - timedelta(days=DAILY_DAYS)).isoformat()
+        week_cutoff = month_start(today - timedelta(weeks=WEEKLY_WEEKS)).isoformat()
+
+        moved = 0
+        for granularity, cutoff, target in ((DAY, day_cutoff, WEEK), (WEEK, week_cutoff, MONTH)):
+            old = [key for key in rows if key[0] == granularity and key[1] < cutoff]
+            for key in old:
+                start = date.fromisoformat(key[1])
+                bucket = week_start(start) if target == WEEK else month_start(start)
+                target_key = (target, bucket.isoformat(), key[2], key[3])
+                row = rows.get(target_key)
+                if row is None:
+                    row = rows[target_key] = Rollup()
+                row.add(rows.pop(key))
+                moved += 1
+
+        self.compacted[user] = today
+        return moved
+
+    def compact(self, today: Optional[date] = None) -> int:
+        today = today or date.today()
+        return sum(self.compact_user(user, today) for user in list(self.rows))
+
+    def _row(self, user: str, key: RowKey) -> Optional[Rollup]:
+        return self.rows.get(user, {}).get(key)
+
+    def period(self, user: str, granularity: str, start: date, language: str, activity_type: str) -> Rollup:
+        """
+        Totals for one day, week or month, whichever granularities hold it.
+
+        At most 1 + 5 weekly + 35 daily row lookups, for a month.
+        """
+        total = Rollup()
+        row = self._row(user, (granularity, start.isoformat(), language, activity_type))
+        if row:
+            total.add(row)
+
+        if granularity == MONTH:
+            week = week_start(start)
+            if week < start:
+                week += timedelta(weeks=1)
+            end = next_month(start)
+            while week < end:
+                total.add(self.period(user, WEEK, week, language, activity_type))
+                week += timedelta(weeks=1)
+        elif granularity == WEEK:
+            for offset in range(7):
+                row = self._row(user, (DAY, (start + timedelta(days=offset)).isoformat(), language, activity_type))
+                if row:
+                    total.add(row)
+        return total
+
+    def language_totals(self, user: str) -> Dict[str, Dict[str, Rollup]]:
+        """language -> stories/games -> totals, from the running total rows"""
+        totals = {language: {"stories": Rollup(), "games": Rollup()} for language in SUPPORTED_LANGUAGES}
+        for language, activity_type in self.dimensions.get(user, ()):
+            row = self._row(user, (TOTAL, "", language, activity_type))
+            if row:
+                totals.setdefault(language, {"stories": Rollup(), "games": Rollup()})[activity_category(activity_type)].add(row)
+        return totals
+
+    def series(self, user: str, granularity: str, starts: List[date]) -> List[Dict]:
+        """Per-period stories/games totals summed over the user's languages"""
+        dimensions = self.dimensions.get(user, ())
+        result = []
+        for start in starts:
+            categories = {"stories": Rollup(), "games": Rollup()}
+            for language, activity_type in dimensions:
+                categories[activity_category(activity_type)].add(
+                    self.period(user, granularity, start, language, activity_type)
+                )
+            result.append({
+                "start": start.isoformat(),
+                **{category: rollup.to_dict() for category, rollup in categories.items()}
+            })
+        return result
+
+    def rebuild(self, events: Iterable[ProgressEvent], today: Optional[date] = None) -> int:
+        """Recompute every rollup from the full history, then compact"""
+        self.rows, self.dimensions, self.compacted = {}, {}, {}
+        count = 0
+        for event in events:
+            self.observe(event)
+            count += 1
+        self.compact(today)
+        return count
+
+    def to_dict(self) -> Dict:
+        return {
+            "rows": {
+                user: [[*key, row.activities, row.completed, row.score_sum, row.time_spent] for key, row in rows.items()]
+                for user, rows in self.rows.items()
+            },
+            "compacted": {user: day.isoformat() for user, day in self.compacted.items()}
+        }
+
+    def restore(self, data: Dict) -> None:
+        self.rows, self.dimensions = {}, {}
+        for user, rows in data.get("rows", {}).items():
+            self.rows[user] = {tuple(row[:4]): Rollup(*row[4:]) for row in rows}
+            self.dimensions[user] = {(row[2], row[3]) for row in rows}
+        self.compacted = {user: date.fromisoformat(day) for user, day in data.get("compacted", {}).items()}
+
+def proficiency(completed: int) -> str:
+    for threshold, label in PROFICIENCY_LEVELS:
+        if completed >= threshold:
+            return label
+    return PROFICIENCY_LEVELS[-1][1]
+
+def recent_days(today: date, count: int) -> List[date]:
+    return [today - timedelta(days=offset) for offset in range(count - 1, -1, -1)]
+
+def recent_weeks(today: date, count: int) -> List[date]:
+    current = week_start(today)
+    return [current - timedelta(weeks=offset) for offset in range(count - 1, -1, -1)]
+
+def recent_months(today: date, count: int) -> List[date]:
+    months = [month_start(today)]
+    while len(months) < count:
+        months.append(month_start(months[-1] - timedelta(days=1)))
+    return months[::-1]
+
+_store = ProjectionStore(ProgressRollups, PROGRESS_ROLLUPS_PATH)
+
+def get_progress_rollups() -> ProgressRollups:
+    """Return the live rollups, picking up rebuilt snapshots as they land"""
+    return _store.current()
@@ -0,0 +1,250 @@
+"""
+Blocklist screening for everything the content agents produce.
+
+The per-language lists in BLOCKLISTS_DIR are compiled once into a single
+Aho-Corasick automaton, each term tagged with the languages it is blocked
+in. Screening a story or game gathers every string in it, joins them and
+walks the automaton over the result once, so the cost is linear in the
+text however long the lists get; a match counts only at word boundaries
+and in the languages asked for ("sang" is blood in French but only the
+past of "sing" in English).
+
+Text is folded to lower case without accents before matching, with a
+one-to-one character table so match offsets are offsets into the original
+strings. Matches are reported per field path and can be masked in a copy.
+"""
+import copy
+import logging
+import unicodedata
+from bisect import bisect_right
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+from pydantic import BaseModel
+from ..config.settings import BLOCKLISTS_DIR
+
+logger = logging.getLogger(__name__)
+
+MASK_CHAR = "*"
+
+# Case and accent folding over Latin scripts, one character to one character
+FOLD = {}
+for _code in range(0x41, 0x250):
+    _folded = "".join(
+        ch for ch in unicodedata.normalize("NFKD", chr(_code).lower())
+        if not unicodedata.combining(ch)
+    )
+    if len(_folded) == 1 and _folded != chr(_code):
+        FOLD[_code] = _folded
+
+def fold(text: str) -> str:
+    return text.translate(FOLD)
+
+class SafetyMatch(BaseModel):
+    path: str  # field the match is in, e.g. scenes.2.dialogue
+    start: int
+    end: int
+    term: str  # blocklist entry, as written in the list
+    language: str
+
+class SafetyReport(BaseModel):
+    matches: List[SafetyMatch] = []
+
+    @property
+    def safe(self) -> bool:
+        return not self.matches
+
+class Pattern:
+    __slots__ = ("term", "length", "prefix", "languages")
+
+    def __init__(self, term: str, length: int, prefix: bool):
+        self.term = term
+        self.length = length
+        self.prefix = prefix  # matches the start of a longer word too
+        self.languages: List[str] = []
+
+class Automaton:
+    """Aho-Corasick over folded terms: goto transitions, failure links, outputs"""
+
+    def __init__(self, words: Iterable[str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.outputs: List[Tuple[int, ...]] = [()]
+        for index, word in enumerate(words):
+            state = 0
+            for ch in word:
+                next_state = self.goto[state].get(ch)
+                if next_state is None:
+                    next_state = self.goto[state][ch] = len(self.goto)
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.outputs.append(())
+                state = next_state
+            self.outputs[state] += (index,)
+
+        # Breadth first, so a state's failure target is always finished first
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self.goto[state].items():
+                target = self.fail[state]
+                while target and ch not in self.goto[target]:
+                    target = self.fail[target]
+                target = self.goto[target].get(ch, 0)
+                self.fail[next_state] = target
+                self.outputs[next_state] += self.outputs[target]
+                queue.append(next_state)
+
+    def __len__(self) -> int:
+        return len(self.goto)
+
+    def iter(self, text: str) -> Iterator[Tuple[int, int]]:
+        """(index of the last matched character, word index) for every match"""
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        state = 0
+        for position, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if outputs[state]:
+                for index in outputs[state]:
+                    yield position, index
+
+def read_blocklist(path: Path) -> List[str]:
+    """Terms in a blocklist file, skipping blank lines and # comments"""
+    terms = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                terms.append(line)
+    return terms
+
+def _strings(value: Any, path: Tuple = ()) -> Iterator[Tuple[Tuple, Any, Any, str]]:
+    """(path, container, key, text) for every string in a model/dict/list"""
+    if isinstance(value, BaseModel):
+        value = value.__dict__
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, list):
+        items = enumerate(value)
+    else:
+        return
+    for key, item in items:
+        if isinstance(item, str):
+            yield path + (key,), value, key, item
+        else:
+            yield from _strings(item, path + (key,))
+
+M = TypeVar("M")
+
+class SafetyFilter:
+    def __init__(self, blocklists: Dict[str, Iterable[str]]):
+        """blocklists: terms per language code; a trailing * makes a prefix term"""
+        patterns: Dict[Tuple[str, bool], Pattern] = {}
+        for language, terms in blocklists.items():
+            for term in terms:
+                prefix = term.endswith("*")
+                word = fold(term.rstrip("*").strip())
+                if not word:
+                    continue
+                pattern = patterns.get((word, prefix))
+                if pattern is None:
+                    pattern = patterns[(word, prefix)] = Pattern(term, len(word), prefix)
+                if language not in pattern.languages:
+                    pattern.languages.append(language)
+
+        self.languages = sorted(blocklists)
+        self.patterns = list(patterns.values())
+        self.automaton = Automaton(word for word, _ in patterns)
+
+    @classmethod
+    def from_directory(cls, directory: Path = BLOCKLISTS_DIR) -> "SafetyFilter":
+        """One list per language, named <language>.txt"""
+        return cls({path.stem: read_blocklist(path) for path in sorted(Path(directory).glob("*.txt"))})
+
+    def scan_text(self, text: str, languages: Optional[Iterable[str]] = None) -> List[Tuple[int, int, Pattern, str]]:
+        """(start, end, pattern, language) of each blocked term in text, in order"""
+        wanted = set(languages) if languages is not None else None
+        matches = []
+        for last, index in self.automaton.iter(fold(text)):
+            pattern = self.patterns[index]
+            language = next(
+                (language for language in pattern.languages if wanted is None or language in wanted),
+                None
+            )
+            if language is None:
+                continue
+            start, end = last - pattern.length + 1, last + 1
+            if start > 0 and text[start - 1].isalnum():
+                continue
+            if pattern.prefix:
+                # Report (and mask) the whole word the prefix starts
+                while end < len(text) and text[end].isalnum():
+                    end += 1
+            elif end < len(text) and text[end].isalnum():
+                continue
+            matches.append((start, end, pattern, language))
+        return matches
+
+    def scan(self, content: Any, languages: Optional[Iterable[str]] = None) -> SafetyReport:
+        """Every blocked term in a model (or dicts and lists), in one pass over all its text"""
+        fields = list(_strings(content))
+        # Newlines aren't word characters, so no match spans two fields
+        starts, offset = [], 0
+        for _, _, _, text in fields:
+            starts.append(offset)
+            offset += len(text) + 1
+        joined = "\n".join(text for _, _, _, text in fields)
+
+        matches = []
+        for start, end, pattern, language in self.scan_text(joined, languages):
+            field = bisect_right(starts, start) - 1
+            base = starts[field]
+            matches.append(SafetyMatch(
+                path=".".join(str(part) for part in fields[field][0]),
+                start=start - base,
+                end=end - base,
+                term=pattern.term,
+                language=language
+            ))
+        return SafetyReport(matches=matches)
+
+    def mask(self, content: M, report: SafetyReport) -> M:
+        """A copy of content with every matched span replaced by MASK_CHAR"""
+        spans: Dict[str, List[Tuple[int, int]]] = {}
+        for match in report.matches:
+            spans.setdefault(match.path, []).append((match.start, match.end))
+
+        masked = copy.deepcopy(content)
+        for path, container, key, text in list(_strings(masked)):
+            field_spans = spans.get(".".join(str(part) for part in path))
+            if field_spans:
+                chars = list(text)
+                for start, end in field_spans:
+                    chars[start:end] = MASK_CHAR * (end - start)
+                container[key] = "".join(chars)
+        return masked
+
+    def screen(self, content: M, languages: Iterable[str], source: str = "content") -> M:
+        """content itself when clean, otherwise a masked copy (and a warning)"""
+        report = self.scan(content, languages)
+        if report.safe:
+            return content
+        logger.warning(
+            f"Masked {len(report.matches)} blocked term(s) in {source}: "
+            + ", ".join(f"{match.term!r} ({match.language}) at {match.path}" for match in report.matches)
+        )
+        return self.mask(content, report)
+
+_filter: Optional[SafetyFilter] = None
+
+def get_safety_filter() -> SafetyFilter:
+    global _filter
+    if _filter is None:
+        _filter = SafetyFilter.from_directory(BLOCKLISTS_DIR)
+        logger.info(
+            f"Loaded blocklists for {', '.join(_filter.languages)}: "
+            f"{len(_filter.patterns)} terms, {len(_filter.automaton)} automaton states"
+        )
+    return _filter
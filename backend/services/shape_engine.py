@@ -0,0 +1,201 @@
+"""
+Procedural shape-matching sets rendered as compact SVG paths.
+
+Every shape is a (possibly star-shaped or stretched) polygon. All polygons
+of a set - targets, their rotated/scaled matching pieces and any
+distractors - are computed in one vectorized NumPy batch over a padded
+vertex array. Sets are pure functions of (difficulty, animal_theme, seed)
+and memoized on that key.
+"""
+from functools import lru_cache
+from typing import Dict, List, Tuple
+import zlib
+import numpy as np
+from pydantic import BaseModel
+
+VIEW_BOX = 100
+CENTER = VIEW_BOX / 2
+MAX_RADIUS = 44
+
+# name: (vertices, inner radius ratio for stars, base rotation in turns, x stretch)
+SHAPES: Dict[str, Tuple[int, float, float, float]] = {
+    "triangle": (3, 1.0, -0.25, 1.0),
+    "square": (4, 1.0, 0.125, 1.0),
+    "diamond": (4, 1.0, 0.0, 0.7),
+    "rectangle": (4, 1.0, 0.125, 1.4),
+    "pentagon": (5, 1.0, -0.25, 1.0),
+    "hexagon": (6, 1.0, 0.0, 1.0),
+    "heptagon": (7, 1.0, -0.25, 1.0),
+    "octagon": (8, 1.0, 0.0625, 1.0),
+    "circle": (32, 1.0, 0.0, 1.0),
+    "oval": (32, 1.0, 0.0, 1.35),
+    "star": (10, 0.45, -0.25, 1.0),
+    "star6": (12, 0.5, -0.25, 1.0)
+}
+MAX_VERTICES = max(spec[0] for spec in SHAPES.values())
+
+# Shapes a toddler is likely to confuse, used as "hard" distractors
+SIMILAR_SHAPES: Dict[str, List[str]] = {
+    "triangle": ["diamond", "pentagon"],
+    "square": ["rectangle", "diamond"],
+    "diamond": ["square", "triangle"],
+    "rectangle": ["square", "oval"],
+    "pentagon": ["hexagon", "star"],
+    "hexagon": ["heptagon", "octagon"],
+    "heptagon": ["hexagon", "octagon"],
+    "octagon": ["circle", "heptagon"],
+    "circle": ["octagon", "oval"],
+    "oval": ["circle", "rectangle"],
+    "star": ["star6", "pentagon"],
+    "star6": ["star", "hexagon"]
+}
+
+# Shapes and variation per difficulty
+DIFFICULTY_SETTINGS = {
+    "easy": {
+        "count": 3,
+        "pool": ["triangle", "square", "circle", "star"],
+        "rotation": 0.0,  # max piece rotation, in turns
+        "scale": (1.0, 1.0),
+        "distractors": 0,
+        "same_color": True
+    },
+    "medium": {
+        "count": 5,
+        "pool": ["triangle", "square", "circle", "star", "pentagon", "hexagon", "oval", "diamond"],
+        "rotation": 0.125,
+        "scale": (0.8, 1.0),
+        "distractors": 1,
+        "same_color": True
+    },
+    "hard": {
+        "count": 7,
+        "pool": list(SHAPES),
+        "rotation": 0.5,
+        "scale": (0.6, 1.0),
+        "distractors": 3,
+        "same_color": False
+    }
+}
+
+PALETTE = ["#F4A261", "#2A9D8F", "#E76F51", "#8AB17D", "#E9C46A", "#6D9DC5", "#B5838D", "#C8553D"]
+
+class ShapePiece(BaseModel):
+    id: int
+    shape: str
+    path: str
+    color: str
+
+class ShapeTarget(BaseModel):
+    shape: str
+    path: str
+    color: str
+    match_id: int  # piece that matches this target
+
+class ShapeSet(BaseModel):
+    difficulty: str
+    seed: int
+    view_box: str
+    targets: List[ShapeTarget]
+    pieces: List[ShapePiece]  # shuffled matches plus distractors
+
+def polygon_batch(
+    shapes: List[str],
+    rotations: np.ndarray,
+    scales: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vertices for many shapes at once.
+
+    Returns (x, y, counts): x and y have shape (len(shapes), MAX_VERTICES);
+    only the first counts[i] columns of row i are meaningful.
+    """
+    specs = np.array([SHAPES[name] for name in shapes], dtype=float)
+    counts = specs[:, 0].astype(int)
+    inner, base_rotation, stretch = specs[:, 1], specs[:, 2], specs[:, 3]
+
+    index = np.arange(MAX_VERTICES)[None, :]
+    angle = 2 * np.pi * (index / counts[:, None] + base_rotation[:, None])
+    # Star shapes alternate between the outer and inner radius; stretched
+    # shapes are shrunk so they stay inside the view box
+    radius = np.where(index % 2 == 1, inner[:, None], 1.0) * (MAX_RADIUS * scales)[:, None]
+    radius = radius * np.minimum(1.0, 1.0 / stretch)[:, None]
+
+    local_x = radius * np.cos(angle) * stretch[:, None]
+    local_y = radius * np.sin(angle)
+
+    turn = 2 * np.pi * rotations[:, None]
+    x = CENTER + local_x * np.cos(turn) - local_y * np.sin(turn)
+    y = CENTER + local_x * np.sin(turn) + local_y * np.cos(turn)
+    return np.round(x, 1), np.round(y, 1), counts
+
+def svg_path(x: np.ndarray, y: np.ndarray, count: int) -> str:
+    """Compact absolute path: M x y L x y ... Z"""
+    points = [f"{x[i]:g} {y[i]:g}" for i in range(count)]
+    return "M" + points[0] + "L" + " ".join(points[1:]) + "Z"
+
+@lru_cache(maxsize=1024)
+def generate_shape_set(difficulty: str, animal_theme: str, seed: int) -> ShapeSet:
+    """Targets, matching pieces and distractors for one game; memoized per key"""
+    settings = DIFFICULTY_SETTINGS[difficulty]
+    rng = np.random.default_rng([seed, zlib.crc32(f"{difficulty}:{animal_theme}".encode("utf-8"))])
+
+    pool = settings["pool"]
+    targets = [pool[i] for i in rng.choice(len(pool), size=min(settings["count"], len(pool)), replace=False)]
+
+    # Distractors: shapes similar to the targets that aren't targets themselves
+    similar = sorted({
+        candidate
+        for name in targets
+        for candidate in SIMILAR_SHAPES[name]
+        if candidate not in targets
+    })
+    if similar and settings["distractors"]:
+        picks = rng.choice(len(similar), size=min(settings["distractors"], len(similar)), replace=False)
+        distractors = [similar[i] for i in picks]
+    else:
+        distractors = []
+
+    # One batch: targets upright at full size, then rotated/scaled pieces
+    pieces = targets + distractors
+    names = targets + pieces
+    rotations = np.concatenate([
+        np.zeros(len(targets)),
+        rng.uniform(-settings["rotation"], settings["rotation"], size=len(pieces))
+    ])
+    scales = np.concatenate([
+        np.ones(len(targets)),
+        rng.uniform(*settings["scale"], size=len(pieces))
+    ])
+    x, y, counts = polygon_batch(names, rotations, scales)
+    paths = [svg_path(x[i], y[i], counts[i]) for i in range(len(names))]
+
+    colors = [PALETTE[i] for i in rng.permutation(len(PALETTE))]
+    target_colors = [colors[i % len(colors)] for i in range(len(targets))]
+    piece_colors = (
+        target_colors + [colors[(len(targets) + i) % len(colors)] for i in range(len(distractors))]
+        if settings["same_color"]
+        else [colors[i] for i in rng.integers(0, len(colors), size=len(pieces))]
+    )
+
+    order = rng.permutation(len(pieces))  # piece slot -> piece index
+    slot_of = {int(piece): slot for slot, piece in enumerate(order)}
+
+    return ShapeSet(
+        difficulty=difficulty,
+        seed=seed,
+        view_box=f"0 0 {VIEW_BOX} {VIEW_BOX}",
+        targets=[
+            ShapeTarget(shape=name, path=paths[i], color=target_colors[i], match_id=slot_of[i])
+            for i, name in enumerate(targets)
+        ],
+        pieces=[
+            ShapePiece(
+                id=slot,
+                shape=pieces[piece],
+                path=paths[len(targets) + piece],
+                color=piece_colors[piece]
+            )
+            for slot, piece in enumerate(order.tolist())
+        ]
+    )
@@ -0,0 +1,616 @@
+"""
+Structured output from LLM responses.
+
+A model's reply is parsed as its tokens stream in. IncrementalJSONParser
+is a character-level state machine that writes normalized JSON as it
+goes, repairing the defects models commonly produce on the way:
+surrounding prose and code fences, trailing or missing commas, single
+quotes, unquoted keys, Python literals, raw control characters in strings
+and brackets left unclosed when the output is cut off. Because its state
+is the open containers, a best-effort snapshot of a half-received reply
+is available at any point.
+
+StructuredOutput.generate() validates the parsed reply against the target
+pydantic model. Instead of throwing the reply away when fields are missing
+or invalid (a truncated story, a scene without dialogue), or may have
+been shortened by a cut (a list of scenes that stopped part way), it asks
+the model for just those fields, by path, and merges the answer in. Only a
+reply with no JSON in it at all costs a full retry. Repair and retry
+counts are kept per target model in stats.
+"""
+import json
+import logging
+import re
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Type, TypeVar, Union
+from pydantic import BaseModel, ValidationError
+
+logger = logging.getLogger(__name__)
+
+# Follow-up requests for missing fields before giving up
+MAX_FOLLOWUPS = 2
+# Full retries when a reply has no JSON in it at all
+MAX_FULL_RETRIES = 1
+
+# Streams the text of a model's reply to a prompt, chunk by chunk; a
+# client without streaming can yield the whole reply once
+TokenStream = Callable[[str], AsyncIterator[str]]
+
+M = TypeVar("M", bound=BaseModel)
+
+class StructuredOutputError(ValueError):
+    """Raised when a reply can't be turned into the target model"""
+
+# Inside a string, everything up to one of these can be copied as is
+_STRING_SPECIAL = re.compile(r"[\\\"'\x00-\x1f]")
+_NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?")
+_BARE_WORD = re.compile(r"[^\s,:{}\[\]\"'`]*")
+_WHITESPACE = re.compile(r"\s*")
+_FENCE = re.compile(r"`+[\w-]*")
+MAX_OUTSIDE_CHARS = 1024
+_LITERALS = {"true": "true", "false": "false", "null": "null", "True": "true", "False": "false", "None": "null"}
+_ESCAPES = set('"\\/bfnrtu')
+_INCOMPLETE_ESCAPE = re.compile(r"(\\+)u[0-9a-fA-F]{0,3}$")
+
+# What each open container expects next
+KEY, COLON, VALUE, COMMA = range(4)
+
+class _Frame:
+    __slots__ = ("closer", "expect", "start", "path", "member")
+
+    def __init__(self, closer: str, expect: int, start: int, path: Tuple[Union[str, int], ...]):
+        self.closer = closer
+        self.expect = expect
+        self.start = start  # token index where the member being read began
+        self.path = path  # keys and indexes leading to this container
+        # Key of the member being read, or index of the array item
+        self.member: Union[str, int, None] = None if closer == "}" else -1
+
+class IncrementalJSONParser:
+    """Feeds a streamed reply through a repairing JSON tokenizer"""
+
+    def __init__(self):
+        self.tokens: List[str] = []
+        self.repairs: Dict[str, int] = {}
+        self.done = False
+        self.cut = False  # the reply ended with containers still open
+        # Set by finish() on a cut reply: paths of values it may have shortened or dropped
+        self.cut_paths: List[str] = []
+        self._stack: List[_Frame] = []
+        self._started = False
+        self._outside = ""  # text around the JSON
+        # String being read: quote character, escaped pieces, key or value
+        self._quote: Optional[str] = None
+        self._pieces: List[str] = []
+        self._is_key = False
+        self._escape = False
+        # Bare word (number, literal, unquoted key) being read
+        self._bare: Optional[List[str]] = None
+
+    def _repair(self, kind: str) -> None:
+        self.repairs[kind] = self.repairs.get(kind, 0) + 1
+
+    def feed(self, chunk: str) -> None:
+        position, length = 0, len(chunk)
+        while position < length and not self.done:
+            if self._quote is not None:
+                position = self._read_string(chunk, position)
+            elif self._bare is not None:
+                end = _BARE_WORD.match(chunk, position).end()
+                self._bare.append(chunk[position:end])
+                position = end
+                if end < length:
+                    self._end_bare()
+            else:
+                position = _WHITESPACE.match(chunk, position).end()
+                if position < length:
+                    self._read_structure(chunk[position])
+                    position += 1
+        if self.done and position < length:
+            self._skip_outside(chunk[position:])
+
+    def _skip_outside(self, text: str) -> None:
+        """Prose or fences around the JSON, kept (up to a point) to report what was skipped"""
+        if len(self._outside) < MAX_OUTSIDE_CHARS:
+            self._outside += text
+
+    def _report_outside(self) -> None:
+        if "`" in self._outside:
+            self._repair("code_fence")
+        if _FENCE.sub("", self._outside).strip():
+            self._repair("surrounding_text")
+
+    def _read_structure(self, ch: str) -> None:
+        if not self._started:
+            if ch not in "{[":
+                self._skip_outside(ch)
+                return
+            self._started = True
+        if ch == "`":
+            # A closing fence before the JSON was closed: the reply ends here
+            self._skip_outside(ch)
+            self.done = self.cut = True
+            return
+
+        frame = self._stack[-1] if self._stack else None
+        expect = frame.expect if frame else VALUE
+
+        if ch in "}]":
+            if frame is None:
+                return
+            if ch != frame.closer:
+                self._repair("mismatched_bracket")
+            self._close(frame)
+            return
+
+        if ch == ",":
+            if expect == COMMA:
+                self.tokens.append(",")
+                frame.expect = KEY if frame.closer == "}" else VALUE
+            else:
+                self._repair("extra_comma")
+            return
+
+        if ch == ":":
+            if expect == COLON:
+                self.tokens.append(":")
+                frame.expect = VALUE
+            else:
+                self._repair("extra_colon")
+            return
+
+        if expect == COMMA:
+            # Two members with nothing between them
+            self._repair("missing_comma")
+            self.tokens.append(",")
+            frame.expect = expect = KEY if frame.closer == "}" else VALUE
+        elif expect == COLON:
+            self._repair("missing_colon")
+            self.tokens.append(":")
+            frame.expect = expect = VALUE
+
+        if frame is not None and (expect == KEY or frame.closer == "]"):
+            # A new member starts here: a key, or an array item
+            frame.start = len(self.tokens)
+            if frame.closer == "]":
+                frame.member += 1
+
+        if ch in "{[":
+            if expect == KEY:
+                # A value where a key belongs; nothing sensible to keep
+                self._repair("missing_key")
+                self.tokens.append('""')
+                self.tokens.append(":")
+                frame.expect = VALUE
+                frame.member = ""
+            self.tokens.append(ch)
+            path = frame.path + (frame.member,) if frame is not None else ()
+            self._stack.append(_Frame("}" if ch == "{" else "]", KEY if ch == "{" else VALUE, len(self.tokens), path))
+        elif ch in "\"'":
+            if ch == "'":
+                self._repair("single_quotes")
+            self._quote = ch
+            self._pieces = []
+            self._is_key = expect == KEY
+        else:
+            self._bare = [ch]
+
+    def _close(self, frame: _Frame) -> None:
+        if frame.expect in (COLON, VALUE) and frame.closer == "}":
+            # "key" or "key": with no value
+            self._repair("dangling_key")
+            self._drop_member(frame)
+        elif frame.expect in (KEY, VALUE) and self.tokens and self.tokens[-1] == ",":
+            self._repair("trailing_comma")
+            self.tokens.pop()
+        self.tokens.append(frame.closer)
+        self._stack.pop()
+        self._value_done()
+
+    def _drop_member(self, frame: _Frame) -> None:
+        del self.tokens[frame.start:]
+        if self.tokens and self.tokens[-1] == ",":
+            self.tokens.pop()
+
+    def _value_done(self) -> None:
+        if self._stack:
+            self._stack[-1].expect = COMMA
+        else:
+            self.done = True
+
+    def _read_string(self, chunk: str, position: int) -> int:
+        if self._escape:
+            self._escape = False
+            self._add_escape(chunk[position])
+            return position + 1
+
+        match = _STRING_SPECIAL.search(chunk, position)
+        end = match.start() if match else len(chunk)
+        if end > position:
+            self._pieces.append(chunk[position:end])
+        if match is None:
+            return end
+
+        ch = chunk[end]
+        if ch == "\\":
+            if end + 1 < len(chunk):
+                self._add_escape(chunk[end + 1])
+                return end + 2
+            self._escape = True
+        elif ch == self._quote:
+            self._end_string()
+        elif ch == '"':
+            self._pieces.append('\\"')  # inside a single-quoted string
+        elif ch == "'":
+            self._pieces.append("'")
+        else:
+            self._repair("control_character")
+            self._pieces.append(json.dumps(ch)[1:-1])
+        return end + 1
+
+    def _add_escape(self, ch: str) -> None:
+        if ch == "'" and self._quote == "'":
+            self._pieces.append("'")
+        elif ch in _ESCAPES:
+            self._pieces.append("\\" + ch)
+        else:
+            self._repair("invalid_escape")
+            self._pieces.append("\\\\" + ch if ch != "\n" else "\\n")
+
+    def _end_string(self) -> None:
+        self.tokens.append('"' + "".join(self._pieces) + '"')
+        self._quote = None
+        if self._is_key:
+            self._stack[-1].expect = COLON
+            self._stack[-1].member = json.loads(self.tokens[-1])
+        else:
+            self._value_done()
+
+    def _end_bare(self) -> None:
+        word = "".join(self._bare)
+        self._bare = None
+        frame = self._stack[-1] if self._stack else None
+        if frame is not None and frame.expect == KEY:
+            self._repair("unquoted_key")
+            self.tokens.append(json.dumps(word))
+            frame.expect = COLON
+            frame.member = word
+            return
+
+        if word in _LITERALS:
+            if word != _LITERALS[word]:
+                self._repair("python_literal")
+            self.tokens.append(_LITERALS[word])
+        elif _NUMBER.fullmatch(word):
+            self.tokens.append(word)
+        else:
+            self._repair("unquoted_value")
+            self.tokens.append(json.dumps(word))
+        self._value_done()
+
+    def _partial_token(self, numbers: bool) -> Optional[str]:
+        """The string or word being read, closed off, if it can stand as a value"""
+        if self._quote is not None:
+            text = "".join(self._pieces)
+            # Don't leave half of a \uXXXX escape behind
+            match = _INCOMPLETE_ESCAPE.search(text)
+            if match and len(match.group(1)) % 2:
+                text = text[:match.end(1) - 1]
+            return '"' + text + '"'
+        word = "".join(self._bare)
+        if word in _LITERALS:
+            return _LITERALS[word]
+        if numbers and _NUMBER.fullmatch(word):
+            return word
+        return None
+
+    def _cut_member(self, keep_partial: bool) -> Tuple[Optional[str], bool]:
+        """What becomes of the member being read: a closed-off token to keep, or whether it is dropped"""
+        frame = self._stack[-1]
+        reading = self._quote is not None or self._bare is not None
+        reading_value = reading and not (frame.closer == "}" and frame.expect == KEY)
+        partial = self._partial_token(numbers=keep_partial) if reading_value else None
+        if partial is not None and (keep_partial or self._bare is not None):
+            return partial, False
+        return None, reading or (frame.closer == "}" and frame.expect in (COLON, VALUE))
+
+    def _closed_text(self, keep_partial: bool) -> str:
+        """The tokens so far with every open container closed"""
+        tokens = list(self.tokens)
+        frame = self._stack[-1]
+        partial, dropped = self._cut_member(keep_partial)
+        if partial is not None:
+            tokens.append(partial)
+        elif dropped:
+            # The member being read when the reply stopped
+            del tokens[frame.start:]
+
+        for frame in reversed(self._stack):
+            if tokens and tokens[-1] == ",":
+                tokens.pop()
+            tokens.append(frame.closer)
+        return "".join(tokens)
+
+    def _open_paths(self) -> List[str]:
+        """
+        Paths of the containers left open, the outermost first, and of the
+        member dropped from the innermost one
+
+        The top-level object isn't listed: its missing fields are found
+        when it's validated.
+        """
+        paths = [_path(frame.path) for frame in self._stack[1:]]
+        frame = self._stack[-1]
+        _, dropped = self._cut_member(keep_partial=False)
+        key_known = frame.closer == "]" or frame.expect != KEY
+        if dropped and key_known:
+            paths.append(_path(frame.path + (frame.member,)))
+        return paths
+
+    def snapshot(self) -> Any:
+        """Best-effort value of the reply so far, the string being received included"""
+        if not self._started:
+            return None
+        if self.done and not self.cut:
+            return json.loads("".join(self.tokens))
+        return json.loads(self._closed_text(keep_partial=not self.cut))
+
+    def finish(self) -> Any:
+        """
+        The repaired value once the reply has ended
+
+        A reply cut off mid-way keeps every completed member of the open
+        containers; the member being read is dropped, so it shows up as
+        missing rather than as truncated text (a finished true, false or
+        null is kept; a number might have had more digits). A shortened
+        list can still be valid, so cut is set and cut_paths names what
+        the cut may have taken away.
+        """
+        self._report_outside()
+        if not self._started:
+            raise StructuredOutputError("Reply contains no JSON")
+        if self.done and not self.cut:
+            return json.loads("".join(self.tokens))
+        self._repair("unclosed")
+        self.cut = True
+        self.cut_paths = self._open_paths()
+        return json.loads(self._closed_text(keep_partial=False))
+
+def _path(loc: Tuple[Union[str, int], ...]) -> str:
+    return ".".join(str(part) for part in loc)
+
+def _split_path(path: str) -> List[Union[str, int]]:
+    return [int(part) if part.isdigit() else part for part in path.split(".")]
+
+def _remove(data: Any, loc: Tuple[Union[str, int], ...]) -> None:
+    """Drop the value at loc, if there is one"""
+    for part in loc[:-1]:
+        try:
+            data = data[part]
+        except (KeyError, IndexError, TypeError):
+            return
+    if isinstance(data, dict):
+        data.pop(loc[-1], None)
+
+def _assign(data: Any, parts: List[Union[str, int]], value: Any) -> None:
+    """Set the value at a path, creating the containers on the way"""
+    for position, part in enumerate(parts):
+        last = position == len(parts) - 1
+        if last:
+            child = value
+        else:
+            child = [] if isinstance(parts[position + 1], int) else {}
+        if isinstance(data, list) and isinstance(part, int):
+            while len(data) <= part:
+                data.append(None)
+            if last or not isinstance(data[part], (dict, list)):
+                data[part] = child
+        elif isinstance(data, dict):
+            if last or not isinstance(data.get(part), (dict, list)):
+                data[part] = child
+        else:
+            return
+        data = data[part]
+
+def _covers(path: str, wanted: str) -> bool:
+    return path == wanted or path.startswith(wanted + ".")
+
+def _outermost(paths: List[str]) -> List[str]:
+    """The paths without those under another one: asking for a field covers anything under it"""
+    kept: List[str] = []
+    for path in paths:
+        if not any(_covers(path, other) for other in kept):
+            kept = [other for other in kept if not _covers(other, path)] + [path]
+    return kept
+
+def _missing_paths(error: ValidationError, data: Dict[str, Any]) -> List[str]:
+    """Paths to ask for again: missing fields, and invalid ones (removed from data)"""
+    paths = []
+    for detail in error.errors(include_url=False):
+        loc = detail["loc"]
+        if not loc:
+            continue
+        if detail["type"] != "missing":
+            _remove(data, loc)
+        paths.append(_path(loc))
+    return _outermost(paths)
+
+def instructions(prompt: str, response_model: Type[BaseModel]) -> str:
+    """The prompt with the reply format spelled out"""
+    return (
+        f"{prompt}\n\n"
+        f"Reply with one JSON object matching this schema, and nothing else:\n"
+        f"{json.dumps(response_model.model_json_schema(), ensure_ascii=False)}"
+    )
+
+def followup_instructions(prompt: str, response_model: Type[BaseModel], data: Any, paths: List[str]) -> str:
+    """Ask for only the listed fields of an otherwise usable reply"""
+    listed = "\n".join(f"- {path}" for path in paths)
+    return (
+        f"{instructions(prompt, response_model)}\n\n"
+        f"Your previous reply was incomplete. What was usable:\n"
+        f"{json.dumps(data, ensure_ascii=False)}\n\n"
+        f"Reply with one JSON object giving only these fields, keyed by their dotted path "
+        f"(list items by index), and nothing else:\n{listed}"
+    )
+
+class StructuredOutput:
+    def __init__(self, max_followups: int = MAX_FOLLOWUPS, max_full_retries: int = MAX_FULL_RETRIES):
+        self.max_followups = max_followups
+        self.max_full_retries = max_full_retries
+        # Counters per target model name (see rates()), and repairs by kind
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self.repairs: Dict[str, int] = {}
+
+    def _count(self, name: str, counter: str, amount: int = 1) -> None:
+        counters = self.stats.setdefault(name, {
+            "replies": 0, "clean": 0, "repaired": 0, "retried": 0,
+            "followups": 0, "full_retries": 0, "failed": 0
+        })
+        counters[counter] += amount
+
+    async def read(
+        self,
+        stream: AsyncIterator[str],
+        on_partial: Optional[Callable[[Any], None]] = None
+    ) -> IncrementalJSONParser:
+        """Parse a reply as it arrives, stopping once its JSON is complete"""
+        parser = IncrementalJSONParser()
+        try:
+            async for chunk in stream:
+                parser.feed(chunk)
+                if on_partial is not None:
+                    on_partial(parser.snapshot())
+                if parser.done:
+                    break
+        finally:
+            close = getattr(stream, "aclose", None)
+            if close is not None:
+                await close()
+        return parser
+
+    async def _reply(
+        self,
+        prompt: str,
+        complete: TokenStream,
+        outcome: Dict[str, int],
+        on_partial: Optional[Callable[[Any], None]] = None
+    ) -> Tuple[Any, IncrementalJSONParser]:
+        parser = await self.read(complete(prompt), on_partial)
+        try:
+            return parser.finish(), parser
+        finally:
+            for kind, count in parser.repairs.items():
+                self.repairs[kind] = self.repairs.get(kind, 0) + count
+            if parser.repairs:
+                outcome["repaired"] = 1
+
+    async def generate(
+        self,
+        prompt: str,
+        response_model: Type[M],
+        complete: TokenStream,
+        on_partial: Optional[Callable[[Any], None]] = None
+    ) -> M:
+        """
+        Have the model fill response_model from prompt
+
+        on_partial, when given, is called with a snapshot of the reply
+        after every chunk, for showing content as it is generated.
+        """
+        name = response_model.__name__
+        outcome = {"repaired": 0, "followups": 0, "full_retries": 0}
+        self._count(name, "replies")
+        try:
+            return await self._generate(prompt, response_model, complete, on_partial, outcome)
+        except StructuredOutputError:
+            self._count(name, "failed")
+            raise
+        finally:
+            retried = outcome["followups"] or outcome["full_retries"]
+            for counter, amount in outcome.items():
+                self._count(name, counter, amount)
+            self._count(name, "retried", 1 if retried else 0)
+            self._count(name, "clean", 0 if retried or outcome["repaired"] else 1)
+
+    async def _generate(
+        self,
+        prompt: str,
+        response_model: Type[M],
+        complete: TokenStream,
+        on_partial: Optional[Callable[[Any], None]],
+        outcome: Dict[str, int]
+    ) -> M:
+        name = response_model.__name__
+        for attempt in range(self.max_full_retries + 1):
+            if attempt:
+                outcome["full_retries"] += 1
+            try:
+                data, parser = await self._reply(instructions(prompt, response_model), complete, outcome, on_partial)
+            except ValueError as e:
+                logger.warning(f"Unusable {name} reply (attempt {attempt + 1}): {e}")
+                continue
+            if isinstance(data, dict):
+                cut_paths = list(parser.cut_paths)
+                if parser.cut:
+                    # Fields after the cut never arrived, optional ones included
+                    cut_paths += [field for field in response_model.model_fields if field not in data]
+                break
+            logger.warning(f"{name} reply is not a JSON object (attempt {attempt + 1})")
+        else:
+            raise StructuredOutputError(f"No usable {name} in the model's replies")
+
+        while True:
+            # A list cut short validates, so what the cut reached is asked for too
+            try:
+                result, error, paths = response_model.model_validate(data), None, []
+            except ValidationError as e:
+                result, error, paths = None, e, _missing_paths(e, data)
+            paths = _outermost(paths + cut_paths)
+            if result is not None and not paths:
+                return result
+            if outcome["followups"] == self.max_followups or not paths:
+                if result is not None:
+                    logger.warning(f"{name} reply may still be cut short at: {', '.join(paths)}")
+                    return result
+                raise StructuredOutputError(
+                    f"{name} still invalid after {outcome['followups']} follow-up(s): {error}"
+                ) from error
+
+            outcome["followups"] += 1
+            logger.info(f"Asking again for {len(paths)} {name} field(s): {', '.join(paths)}")
+            try:
+                patch, parser = await self._reply(followup_instructions(prompt, response_model, data, paths), complete, outcome)
+            except ValueError as e:
+                logger.warning(f"Unusable {name} follow-up reply: {e}")
+                continue
+            if not isinstance(patch, dict):
+                continue
+            for path, value in patch.items():
+                if any(_covers(path, wanted) for wanted in paths):
+                    _assign(data, _split_path(path), value)
+            # The patch is keyed by dotted path, so its cut paths are paths in data
+            cut_paths = [path for path in parser.cut_paths if any(_covers(path, wanted) for wanted in paths)]
+            if parser.cut:
+                cut_paths += [wanted for wanted in paths if not any(_covers(path, wanted) for path in patch)]
+
+    def rates(self) -> Dict[str, Dict[str, float]]:
+        """Share of replies that needed repair, a follow-up or a full retry, or failed, per model"""
+        rates = {}
+        for name, counters in self.stats.items():
+            replies = max(counters["replies"], 1)
+            rates[name] = {
+                "repair_rate": counters["repaired"] / replies,
+                "retry_rate": counters["retried"] / replies,
+                "followups_per_reply": counters["followups"] / replies,
+                "full_retry_rate": counters["full_retries"] / replies,
+                "failure_rate": counters["failed"] / replies
+            }
+        return rates
+
+_structured_output: Optional[StructuredOutput] = None
+
+def get_structured_output() -> StructuredOutput:
+    global _structured_output
+    if _structured_output is None:
+        _structured_output = StructuredOutput()
+    return _structured_output
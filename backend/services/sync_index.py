@@ -0,0 +1,227 @@
+"""
+Indexed manifest of offline content for delta sync.
+
+Every syncable item (stories, games and catalogs in every language) is
+identified by its content pack key and versioned by the hash of its body.
+The index keeps an append-only change log ordered by sequence number, so a
+device that presents the cursor from its last sync is answered by a binary
+search plus a walk over only the items that changed since then.
+
+The index is saved to SYNC_CHANGELOG_PATH next to the content pack,
+together with the checksum of the pack it reflects. A worker that sees a
+new pack first takes the file lock. If another worker has already saved
+the index for that pack, it loads the saved copy; otherwise it applies the
+new pack to the saved index and saves the result. Every worker therefore
+shares one epoch and one numbering of changes, and both survive restarts,
+so a cursor issued by any worker is understood by all of them. Only a lost
+change log starts a new epoch.
+"""
+import fcntl
+import json
+import logging
+import os
+import secrets
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Iterable
+from pydantic import BaseModel
+from ..config.settings import SYNC_CHANGELOG_PATH
+from .content_pack import ContentPack, get_content_pack
+
+logger = logging.getLogger(__name__)
+
+# Oldest change-log entries are dropped past this size; devices whose cursor
+# predates the retained log fall back to a full manifest comparison.
+MAX_CHANGELOG_ENTRIES = 100_000
+
+class SyncDiff(BaseModel):
+    cursor: str
+    full: bool
+    upserts: List[str]
+    deletes: List[str]
+
+def item_language(item_id: str) -> str:
+    """Content keys end with the language code (see content_generation.content_key)"""
+    return item_id.rsplit(":", 1)[-1]
+
+class SyncIndex:
+    def __init__(self, epoch: Optional[str] = None):
+        # A fresh epoch (a new change log) invalidates every earlier cursor
+        self.epoch = epoch or secrets.token_hex(4)
+        self.seq = 0
+        self.pack_checksum = ""  # the content pack build items reflect
+        self.items: Dict[str, str] = {}
+        self._changelog: List[Tuple[int, str]] = []
+        self._changed_at: Dict[str, int] = {}
+
+    def to_dict(self) -> Dict:
+        return {
+            "epoch": self.epoch,
+            "seq": self.seq,
+            "pack_checksum": self.pack_checksum,
+            "items": self.items,
+            "changelog": self._changelog
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict) -> "SyncIndex":
+        index = cls(state["epoch"])
+        index.seq = state["seq"]
+        index.pack_checksum = state["pack_checksum"]
+        index.items = state["items"]
+        index._changelog = [(seq, item_id) for seq, item_id in state["changelog"]]
+        for seq, item_id in index._changelog:
+            index._changed_at[item_id] = seq
+        return index
+
+    @property
+    def cursor(self) -> str:
+        return f"{self.epoch}:{self.seq}"
+
+    def apply_snapshot(self, snapshot: Dict[str, str]) -> int:
+        """
+        Bring the index in line with a full {item_id: hash} snapshot.
+
+        This is the only O(catalog) step and runs once per content pack
+        version, not per sync request. Returns the number of changes.
+        """
+        changes = 0
+        for item_id, content_hash in snapshot.items():
+            if self.items.get(item_id) != content_hash:
+                self._record(item_id)
+                self.items[item_id] = content_hash
+                changes += 1
+
+        for item_id in [item_id for item_id in self.items if item_id not in snapshot]:
+            self._record(item_id)
+            del self.items[item_id]
+            changes += 1
+
+        self._compact()
+        return changes
+
+    def _record(self, item_id: str) -> None:
+        self.seq += 1
+        self._changelog.append((self.seq, item_id))
+        self._changed_at[item_id] = self.seq
+
+    def _compact(self) -> None:
+        overflow = len(self._changelog) - MAX_CHANGELOG_ENTRIES
+        if overflow > 0:
+            del self._changelog[:overflow]
+
+    def _parse_cursor(self, cursor: Optional[str]) -> Optional[int]:
+        """Return the sequence number for a cursor this index can still serve"""
+        if not cursor:
+            return None
+        epoch, _, seq = cursor.partition(":")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+        oldest = self._changelog[0][0] - 1 if self._changelog else self.seq
+        if seq < oldest or seq > self.seq:
+            return None
+        return seq
+
+    def changed_since(self, seq: int) -> Iterable[str]:
+        """Item ids changed after seq, each once, in O(changed) time"""
+        start = bisect_left(self._changelog, (seq + 1,))
+        for change_seq, item_id in self._changelog[start:]:
+            # Skip superseded log entries for items changed more than once
+            if self._changed_at.get(item_id) == change_seq:
+                yield item_id
+
+    def diff(
+        self,
+        cursor: Optional[str],
+        manifest: Dict[str, str],
+        languages: Optional[Iterable[str]] = None
+    ) -> SyncDiff:
+        """Compute what a device holding manifest (and cursor) needs to fetch or drop"""
+        wanted = set(languages) if languages else None
+        since = self._parse_cursor(cursor)
+
+        if since is not None:
+            candidates = self.changed_since(since)
+            full = False
+        else:
+            # Unknown or expired cursor: compare against the whole catalog
+            candidates = list(self.items) + [item_id for item_id in manifest if item_id not in self.items]
+            full = True
+
+        upserts, deletes = [], []
+        for item_id in candidates:
+            if wanted is not None and item_language(item_id) not in wanted:
+                continue
+            content_hash = self.items.get(item_id)
+            if content_hash is None:
+                if item_id in manifest or (not full and not manifest):
+                    deletes.append(item_id)
+            elif manifest.get(item_id) != content_hash:
+                upserts.append(item_id)
+
+        return SyncDiff(cursor=self.cursor, full=full, upserts=upserts, deletes=deletes)
+
+def pack_snapshot(pack: ContentPack) -> Dict[str, str]:
+    return {entry.key: entry.content_hash.hex() for entry in pack.entries()}
+
+@contextmanager
+def _locked(path: Path) -> Iterator[None]:
+    """Exclusive lock across worker processes while the saved index is read and updated"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_suffix(path.suffix + ".lock"), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+def load_index(path: Path = SYNC_CHANGELOG_PATH) -> Optional[SyncIndex]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return SyncIndex.from_dict(json.load(f))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Starting a new sync change log; {path} is unreadable: {e}")
+        return None
+
+def save_index(index: SyncIndex, path: Path = SYNC_CHANGELOG_PATH) -> None:
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def index_for_pack(pack: ContentPack, path: Path = SYNC_CHANGELOG_PATH) -> SyncIndex:
+    """The shared index brought up to pack: loaded if already saved for it, else updated and saved"""
+    with _locked(path):
+        index = load_index(path)
+        if index is not None and index.pack_checksum == pack.checksum:
+            return index
+        index = index or SyncIndex()
+        changes = index.apply_snapshot(pack_snapshot(pack))
+        index.pack_checksum = pack.checksum
+        save_index(index, path)
+    logger.info(f"Sync index updated with {changes} changes, now at {index.cursor}")
+    return index
+
+_index = SyncIndex()
+_indexed_pack: Optional[ContentPack] = None
+
+def get_sync_index() -> Tuple[SyncIndex, ContentPack]:
+    """Return the sync index, folding in a newly swapped content pack"""
+    global _index, _indexed_pack
+    pack = get_content_pack()
+    if pack is not _indexed_pack:
+        try:
+            _index = index_for_pack(pack)
+        except OSError as e:
+            # Still serve diffs from this worker's own index
+            logger.warning(f"Could not share the sync change log at {SYNC_CHANGELOG_PATH}: {e}")
+            _index.apply_snapshot(pack_snapshot(pack))
+            _index.pack_checksum = pack.checksum
+        _indexed_pack = pack
+    return _index, pack
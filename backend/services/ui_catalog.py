@@ -0,0 +1,276 @@
+"""
+Compiled catalog of UI strings in every supported language.
+
+UI strings (story themes, animal types, game descriptions) are a fixed set,
+so instead of going through the translation agent they are compiled ahead
+of time, like a gettext .mo file, from the hand-written translations in
+UI_TRANSLATIONS_DIR into one binary file that the API memory-maps.
+
+Layout (little-endian, sections 8-byte aligned):
+
+    header     magic, version, counts, section offsets, digest of the sources
+    languages  language_count x 8-byte language codes (column order)
+    table      table_size x u32 open-addressing hash index over the msgids,
+               each slot 0 (empty) or string index + 1, linear probing
+    strings    string_count x (1 + language_count) x (u32 offset, u32 length),
+               the msgid followed by its text in each language
+    data       UTF-8 text; equal strings (and untranslated ones) share bytes
+
+A lookup hashes the English text, probes the table and slices the data, so
+it costs the same however many strings the catalog holds.
+"""
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from ..config.agent_config import SUPPORTED_LANGUAGES
+from ..config.settings import UI_CATALOG_PATH, UI_TRANSLATIONS_DIR
+from ..config.ui_strings import UI_CATALOGS, UI_FIELDS
+from .content_pack import key_hash, _align
+
+logger = logging.getLogger(__name__)
+
+CATALOG_MAGIC = b"SAFUI\x00\x00\x00"
+CATALOG_FORMAT_VERSION = 1
+
+# UI strings are written in English; it is the msgid column
+SOURCE_LANGUAGE = "en"
+
+# magic, version, language_count, string_count, table_size,
+# languages_offset, table_offset, strings_offset, data_offset, data_length,
+# blake2b-128 of the sources the catalog was compiled from
+HEADER = struct.Struct("<8sHHIIQQQQQ16s")
+LANGUAGE = struct.Struct("<8s")
+
+class UICatalogError(ValueError):
+    """Raised when a UI catalog file is malformed"""
+
+def load_translations(directory: Path = UI_TRANSLATIONS_DIR) -> Dict[str, Dict[str, str]]:
+    """{language: {English text: translation}} from <language>.json files"""
+    translations = {}
+    for path in sorted(Path(directory).glob("*.json")):
+        with open(path, "r", encoding="utf-8") as f:
+            translations[path.stem] = json.load(f)
+    return translations
+
+def _ui_strings(value: Any, translate: bool = False) -> Iterator[str]:
+    """Strings under UI_FIELDS keys in a catalog payload (dicts, lists)"""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _ui_strings(item, key in UI_FIELDS)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _ui_strings(item, translate)
+    elif translate and isinstance(value, str):
+        yield value
+
+def ui_messages(translations: Dict[str, Dict[str, str]]) -> List[str]:
+    """Every msgid: the catalogs' strings, then any extra ones the translation files add"""
+    messages = {}
+    for payload in UI_CATALOGS.values():
+        messages.update(dict.fromkeys(_ui_strings(payload)))
+    for language in sorted(translations):
+        messages.update(dict.fromkeys(translations[language]))
+    return list(messages)
+
+def source_digest(messages: List[str], translations: Dict[str, Dict[str, str]], languages: List[str]) -> bytes:
+    sources = json.dumps([languages, messages, translations], ensure_ascii=False, sort_keys=True)
+    return hashlib.blake2b(sources.encode("utf-8"), digest_size=16).digest()
+
+def compile_catalog(
+    messages: List[str],
+    translations: Dict[str, Dict[str, str]],
+    languages: List[str] = SUPPORTED_LANGUAGES
+) -> Tuple[bytes, Dict[str, List[str]]]:
+    """
+    Build the catalog file contents
+
+    Returns the bytes and the msgids left untranslated per language; those
+    fall back to the English text.
+    """
+    missing: Dict[str, List[str]] = {}
+    count = len(messages)
+    table_size = 8
+    while table_size < 2 * count:
+        table_size *= 2
+
+    data = bytearray()
+    offsets: Dict[str, Tuple[int, int]] = {}
+
+    def intern(text: str) -> Tuple[int, int]:
+        if text not in offsets:
+            encoded = text.encode("utf-8")
+            offsets[text] = (len(data), len(encoded))
+            data.extend(encoded)
+        return offsets[text]
+
+    table = [0] * table_size
+    strings: List[int] = []
+    for index, message in enumerate(messages):
+        slot = key_hash(message) & (table_size - 1)
+        while table[slot]:
+            slot = (slot + 1) & (table_size - 1)
+        table[slot] = index + 1
+
+        strings.extend(intern(message))
+        for language in languages:
+            text = translations.get(language, {}).get(message)
+            if text is None:
+                if language != SOURCE_LANGUAGE:
+                    missing.setdefault(language, []).append(message)
+                text = message
+            strings.extend(intern(text))
+
+    languages_offset = _align(HEADER.size)
+    table_offset = _align(languages_offset + LANGUAGE.size * len(languages))
+    strings_offset = _align(table_offset + 4 * table_size)
+    data_offset = _align(strings_offset + 4 * len(strings))
+
+    contents = bytearray(data_offset)
+    HEADER.pack_into(
+        contents, 0,
+        CATALOG_MAGIC, CATALOG_FORMAT_VERSION, len(languages), count, table_size,
+        languages_offset, table_offset, strings_offset, data_offset, len(data),
+        source_digest(messages, translations, list(languages))
+    )
+    for position, language in enumerate(languages):
+        LANGUAGE.pack_into(contents, languages_offset + LANGUAGE.size * position, language.encode("ascii"))
+    struct.pack_into(f"<{table_size}I", contents, table_offset, *table)
+    struct.pack_into(f"<{len(strings)}I", contents, strings_offset, *strings)
+    contents += data
+    return bytes(contents), missing
+
+def write_catalog(path: Path, contents: bytes) -> None:
+    """Write the catalog atomically; readers keep their old mapping"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(contents)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+class UICatalog:
+    """Memory-mapped, read-only view of a compiled UI catalog"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        view = memoryview(self._mmap)
+        if len(view) < HEADER.size:
+            raise UICatalogError(f"{path} is too small to be a UI catalog")
+
+        (
+            magic, version, language_count, count, table_size,
+            languages_offset, table_offset, strings_offset,
+            data_offset, data_length, digest
+        ) = HEADER.unpack_from(view, 0)
+
+        if magic != CATALOG_MAGIC:
+            raise UICatalogError(f"{path} is not a UI catalog")
+        if version != CATALOG_FORMAT_VERSION:
+            raise UICatalogError(f"Unsupported UI catalog version: {version}")
+        if data_offset + data_length != len(view):
+            raise UICatalogError(f"{path} is truncated")
+
+        self.digest = digest
+        self.languages = [
+            LANGUAGE.unpack_from(view, languages_offset + LANGUAGE.size * position)[0].rstrip(b"\x00").decode("ascii")
+            for position in range(language_count)
+        ]
+        self._columns = {language: position + 1 for position, language in enumerate(self.languages)}
+        self._count = count
+        self._mask = table_size - 1
+        self._table = view[table_offset:table_offset + 4 * table_size].cast("I")
+        self._strings = view[strings_offset:strings_offset + 8 * count * (1 + language_count)].cast("I")
+        self._data = view[data_offset:data_offset + data_length]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _text(self, index: int, column: int) -> str:
+        position = 2 * (index * (1 + len(self.languages)) + column)
+        offset, length = self._strings[position], self._strings[position + 1]
+        return str(self._data[offset:offset + length], "utf-8")
+
+    def _index(self, text: str) -> Optional[int]:
+        """Probe the hash table for a msgid; None if it isn't in the catalog"""
+        if not self._count:
+            return None
+        slot = key_hash(text) & self._mask
+        while self._table[slot]:
+            index = self._table[slot] - 1
+            if self._text(index, 0) == text:
+                return index
+            slot = (slot + 1) & self._mask
+        return None
+
+    def lookup(self, text: str, language: str) -> Optional[str]:
+        """The text in language, or None if it isn't a known UI string (or language)"""
+        column = self._columns.get(language)
+        if column is None:
+            return None
+        index = self._index(text)
+        return self._text(index, column) if index is not None else None
+
+    def translate(self, text: str, language: str) -> str:
+        """Like lookup, but unknown strings come back unchanged"""
+        translated = self.lookup(text, language)
+        return translated if translated is not None else text
+
+    def localize(self, payload: Any, language: str) -> Any:
+        """A copy of a catalog payload with the strings under UI_FIELDS in language"""
+        return self._localize(payload, language, False)
+
+    def _localize(self, value: Any, language: str, translate: bool) -> Any:
+        if isinstance(value, dict):
+            return {key: self._localize(item, language, key in UI_FIELDS) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._localize(item, language, translate) for item in value]
+        if translate and isinstance(value, str):
+            return self.translate(value, language)
+        return value
+
+    def messages(self) -> Iterator[str]:
+        for index in range(self._count):
+            yield self._text(index, 0)
+
+def build_ui_catalog(
+    path: Path = UI_CATALOG_PATH,
+    translations_dir: Path = UI_TRANSLATIONS_DIR,
+    force: bool = False
+) -> bool:
+    """Compile the catalog unless the one at path is from the same sources; returns True if written"""
+    translations = load_translations(translations_dir)
+    messages = ui_messages(translations)
+    digest = source_digest(messages, translations, list(SUPPORTED_LANGUAGES))
+
+    if not force and path.exists():
+        try:
+            if UICatalog(path).digest == digest:
+                return False
+        except (OSError, UICatalogError) as e:
+            logger.warning(f"Rebuilding unreadable UI catalog {path}: {e}")
+
+    contents, missing = compile_catalog(messages, translations, SUPPORTED_LANGUAGES)
+    for language, untranslated in missing.items():
+        logger.warning(f"{len(untranslated)} UI string(s) untranslated in {language}: {', '.join(untranslated)}")
+    write_catalog(path, contents)
+    logger.info(f"Compiled {len(messages)} UI strings in {len(SUPPORTED_LANGUAGES)} languages to {path}")
+    return True
+
+_catalog: Optional[UICatalog] = None
+
+def get_ui_catalog() -> UICatalog:
+    """The mapped catalog, compiled first if it is missing or its sources changed"""
+    global _catalog
+    if _catalog is None:
+        build_ui_catalog()
+        _catalog = UICatalog(UI_CATALOG_PATH)
+    return _catalog
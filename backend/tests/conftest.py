@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# The backend is imported as a package (backend.api...), also when pytest runs from backend/
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+# Settings are read at import time; keep test runs out of backend/data
+os.environ.setdefault("SAFARI_DATA_DIR", tempfile.mkdtemp(prefix="safari-test-"))
+os.environ.setdefault("OPENAI_API_KEY", "test")
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+from backend.services.activity_recommender import ActivityRecommender, activity_key
+from backend.services.progress_events import ProgressEvent
+
+START = datetime(2026, 1, 1)
+
+def play(user: str, step: int, activity_type: str, animal: str, difficulty: str = "easy") -> ProgressEvent:
+    return ProgressEvent(
+        user_id=user,
+        activity_type=activity_type,
+        activity_id=f"game-{user}-{step}",  # never repeats, like live game ids
+        score=0.8,
+        time_spent=60,
+        completion_status=True,
+        difficulty=difficulty,
+        timestamp=START + timedelta(minutes=step),
+        animal=animal
+    )
+
+def histories(users: int):
+    for user in range(users):
+        yield play(f"u{user}", 0, "counting", "Lion")
+        yield play(f"u{user}", 1, "memory", "Lion")
+        if user % 2:
+            yield play(f"u{user}", 2, "shape_matching", "Zebra")
+
+def test_learners_share_items_despite_unique_activity_ids():
+    recommender = ActivityRecommender()
+    recommender.rebuild(histories(10))
+    assert recommender.recommend([activity_key("counting", "easy", "Lion")], limit=2) == [
+        activity_key("memory", "easy", "lion"),
+        activity_key("shape_matching", "easy", "zebra")
+    ]
+
+def test_scores_follow_counts_of_items_in_untouched_rows():
+    events = [play(f"s{user}", step, activity, "Lion")
+              for user in range(6) for step, activity in enumerate(("counting", "shape_matching"))]
+    events += [play(f"m{user}", step, activity, "Lion")
+               for user in range(4) for step, activity in enumerate(("counting", "memory"))]
+    recommender = ActivityRecommender()
+    for event in events:
+        recommender.observe(event)
+    recent = [activity_key("counting", "easy", "Lion")]
+    assert recommender.recommend(recent, limit=1) == [activity_key("shape_matching", "easy", "Lion")]
+
+    # Shape matching becomes popular on its own; the counting row is never touched
+    later = [play(f"p{user}", 0, "shape_matching", "Lion") for user in range(40)]
+    for event in later:
+        recommender.observe(event)
+    rebuilt = ActivityRecommender()
+    rebuilt.rebuild(events + later)
+    assert recommender.recommend(recent) == rebuilt.recommend(recent)
+    assert recommender.recommend(recent, limit=1) == [activity_key("memory", "easy", "Lion")]
@@ -0,0 +1,42 @@
+import math
+import struct
+import wave
+from backend.services.audio_sprites import AudioSpriteService
+
+def write_tone(path, frequency: float, seconds: float = 0.2, rate: int = 22050) -> None:
+    with wave.open(str(path), "wb") as clip:
+        clip.setnchannels(1)
+        clip.setsampwidth(2)
+        clip.setframerate(rate)
+        clip.writeframes(b"".join(
+            struct.pack("<h", int(12000 * math.sin(2 * math.pi * frequency * n / rate)))
+            for n in range(int(seconds * rate))
+        ))
+
+def test_rebuilt_sprite_is_picked_up_without_a_restart(tmp_path):
+    sounds, sprites = tmp_path / "sounds", tmp_path / "sprites"
+    sounds.mkdir()
+    write_tone(sounds / "lion.wav", 220)
+    AudioSpriteService(sounds, sprites).build()
+
+    # The API's instance, with the rebuild happening in another process
+    served = AudioSpriteService(sounds, sprites, check_interval=0)
+    first = served.index["sprite"]
+    write_tone(sounds / "elephant.wav", 110)
+    AudioSpriteService(sounds, sprites).build()
+
+    assert served.index["sprite"] != first
+    assert served.sprite_path(served.index["sprite"]) is not None
+    assert len(served.clips()) == 2
+
+def test_check_reports_missing_audio(tmp_path, caplog):
+    sounds, sprites = tmp_path / "sounds", tmp_path / "sprites"
+    service = AudioSpriteService(sounds, sprites)
+    assert not service.check()
+    assert "No audio sprite" in caplog.text
+
+    sounds.mkdir()
+    write_tone(sounds / "lion.wav", 220)
+    service.build()
+    assert service.check()
+    assert "Lion" not in service.missing_species() and "Zebra" in service.missing_species()
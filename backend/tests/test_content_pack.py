@@ -0,0 +1,31 @@
+from backend.services import content_pack
+from backend.services.content_pack import ContentPackBuilder, ContentPackStore
+
+def write_pack(path, items):
+    builder = ContentPackBuilder()
+    for key, payload in items.items():
+        builder.add(key, payload)
+    builder.write(path)
+
+def test_corrupt_pack_is_rejected_once_until_it_changes(tmp_path, monkeypatch):
+    path = tmp_path / "content.pack"
+    write_pack(path, {"story:leo:en": {"title": "Leo"}})
+    store = ContentPackStore(path, check_interval=0)
+    assert store.current().get("story:leo:en") == {"title": "Leo"}
+
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 0xFF
+    corrupt = tmp_path / "corrupt.pack"
+    corrupt.write_bytes(bytes(data))
+    corrupt.replace(path)
+
+    opened = []
+    real_pack = content_pack.ContentPack
+    monkeypatch.setattr(content_pack, "ContentPack", lambda *args: opened.append(args) or real_pack(*args))
+    for _ in range(3):
+        # The previous version keeps being served, and the bad file is hashed once
+        assert store.current().get("story:leo:en") == {"title": "Leo"}
+    assert len(opened) == 1
+
+    write_pack(path, {"story:leo:en": {"title": "Leo, again"}})
+    assert store.current().get("story:leo:en") == {"title": "Leo, again"}
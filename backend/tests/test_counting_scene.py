@@ -0,0 +1,17 @@
+from concurrent.futures import ThreadPoolExecutor
+from fastapi.testclient import TestClient
+from backend.api.main import app
+from backend.services.counting_scene import SEEDS_PER_KEY, CountingSceneService
+
+def test_concurrent_gets_keep_the_cache_bounded():
+    service = CountingSceneService(cache_size=4)
+    keys = [(count, "Tembo", seed) for count in range(1, 6) for seed in range(SEEDS_PER_KEY)] * 4
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        scenes = list(executor.map(lambda key: service.get(*key), keys))
+    assert all(len(scene.sprites) == count for scene, (count, _, _) in zip(scenes, keys))
+    assert len(service._cache) <= 4
+
+def test_seed_outside_the_warmed_set_is_rejected():
+    with TestClient(app) as client:
+        response = client.get(f"/api/games/counting-scene?count=3&animal_theme=Tembo&seed={SEEDS_PER_KEY}")
+        assert response.status_code == 422
@@ -0,0 +1,75 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+from backend.api.main import app
+from backend.services.game_sessions import MAX_MESSAGE_BYTES, MAX_PENDING
+
+SESSION_URL = "/api/games/session?user_id=test-user&game_id={game_id}&puzzle_type=memory&difficulty=easy"
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as c:
+        yield c
+
+def hints(first: int, last: int) -> str:
+    return json.dumps({"events": [{"seq": seq, "kind": "hint"} for seq in range(first, last + 1)]})
+
+def receive_until(websocket, type_: str, seq: int = None) -> dict:
+    """Skip acks for earlier flushes until the wanted message arrives"""
+    while True:
+        message = websocket.receive_json()
+        if message["type"] == type_ and (seq is None or message.get("seq") == seq):
+            return message
+        assert message["type"] == "ack", message
+
+def test_events_are_acked(client):
+    with client.websocket_connect(SESSION_URL.format(game_id="acks")) as websocket:
+        assert websocket.receive_json()["type"] == "session"
+        websocket.send_text(json.dumps({"seq": 1, "kind": "attempt", "correct": True}))
+        websocket.send_text(json.dumps({"seq": 2, "kind": "attempt", "correct": False}))
+        ack = receive_until(websocket, "ack", 2)
+        assert ack["attempts"] == 2 and ack["correct"] == 1
+
+def test_oversized_batch_is_drained_and_acked(client):
+    count = MAX_PENDING + 143
+    message = hints(1, count)
+    assert len(message) < MAX_MESSAGE_BYTES
+    with client.websocket_connect(SESSION_URL.format(game_id="oversized")) as websocket:
+        websocket.receive_json()
+        websocket.send_text(message)
+        ack = receive_until(websocket, "ack", count)
+        assert ack["hints"] == count
+
+def test_duplicate_seqs_are_ignored(client):
+    with client.websocket_connect(SESSION_URL.format(game_id="duplicates")) as websocket:
+        websocket.receive_json()
+        websocket.send_text(hints(1, 3))
+        websocket.send_text(hints(2, 4))
+        ack = receive_until(websocket, "ack", 4)
+        assert ack["hints"] == 4
+
+def test_gap_reports_expected_seq(client):
+    with client.websocket_connect(SESSION_URL.format(game_id="gap")) as websocket:
+        websocket.receive_json()
+        websocket.send_text(hints(1, 2))
+        websocket.send_text(json.dumps({"seq": 5, "kind": "hint"}))
+        assert receive_until(websocket, "error") == {"type": "error", "code": "out_of_order", "expected": 3}
+        websocket.send_text(hints(3, 3))
+        assert receive_until(websocket, "ack", 3)["hints"] == 3
+
+def test_resume_continues_after_last_ack(client):
+    with client.websocket_connect(SESSION_URL.format(game_id="resume")) as websocket:
+        token = websocket.receive_json()["resume_token"]
+        websocket.send_text(hints(1, 2))
+        receive_until(websocket, "ack", 2)
+
+    with client.websocket_connect(f"/api/games/session?resume={token}") as websocket:
+        session = websocket.receive_json()
+        assert session["acked"] == 2 and session["hints"] == 2
+        # The client resends from its own buffer; seqs already stored are skipped
+        websocket.send_text(hints(1, 4))
+        assert receive_until(websocket, "ack", 4)["hints"] == 4
+
+def test_forged_resume_token_is_rejected(client):
+    with client.websocket_connect("/api/games/session?resume=abc.def") as websocket:
+        assert websocket.receive_json() == {"type": "error", "code": "session_expired"}
@@ -0,0 +1,27 @@
+import asyncio
+import os
+from PIL import Image
+from backend.services.image_variants import ImageVariantService
+
+def test_listing_skips_broken_images_and_follows_the_directory(tmp_path):
+    sources = tmp_path / "animals"
+    sources.mkdir()
+    Image.new("RGB", (200, 150), "orange").save(sources / "lion.png")
+    (sources / "broken.jpg").write_bytes(b"not a picture")
+    service = ImageVariantService(sources, tmp_path / "variants", widths=[64], max_workers=1)
+
+    async def run():
+        listing = await service.listing()
+        assert list(listing) == ["lion"]
+        assert await service.listing() is listing
+
+        Image.new("RGB", (200, 150), "grey").save(sources / "zebra.png")
+        # Make sure the directory's mtime moves even on coarse clocks
+        stat = sources.stat()
+        os.utime(sources, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        return await service.listing()
+
+    try:
+        assert sorted(asyncio.run(run())) == ["lion", "zebra"]
+    finally:
+        service.shutdown()
@@ -0,0 +1,24 @@
+import pytest
+from fastapi.testclient import TestClient
+from backend.api.main import app
+
+LESSON = {"animal_name": "Tembo", "lesson_theme": "Kindness", "puzzle_type": "memory", "difficulty": "easy"}
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as c:
+        yield c
+
+@pytest.mark.parametrize("stream", ["false", "true"])
+def test_unsupported_language_is_rejected(client, stream):
+    response = client.post(f"/api/lessons/generate?stream={stream}", json={**LESSON, "language": "xx"})
+    assert response.status_code == 400
+    assert "Unsupported language" in response.json()["detail"]
+
+def test_lesson_has_both_components(client):
+    response = client.post("/api/lessons/generate", json={**LESSON, "language": "sw"})
+    assert response.status_code == 200
+    lesson = response.json()
+    assert {"story", "game", "metadata"} <= set(lesson)
+    timings = lesson["metadata"]["timings"]
+    assert timings["total_ms"] >= max(timings["story"]["total_ms"], timings["game"]["total_ms"])
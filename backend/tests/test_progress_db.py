@@ -0,0 +1,41 @@
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from backend.db.engine import create_engine
+from backend.db.models import Base
+from backend.db.queries import latest_activities
+from backend.services.progress_db import ActivityRecorder
+from backend.services.progress_events import ProgressEvent
+
+def event(minute, activity_type="counting"):
+    return ProgressEvent(
+        user_id="zuri", activity_type=activity_type, activity_id=f"game-{minute}", score=0.5,
+        time_spent=60, completion_status=True, difficulty="easy",
+        timestamp=datetime(2026, 1, 1) + timedelta(minutes=minute)
+    )
+
+def test_events_are_written_in_batches_and_kept_until_the_schema_exists(tmp_path):
+    async def run():
+        engine = create_engine(f"sqlite:///{tmp_path / 'safari.db'}")
+        sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+        recorder = ActivityRecorder(lambda: sessionmaker)
+        for minute in range(3):
+            recorder.observe(event(minute))
+
+        # No migrations yet: the batch stays queued
+        await recorder.flush()
+        assert recorder.queue_depth() == 3 and recorder.stats["failed_writes"] == 1
+
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        recorder.observe(event(3, "memory"))
+        recorder._retry_at = 0.0
+        await recorder.flush()
+        assert recorder.queue_depth() == 0 and recorder.stats["written"] == 4
+
+        async with sessionmaker() as session:
+            latest = await latest_activities(session, "zuri", limit=2)
+        await engine.dispose()
+        return [(row.activity_id, row.activity_type) for row in latest]
+
+    assert asyncio.run(run()) == [("game-3", "memory"), ("game-2", "counting")]
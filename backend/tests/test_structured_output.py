@@ -0,0 +1,78 @@
+import asyncio
+import json
+from typing import List
+from pydantic import BaseModel
+from backend.services.structured_output import IncrementalJSONParser, StructuredOutput
+
+class Scene(BaseModel):
+    title: str
+    text: str
+
+class Story(BaseModel):
+    title: str
+    scenes: List[Scene]
+    parent_tips: List[str] = []
+
+STORY = {
+    "title": "Tembo shares",
+    "scenes": [{"title": "Morning", "text": "Tembo wakes up."}, {"title": "Lunch", "text": "Tembo shares fruit."}],
+    "parent_tips": ["Talk about sharing"]
+}
+
+def parse(text, chunk=3):
+    parser = IncrementalJSONParser()
+    for start in range(0, len(text), chunk):
+        parser.feed(text[start:start + chunk])
+    return parser, parser.finish()
+
+def test_repairs_and_cut_paths():
+    parser, value = parse("Sure!\n```json\n{title: 'Tembo', 'scenes': [{\"title\": \"Morning\",},]}\n```")
+    assert value == {"title": "Tembo", "scenes": [{"title": "Morning"}]}
+    assert not parser.cut and parser.cut_paths == []
+    assert {"unquoted_key", "single_quotes", "trailing_comma", "code_fence"} <= set(parser.repairs)
+
+    # Cut inside the second scene: the list and the scene were still open
+    parser, value = parse('{"title": "Tembo", "scenes": [{"title": "Morning", "text": "Up."}, {"title": "Lu')
+    assert value == {"title": "Tembo", "scenes": [{"title": "Morning", "text": "Up."}, {}]}
+    assert parser.cut and parser.cut_paths == ["scenes", "scenes.1", "scenes.1.title"]
+
+    # Cut between scenes: the first one validates, but the list may go on
+    parser, value = parse('{"title": "Tembo", "scenes": [{"title": "Morning", "text": "Up."}')
+    assert value == {"title": "Tembo", "scenes": [{"title": "Morning", "text": "Up."}]}
+    assert parser.cut_paths == ["scenes"]
+
+    # Cut in a top-level value: only that member is named
+    parser, value = parse('{"title": "Tembo", "parent_tips": ["Talk')
+    assert parser.cut_paths == ["parent_tips", "parent_tips.0"]
+    parser, value = parse('{"title": "Tem')
+    assert value == {} and parser.cut_paths == ["title"]
+
+def replies(*texts):
+    prompts = []
+    remaining = list(texts)
+
+    async def complete(prompt):
+        prompts.append(prompt)
+        yield remaining.pop(0)
+    return complete, prompts
+
+def test_cut_list_is_asked_for_again():
+    cut = json.dumps(STORY)[:json.dumps(STORY).index(', {"title": "Lunch"')]
+    complete, prompts = replies(cut, json.dumps({"scenes": STORY["scenes"], "parent_tips": STORY["parent_tips"]}))
+    engine = StructuredOutput()
+    story = asyncio.run(engine.generate("Write a story", Story, complete))
+    assert story.model_dump() == STORY
+    assert len(prompts) == 2
+    # The open list, and the field the cut kept from arriving
+    assert prompts[1].rsplit(":\n", 1)[1].splitlines() == ["- scenes", "- parent_tips"]
+    assert engine.stats["Story"]["followups"] == 1
+
+def test_cut_paths_merge_with_missing_fields():
+    cut = '{"scenes": [{"title": "Morning", "text": "Tembo wakes up."}, {"title": "Lunch"'
+    patch = {"title": STORY["title"], "scenes": STORY["scenes"]}
+    complete, prompts = replies(cut, json.dumps(patch))
+    story = asyncio.run(StructuredOutput().generate("Write a story", Story, complete))
+    assert story.title == STORY["title"]
+    assert story.scenes == [Scene(**scene) for scene in STORY["scenes"]]
+    # The missing title and the open list, without the scene inside it
+    assert prompts[1].rsplit(":\n", 1)[1].splitlines() == ["- title", "- scenes", "- parent_tips"]
@@ -0,0 +1,32 @@
+from backend.services.content_pack import ContentPack, ContentPackBuilder
+from backend.services.sync_index import index_for_pack
+
+def build_pack(path, items):
+    builder = ContentPackBuilder()
+    for key, payload in items.items():
+        builder.add(key, payload)
+    builder.write(path)
+    return ContentPack(path)
+
+def test_cursors_survive_restarts_and_other_workers(tmp_path):
+    changelog = tmp_path / "pack.sync.json"
+    first = build_pack(tmp_path / "v1.bin", {"story:leo:en": {"title": "Leo"}, "story:zuri:en": {"title": "Zuri"}})
+    cursor = index_for_pack(first, changelog).cursor
+
+    second = build_pack(tmp_path / "v2.bin", {"story:leo:en": {"title": "Leo, again"}, "story:tembo:en": {"title": "Tembo"}})
+    # One worker applies the new pack; another (or a restarted one) loads what it saved
+    updated = index_for_pack(second, changelog)
+    other_worker = index_for_pack(second, changelog)
+    assert other_worker.cursor == updated.cursor
+
+    diff = other_worker.diff(cursor, {"story:leo:en": "old", "story:zuri:en": "old"})
+    assert not diff.full
+    assert sorted(diff.upserts) == ["story:leo:en", "story:tembo:en"]
+    assert diff.deletes == ["story:zuri:en"]
+
+def test_lost_change_log_starts_a_new_epoch(tmp_path):
+    changelog = tmp_path / "pack.sync.json"
+    pack = build_pack(tmp_path / "v1.bin", {"story:leo:en": {"title": "Leo"}})
+    cursor = index_for_pack(pack, changelog).cursor
+    changelog.unlink()
+    assert index_for_pack(pack, changelog).diff(cursor, {}).full
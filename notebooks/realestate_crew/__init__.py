@@ -0,0 +1,20 @@
+"""Multi-agent property search and analysis for Kenyan real estate"""
+from .checkpoints import Checkpoint, CheckpointStore, page_versions, task_key
+from .dag import DagResult, TaskTiming, descendants, format_timings, run_dag, topological_order
+from .pipeline import (
+    PipelineResult, akickoff, akickoff_many, kickoff, kickoff_many, run_batch, timing_report
+)
+from .scraping import (
+    CachedPage, FetchBackend, FetchResponse, PageCache, PageFetcher, RequestsBackend,
+    get_page_fetcher, scrape_website_tool, set_page_fetcher
+)
+from .tasks import PROPERTY_URLS, TASK_DEPENDENCIES, PropertyData, PropertyUrls
+
+__all__ = [
+    "Checkpoint", "CheckpointStore", "page_versions", "task_key",
+    "DagResult", "TaskTiming", "descendants", "format_timings", "run_dag", "topological_order",
+    "PipelineResult", "akickoff", "akickoff_many", "kickoff", "kickoff_many", "run_batch", "timing_report",
+    "CachedPage", "FetchBackend", "FetchResponse", "PageCache", "PageFetcher", "RequestsBackend",
+    "get_page_fetcher", "scrape_website_tool", "set_page_fetcher",
+    "PROPERTY_URLS", "TASK_DEPENDENCIES", "PropertyData", "PropertyUrls"
+]
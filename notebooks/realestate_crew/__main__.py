@@ -0,0 +1,29 @@
+"""
+Run the example searches concurrently and print their timings:
+
+    cd notebooks && python -m realestate_crew [--force TASK ...]
+
+Finished tasks are restored from checkpoints; --force recomputes the named
+tasks and everything downstream of them.
+"""
+import argparse
+import os
+import warnings
+from .pipeline import run_batch
+from .tasks import TASK_DEPENDENCIES
+
+EXAMPLE_INPUTS = [
+    {"city": "Nairobi", "property_type": "Residential Flats", "max_price": "50,000"},
+    {"city": "Kisumu", "property_type": "Land", "max_price": "10,000,000"},
+    {"city": "Nairobi", "property_type": "Houses", "max_price": "15,000,000"}
+]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m realestate_crew")
+    parser.add_argument("--force", nargs="+", default=[], choices=list(TASK_DEPENDENCIES), help="Tasks to recompute")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    os.environ.setdefault("OPENAI_MODEL_NAME", "gpt-3.5-turbo")
+    for result in run_batch(EXAMPLE_INPUTS, force=args.force):
+        print(f"\n# {result.inputs['property_type']} in {result.inputs['city']}\n\n{result.report}")
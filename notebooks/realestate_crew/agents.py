@@ -0,0 +1,48 @@
+from typing import Dict
+from crewai import Agent
+
+def build_agents(verbose: bool = True) -> Dict[str, Agent]:
+    """
+    Fresh agents for one pipeline run.
+
+    crewai interpolates inputs into agents in place, so concurrent runs must
+    not share agent instances.
+    """
+    return {
+        "property_researcher": Agent(
+            role="Senior Property Researcher",
+            goal="Find and extract relevant property listings based on user criteria",
+            backstory="An expert in web scraping and real estate data extraction with "
+                      "years of experience in aggregating property data from multiple sources. "
+                      "Known for accurate and comprehensive data collection.",
+            verbose=verbose,
+            allow_delegation=False
+        ),
+        "market_analyst": Agent(
+            role="Real Estate Market Analyst",
+            goal="Analyze property data and identify best investment opportunities",
+            backstory="A seasoned analyst with deep understanding of real estate markets "
+                      "and valuation techniques. Specializes in comparative market analysis "
+                      "and investment potential assessment.",
+            verbose=verbose,
+            allow_delegation=False
+        ),
+        "location_analyst": Agent(
+            role="Location Intelligence Specialist",
+            goal="Analyze location-based price trends and market dynamics",
+            backstory="An urban economist with expertise in geographic market trends "
+                      "and neighborhood valuation patterns. Combines GIS data with "
+                      "market intelligence for accurate predictions.",
+            verbose=verbose,
+            allow_delegation=False
+        ),
+        "report_editor": Agent(
+            role="Senior Real Estate Editor",
+            goal="Compile analysis into professional reports",
+            backstory="A former property journalist with exceptional skills in structuring "
+                      "complex data into clear, actionable insights. Ensures reports are "
+                      "accurate and client-ready.",
+            verbose=verbose,
+            allow_delegation=False
+        )
+    }
@@ -0,0 +1,103 @@
+"""
+Task-level checkpoints, so a re-run only redoes the tasks that changed.
+
+A task's checkpoint key hashes everything its output depends on: the
+description and expected output with the run's inputs formatted in, the
+agent's role, goal, backstory and model, the tools, the output schema and
+the raw outputs of its upstream tasks. Tasks that read the web are also
+keyed by a hash of each page's current text, so once the page cache picks
+up a changed listing page the search reruns, and everything downstream of
+it with it. Re-running with the same inputs restores every finished task
+and executes only the rest; changing a task (or getting a different
+upstream output) changes its key and those of everything downstream.
+"""
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel
+from .scraping import CACHE_DIR, CachedPage
+
+CHECKPOINT_DIR = Path(os.getenv("REALESTATE_CHECKPOINT_DIR", CACHE_DIR.parent / "checkpoints"))
+
+class Checkpoint(BaseModel):
+    key: str
+    task: str
+    raw_output: str
+    exported_output: Any  # str, or a dict for tasks with output_json
+    created_at: float
+
+def page_versions(pages: Dict[str, CachedPage]) -> Dict[str, str]:
+    """{url: hash of the page's status and text}, for keying tasks that scrape those pages"""
+    return {
+        url: hashlib.sha256(f"{page.status}\n{page.text}".encode("utf-8")).hexdigest()
+        for url, page in pages.items()
+    }
+
+def task_key(task, upstream_outputs: List[str], sources: Optional[Dict[str, str]] = None) -> str:
+    """
+    Hash of a (formatted) task's definition, its agent's config and its upstream outputs
+
+    sources are page_versions() of the pages the task reads; they only
+    count for tasks with tools, the ones that read pages at all.
+    """
+    agent = task.agent
+    output_model = task.output_json or task.output_pydantic
+    spec = {
+        "description": task.description,
+        "expected_output": task.expected_output,
+        "agent": {
+            "role": agent.role,
+            "goal": agent.goal,
+            "backstory": agent.backstory,
+            "model": getattr(agent.llm, "model_name", None) or getattr(agent.llm, "model", None),
+            "temperature": getattr(agent.llm, "temperature", None)
+        },
+        "tools": sorted(getattr(tool, "name", type(tool).__name__) for tool in task.tools or []),
+        "output_schema": output_model.model_json_schema() if output_model else None,
+        "upstream": upstream_outputs,
+        "sources": sources if task.tools else None
+    }
+    encoded = json.dumps(spec, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+class CheckpointStore:
+    """One JSON file per checkpoint key"""
+
+    def __init__(self, directory: Path = CHECKPOINT_DIR):
+        self.directory = Path(directory)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Checkpoint]:
+        try:
+            return Checkpoint.model_validate_json(self._path(key).read_bytes())
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, task_name: str, raw_output: str, exported_output: Any) -> Checkpoint:
+        if isinstance(exported_output, BaseModel):
+            exported_output = exported_output.model_dump()
+        checkpoint = Checkpoint(
+            key=key,
+            task=task_name,
+            raw_output=raw_output,
+            exported_output=exported_output,
+            created_at=time.time()
+        )
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp = path.with_suffix(".json.tmp")
+        tmp.write_text(checkpoint.model_dump_json(), encoding="utf-8")
+        os.replace(tmp, path)
+        return checkpoint
+
+    def clear(self) -> int:
+        removed = 0
+        for path in self.directory.glob("*.json"):
+            path.unlink()
+            removed += 1
+        return removed
@@ -0,0 +1,120 @@
+"""
+Run a DAG of blocking tasks concurrently.
+
+Each task starts as soon as everything it depends on has finished, in a
+worker thread, and holds a slot of a shared semaphore while it runs, so
+several DAGs can share one concurrency limit.
+"""
+import asyncio
+import time
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+from pydantic import BaseModel
+
+class TaskTiming(BaseModel):
+    task: str
+    ready: float  # seconds after the run started that dependencies were done
+    started: float  # ... that the task got a concurrency slot
+    finished: float
+
+    @property
+    def duration(self) -> float:
+        return self.finished - self.started
+
+    @property
+    def queued(self) -> float:
+        return self.started - self.ready
+
+class DagResult(BaseModel):
+    outputs: Dict[str, Any]
+    timings: List[TaskTiming]  # in completion order
+    wall_time: float
+
+def topological_order(dependencies: Dict[str, List[str]]) -> List[str]:
+    """Task names ordered so each comes after its dependencies; rejects cycles"""
+    order: List[str] = []
+    state: Dict[str, str] = {}
+
+    def visit(name: str, path: List[str]) -> None:
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            raise ValueError(f"Dependency cycle: {' -> '.join(path + [name])}")
+        if name not in dependencies:
+            raise ValueError(f"Unknown task {name!r} in dependencies of {path[-1]!r}")
+        state[name] = "visiting"
+        for dependency in dependencies[name]:
+            visit(dependency, path + [name])
+        state[name] = "done"
+        order.append(name)
+
+    for name in dependencies:
+        visit(name, [])
+    return order
+
+def descendants(dependencies: Dict[str, List[str]], names: Iterable[str]) -> Set[str]:
+    """The named tasks and every task downstream of them"""
+    selected = set(names)
+    unknown = selected - set(dependencies)
+    if unknown:
+        raise ValueError(f"Unknown tasks: {', '.join(sorted(unknown))}")
+    for name in topological_order(dependencies):
+        if any(dependency in selected for dependency in dependencies[name]):
+            selected.add(name)
+    return selected
+
+async def run_dag(
+    runners: Dict[str, Callable[[], str]],
+    dependencies: Dict[str, List[str]],
+    semaphore: Optional[asyncio.Semaphore] = None,
+    executor: Optional[Executor] = None
+) -> DagResult:
+    """
+    Run every task once its dependencies are done; returns outputs and timings.
+
+    A failing task fails the run; tasks depending on it never start.
+    """
+    order = topological_order(dependencies)
+    semaphore = semaphore or asyncio.Semaphore(len(order))
+    loop = asyncio.get_running_loop()
+    begin = time.perf_counter()
+    timings: List[TaskTiming] = []
+    futures: Dict[str, asyncio.Future] = {}
+
+    async def run(name: str) -> str:
+        await asyncio.gather(*(futures[dependency] for dependency in dependencies[name]))
+        ready = time.perf_counter() - begin
+        async with semaphore:
+            started = time.perf_counter() - begin
+            output = await loop.run_in_executor(executor, runners[name])
+        timings.append(TaskTiming(task=name, ready=ready, started=started, finished=time.perf_counter() - begin))
+        return output
+
+    for name in order:
+        futures[name] = asyncio.ensure_future(run(name))
+
+    try:
+        outputs = await asyncio.gather(*futures.values())
+    except BaseException:
+        for future in futures.values():
+            future.cancel()
+        raise
+
+    return DagResult(
+        outputs=dict(zip(futures, outputs)),
+        timings=timings,
+        wall_time=time.perf_counter() - begin
+    )
+
+def format_timings(result: DagResult, title: str = "") -> str:
+    """Plain-text timing table for a run"""
+    lines = [title] if title else []
+    lines.append(f"{'task':<20} {'ready':>8} {'queued':>8} {'run':>8} {'done':>8}")
+    for timing in sorted(result.timings, key=lambda t: t.started):
+        lines.append(
+            f"{timing.task:<20} {timing.ready:>7.1f}s {timing.queued:>7.1f}s "
+            f"{timing.duration:>7.1f}s {timing.finished:>7.1f}s"
+        )
+    busy = sum(timing.duration for timing in result.timings)
+    lines.append(f"wall {result.wall_time:.1f}s, task time {busy:.1f}s ({busy / max(result.wall_time, 1e-9):.2f}x parallelism)")
+    return "\n".join(lines)
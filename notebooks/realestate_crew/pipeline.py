@@ -0,0 +1,192 @@
+"""
+The real-estate crew as an importable pipeline.
+
+A run builds fresh agents and tasks (crewai formats inputs into them in
+place), then executes the task DAG: property search and location analysis
+start together, market analysis follows the search, and the report waits
+for all three. kickoff_many runs several input sets at once, every task of
+every run sharing one concurrency limit. The listing pages the runs will
+scrape are fetched once, concurrently and through the page cache, before
+any task starts; the versions of those pages are part of the checkpoint
+key of the task that scrapes them. Task outputs are checkpointed, so a
+re-run restores the tasks that already finished and executes only the
+rest; force names tasks to recompute along with everything downstream of
+them.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from crewai.tasks.task_output import TaskOutput
+from pydantic import BaseModel
+from .agents import build_agents
+from .checkpoints import CheckpointStore, page_versions, task_key
+from .dag import DagResult, TaskTiming, descendants, format_timings, run_dag
+from .scraping import CachedPage, get_page_fetcher
+from .tasks import PROPERTY_URLS, TASK_DEPENDENCIES, build_tasks
+
+# Tasks (LLM calls) in flight across all runs of a batch
+DEFAULT_MAX_CONCURRENCY = 4
+
+FINAL_TASK = "report"
+
+class PipelineResult(BaseModel):
+    inputs: Dict[str, Any]
+    report: str
+    outputs: Dict[str, Any]
+    timings: List[TaskTiming]
+    wall_time: float
+    restored: List[str] = []  # tasks restored from checkpoints rather than executed
+
+def with_defaults(inputs: Dict[str, Any]) -> Dict[str, Any]:
+    return {"property_count": 8, "property_urls": PROPERTY_URLS, **inputs}
+
+def prepare_run(inputs: Dict[str, Any], verbose: bool = True):
+    """Agents and tasks for one run, with inputs formatted in and executors built"""
+    agents = build_agents(verbose=verbose)
+    tasks = build_tasks(agents)
+    for task in tasks.values():
+        task.interpolate_inputs(inputs)
+    for agent in agents.values():
+        agent.interpolate_inputs(inputs)
+        agent.create_agent_executor()
+    return tasks
+
+def checkpointed_runner(
+    name: str,
+    task,
+    store: CheckpointStore,
+    force: bool,
+    restored: List[str],
+    sources: Optional[Dict[str, str]] = None
+) -> Callable[[], Any]:
+    """task.execute, skipped in favour of a matching checkpoint unless forced"""
+    def run() -> Any:
+        # Upstream tasks are done by now; their outputs are part of the key
+        key = task_key(task, [upstream.output.raw_output for upstream in task.context or []], sources)
+        checkpoint = None if force else store.get(key)
+        if checkpoint is not None:
+            exported = checkpoint.exported_output
+            output_model = task.output_json or task.output_pydantic
+            if output_model is not None and isinstance(exported, dict):
+                # TaskOutput holds models, not the dicts output_json tasks return
+                exported = output_model.model_validate(exported)
+            # Downstream tasks read this output through Task.context
+            task.output = TaskOutput(
+                description=task.description,
+                raw_output=checkpoint.raw_output,
+                exported_output=exported
+            )
+            restored.append(name)
+            return checkpoint.exported_output
+
+        output = task.execute()
+        store.put(key, name, task.output.raw_output, output)
+        return output
+    return run
+
+async def akickoff(
+    inputs: Dict[str, Any],
+    semaphore: Optional[asyncio.Semaphore] = None,
+    executor: Optional[ThreadPoolExecutor] = None,
+    verbose: bool = True,
+    checkpoints: Optional[CheckpointStore] = None,
+    force: Iterable[str] = (),
+    pages: Optional[Dict[str, CachedPage]] = None
+) -> PipelineResult:
+    """
+    Run the crew once.
+
+    Args:
+        checkpoints: Where task outputs are checkpointed; None to always execute
+        force: Tasks to recompute, along with everything downstream of them
+        pages: The run's listing pages, already fetched; fetched here if None
+    """
+    inputs = with_defaults(inputs)
+    forced = descendants(TASK_DEPENDENCIES, force)
+    tasks = prepare_run(inputs, verbose=verbose)
+    restored: List[str] = []
+    # Each task reads its upstream outputs through Task.context
+    if checkpoints is None:
+        runners = {name: task.execute for name, task in tasks.items()}
+    else:
+        urls = inputs["property_urls"]
+        if pages is None:
+            pages = await asyncio.get_running_loop().run_in_executor(executor, get_page_fetcher().fetch_many, urls)
+        sources = page_versions({url: pages[url] for url in urls if url in pages})
+        runners = {
+            name: checkpointed_runner(name, task, checkpoints, name in forced, restored, sources)
+            for name, task in tasks.items()
+        }
+    result: DagResult = await run_dag(runners, TASK_DEPENDENCIES, semaphore, executor)
+    return PipelineResult(
+        inputs=inputs,
+        report=str(result.outputs[FINAL_TASK]),
+        outputs=result.outputs,
+        timings=result.timings,
+        wall_time=result.wall_time,
+        restored=restored
+    )
+
+async def akickoff_many(
+    inputs_list: List[Dict[str, Any]],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    verbose: bool = True,
+    checkpoints: Optional[CheckpointStore] = None,
+    force: Iterable[str] = (),
+    use_checkpoints: bool = True
+) -> List[PipelineResult]:
+    """Run every input set concurrently; results are in input order"""
+    if use_checkpoints and checkpoints is None:
+        checkpoints = CheckpointStore()
+    force = list(force)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    urls = [url for inputs in inputs_list for url in with_defaults(inputs)["property_urls"]]
+    pages = await asyncio.get_running_loop().run_in_executor(None, get_page_fetcher().fetch_many, urls)
+    with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="crew") as executor:
+        return await asyncio.gather(*(
+            akickoff(inputs, semaphore, executor, verbose=verbose, checkpoints=checkpoints, force=force, pages=pages)
+            for inputs in inputs_list
+        ))
+
+def kickoff(inputs: Dict[str, Any], verbose: bool = True, force: Iterable[str] = (), use_checkpoints: bool = True) -> PipelineResult:
+    return kickoff_many([inputs], verbose=verbose, force=force, use_checkpoints=use_checkpoints)[0]
+
+def kickoff_many(
+    inputs_list: List[Dict[str, Any]],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    verbose: bool = True,
+    force: Iterable[str] = (),
+    use_checkpoints: bool = True
+) -> List[PipelineResult]:
+    """
+    Blocking kickoff_many for scripts and notebooks.
+
+    Inside a running event loop (Jupyter, Colab) await akickoff_many instead.
+    """
+    return asyncio.run(akickoff_many(
+        inputs_list, max_concurrency, verbose=verbose, force=force, use_checkpoints=use_checkpoints
+    ))
+
+def timing_report(results: List[PipelineResult], wall_time: Optional[float] = None) -> str:
+    """Per-task timings for each run, plus the batch total if given"""
+    sections = []
+    for result in results:
+        title = ", ".join(f"{key}={result.inputs[key]}" for key in ("city", "property_type", "max_price") if key in result.inputs)
+        sections.append(format_timings(DagResult(outputs=result.outputs, timings=result.timings, wall_time=result.wall_time), title))
+        if result.restored:
+            sections[-1] += f"\nrestored from checkpoints: {', '.join(result.restored)}"
+    if wall_time is not None:
+        sections.append(f"batch of {len(results)} runs: {wall_time:.1f}s")
+    return "\n\n".join(sections)
+
+def run_batch(
+    inputs_list: List[Dict[str, Any]],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    force: Iterable[str] = ()
+) -> List[PipelineResult]:
+    """kickoff_many, printing the timing report"""
+    start = time.perf_counter()
+    results = kickoff_many(inputs_list, max_concurrency, force=force)
+    print(timing_report(results, time.perf_counter() - start))
+    return results
@@ -0,0 +1,242 @@
+"""
+Cached, concurrent fetching of the listing sites the crew scrapes.
+
+Every run of the pipeline reads the same few pages. Responses are kept on
+disk (one directory per URL: metadata, raw body and extracted text), are
+served without touching the network while younger than max_age, and after
+that are revalidated with If-None-Match / If-Modified-Since, so an
+unchanged page costs a 304 and no re-parse. Text is extracted once, when
+a new body arrives.
+
+The network sits behind FetchBackend. RequestsBackend keeps connections
+alive in a pooled requests.Session; tests can pass any object with the
+same fetch() method, or point RequestsBackend at a local fixture server.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Protocol
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = Path(os.getenv("REALESTATE_CACHE_DIR", Path(__file__).resolve().parent / ".cache" / "pages"))
+
+# Serve cached pages without revalidating for this long
+DEFAULT_MAX_AGE = 6 * 3600.0
+DEFAULT_TIMEOUT = 20.0
+DEFAULT_WORKERS = 8
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+)
+
+class FetchResponse(BaseModel):
+    url: str
+    status: int
+    headers: Dict[str, str]
+    body: bytes = b""
+
+class FetchBackend(Protocol):
+    def fetch(self, url: str, headers: Dict[str, str]) -> FetchResponse:
+        ...
+
+class RequestsBackend:
+    """HTTP over one requests.Session whose connections are kept alive and pooled per host"""
+
+    def __init__(self, pool_size: int = DEFAULT_WORKERS, timeout: float = DEFAULT_TIMEOUT, retries: int = 2):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def fetch(self, url: str, headers: Dict[str, str]) -> FetchResponse:
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        return FetchResponse(
+            url=response.url,
+            status=response.status_code,
+            headers={key.lower(): value for key, value in response.headers.items()},
+            body=response.content
+        )
+
+    def close(self) -> None:
+        self.session.close()
+
+class CachedPage(BaseModel):
+    url: str
+    status: int
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float  # when the body was last downloaded or revalidated
+    text: str = ""
+    from_cache: bool = False  # served without downloading the body
+
+def extract_text(body: bytes) -> str:
+    """Visible page text, one non-empty line per block, the way ScrapeWebsiteTool reads it"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(body, "html.parser")
+    for element in soup(["script", "style", "noscript", "template"]):
+        element.decompose()
+    lines = (" ".join(line.split()) for line in soup.get_text("\n").splitlines())
+    return "\n".join(line for line in lines if line)
+
+class PageCache:
+    """On-disk cache of fetched pages: <sha256(url)>/{meta.json, body, text.txt}"""
+
+    def __init__(self, directory: Path = CACHE_DIR):
+        self.directory = Path(directory)
+
+    def _entry(self, url: str) -> Path:
+        return self.directory / hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        entry = self._entry(url)
+        try:
+            meta = json.loads((entry / "meta.json").read_text(encoding="utf-8"))
+            text = (entry / "text.txt").read_text(encoding="utf-8")
+        except (OSError, ValueError):
+            return None
+        return CachedPage(**meta, text=text, from_cache=True)
+
+    def _write(self, path: Path, data: bytes) -> None:
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def put(self, page: CachedPage, body: Optional[bytes] = None) -> None:
+        """Store a page; body and text are rewritten only when a new body was downloaded"""
+        entry = self._entry(page.url)
+        entry.mkdir(parents=True, exist_ok=True)
+        if body is not None:
+            self._write(entry / "body", body)
+            self._write(entry / "text.txt", page.text.encode("utf-8"))
+        # Metadata last, so a readable meta.json always has its text beside it
+        meta = page.model_dump(exclude={"text", "from_cache"})
+        self._write(entry / "meta.json", json.dumps(meta).encode("utf-8"))
+
+    def body(self, url: str) -> Optional[bytes]:
+        try:
+            return (self._entry(url) / "body").read_bytes()
+        except OSError:
+            return None
+
+class PageFetcher:
+    """Fetches pages through the cache, several at a time"""
+
+    def __init__(
+        self,
+        backend: Optional[FetchBackend] = None,
+        cache: Optional[PageCache] = None,
+        max_age: float = DEFAULT_MAX_AGE,
+        workers: int = DEFAULT_WORKERS
+    ):
+        self.backend = backend or RequestsBackend(pool_size=workers)
+        self.cache = cache or PageCache()
+        self.max_age = max_age
+        self.workers = workers
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock(self, url: str) -> threading.Lock:
+        # Concurrent runs asking for one URL wait for a single fetch
+        with self._locks_guard:
+            return self._locks.setdefault(url, threading.Lock())
+
+    def fetch(self, url: str, max_age: Optional[float] = None) -> CachedPage:
+        max_age = self.max_age if max_age is None else max_age
+        with self._lock(url):
+            cached = self.cache.get(url)
+            if cached and time.time() - cached.fetched_at < max_age:
+                return cached
+
+            headers = {}
+            if cached and cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached and cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+            try:
+                response = self.backend.fetch(url, headers)
+            except Exception:
+                if cached:
+                    # A stale page beats no page when the site is unreachable
+                    logger.warning(f"Fetching {url} failed, serving the cached copy", exc_info=True)
+                    return cached
+                raise
+
+            if response.status == 304 and cached:
+                cached.fetched_at = time.time()
+                self.cache.put(cached)
+                return cached
+            if response.status >= 500 and cached:
+                logger.warning(f"{url} returned HTTP {response.status}, serving the cached copy")
+                return cached
+
+            page = CachedPage(
+                url=url,
+                status=response.status,
+                etag=response.headers.get("etag"),
+                last_modified=response.headers.get("last-modified"),
+                fetched_at=time.time(),
+                text=extract_text(response.body) if response.status == 200 else ""
+            )
+            if response.status == 200:
+                self.cache.put(page, response.body)
+            return page
+
+    def fetch_many(self, urls: List[str], max_age: Optional[float] = None) -> Dict[str, CachedPage]:
+        """Fetch URLs concurrently; failed URLs are logged and left out"""
+        unique = list(dict.fromkeys(urls))
+        pages: Dict[str, CachedPage] = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(unique)))) as executor:
+            futures = {url: executor.submit(self.fetch, url, max_age) for url in unique}
+            for url, future in futures.items():
+                try:
+                    pages[url] = future.result()
+                except Exception:
+                    logger.exception(f"Fetching {url} failed")
+        return pages
+
+_fetcher: Optional[PageFetcher] = None
+_fetcher_guard = threading.Lock()
+
+def get_page_fetcher() -> PageFetcher:
+    global _fetcher
+    with _fetcher_guard:
+        if _fetcher is None:
+            _fetcher = PageFetcher()
+        return _fetcher
+
+def set_page_fetcher(fetcher: PageFetcher) -> None:
+    """Swap the shared fetcher, e.g. for one over a fixture backend"""
+    global _fetcher
+    with _fetcher_guard:
+        _fetcher = fetcher
+
+def scrape_website_tool():
+    """
+    A crew tool reading a page's text through the shared fetcher; a drop-in
+    for crewai_tools.ScrapeWebsiteTool
+    """
+    from langchain.tools import StructuredTool
+
+    def read_website_content(website_url: str) -> str:
+        """Read the text content of a website, given its full URL"""
+        page = get_page_fetcher().fetch(website_url.strip())
+        if page.status != 200:
+            return f"Could not read {website_url}: HTTP {page.status}"
+        return page.text
+
+    return StructuredTool.from_function(read_website_content)
@@ -0,0 +1,73 @@
+from typing import Dict, List, Optional
+from crewai import Agent, Task
+from pydantic import BaseModel, Field
+from .scraping import scrape_website_tool
+
+PROPERTY_URLS = [
+    "https://www.knightfrank.com/property-for-sale/kenya",
+    "https://www.buyrentkenya.com/property-for-sale",
+    "https://www.pamgolding.co.za/property-search/properties-for-sale-kenya/119"
+]
+
+class PropertyUrls(BaseModel):
+    urls: List[str] = Field(..., description="List of formatted URLs to scrape based on location")
+
+class PropertyData(BaseModel):
+    """
+    Model to represent data for a single property.
+    """
+    title: str
+    location: str
+    price: Optional[str] = None  # Price might be missing
+    features: Optional[List[str]] = None  # Features might be missing
+
+# Which task outputs each task reads. Market and location analysis are
+# independent of each other; the report needs everything.
+TASK_DEPENDENCIES: Dict[str, List[str]] = {
+    "property_search": [],
+    "market_analysis": ["property_search"],
+    "location_analysis": [],
+    "report": ["property_search", "market_analysis", "location_analysis"]
+}
+
+def build_tasks(agents: Dict[str, Agent]) -> Dict[str, Task]:
+    """Fresh tasks for one pipeline run, wired to their upstream tasks as context"""
+    tasks = {
+        "property_search": Task(
+            description=(
+                "Search for {property_type} properties in {city} "
+                "under {max_price} from these sources: {property_urls}"
+                "Focus only on properties matching the exact criteria."
+            ),
+            expected_output="Structured JSON data of 5-10 relevant properties with "
+                           "complete details including price, location, and features and a link to the property.",
+            agent=agents["property_researcher"],
+            tools=[scrape_website_tool()],
+            output_json=PropertyData
+        ),
+        "market_analysis": Task(
+            description=("Analyze {property_count} properties in {city} "
+                         "and identify top 5 investment opportunities"),
+            expected_output="Comparative analysis report highlighting price-value ratios, "
+                           "future appreciation potential, and risk factors.",
+            agent=agents["market_analyst"]
+        ),
+        "location_analysis": Task(
+            description="Analyze price trends and neighborhood dynamics for {city}",
+            expected_output="Report detailing price per sqft trends, rental yields, "
+                           "and emerging hotspots in different localities.",
+            agent=agents["location_analyst"]
+        ),
+        "report": Task(
+            description="Compile all analyses into final client-ready report",
+            expected_output="Well-structured markdown report with sections for property "
+                           "recommendations, market analysis, and location insights."
+                           "For Potential Buyers, add a Negotiation Plan / Checks",
+            agent=agents["report_editor"]
+        )
+    }
+
+    for name, upstream in TASK_DEPENDENCIES.items():
+        if upstream:
+            tasks[name].context = [tasks[dependency] for dependency in upstream]
+    return tasks